@@ -1,4 +1,5 @@
 import streamlit as st
+import os
 import cv2
 import pandas as pd
 import numpy as np
@@ -13,18 +14,31 @@ warnings.filterwarnings('ignore')
 
 # Import project modules with error handling
 try:
-    from src.webcam.camera import CameraCapture
     from src.webcam.face_emotion import FaceEmotionDetector
-    from src.audio.mic_capture import MicrophoneCapture
-    from src.audio.audio_emotion import AudioEmotionAnalyzer
+    from src.audio.audio_stream import AudioStreamWorker
     from src.fusion.fusion_engine import FusionEngine
+    from src.fusion.stream_aligner import AlignedFusionBuffer
     from src.logger.session_logger import SessionLogger
-    from src.logger.report_generator import ReportGenerator
+    from src.logger.report_worker import ReportWorker
     from src.fallback.rule_based import FallbackEmotionGenerator
+    from src.perf.latency import LatencyTracker
+    from src.perf.profiler import SessionProfiler
+    from src.webcam.inference_worker import InferencePool
+    from src.recording.recorder import InputRecorder, recording_path_for
     from src.dashboard.ui_components import *
     from src.dashboard.plots import *
-    from src.config import TIMELINE_SECONDS, STRESS_THRESHOLD, ALERT_DURATION
-    from src.utils import save_session_data
+    from src.dashboard.replay import SessionReplay, list_saved_sessions
+    from src.dashboard.preview import PreviewEncoder
+    from src.config import (TIMELINE_SECONDS, PROFILING_ENABLED,
+                            REPLAY_MIN_SPEED, REPLAY_MAX_SPEED, PREVIEW_ENABLED,
+                            PERFORMANCE_PROFILES, INFERENCE_PROCESS_ENABLED, INFERENCE_WORKERS)
+    from src.runtime_config import get_runtime_config
+    from src.resources import get_registry
+    from src.alerts.alert_engine import AlertEngine
+    from src.streaming.event_server import get_publisher
+    from src.utils import save_session_log, save_performance_metrics, save_alert_events
+    from streamlit import runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
 except ImportError as e:
     st.error(f"Import error: {e}")
     st.error("Please install dependencies: pip install -r requirements.txt")
@@ -39,30 +53,67 @@ st.set_page_config(
 )
 
 # Initialize session state
+if 'runtime_config' not in st.session_state:
+    st.session_state.runtime_config = get_runtime_config()
+if 'perf_tracker' not in st.session_state:
+    st.session_state.perf_tracker = LatencyTracker()
 if 'session_logger' not in st.session_state:
     try:
         st.session_state.session_logger = SessionLogger()
     except NameError:
         st.error("Failed to initialize SessionLogger. Please check imports.")
         st.stop()
-if 'camera' not in st.session_state:
-    st.session_state.camera = CameraCapture()
+if 'resource_leases' not in st.session_state:
+    # Models and devices are built once per server and shared by every viewer;
+    # these leases hold this viewer's references until its session state is dropped
+    registry = get_registry()
+    st.session_state.resource_leases = {name: registry.acquire(name)
+                                        for name in ('microphone', 'audio_capture', 'audio_analyzer', 'report_generator')}
+if 'camera_lease' not in st.session_state:
+    st.session_state.camera_lease = None  # Shared camera, held only while this viewer's session runs
 if 'face_detector' not in st.session_state:
-    st.session_state.face_detector = FaceEmotionDetector()
+    st.session_state.face_detector = FaceEmotionDetector(st.session_state.perf_tracker)
 if 'mic_capture' not in st.session_state:
-    st.session_state.mic_capture = MicrophoneCapture()
+    st.session_state.mic_capture = st.session_state.resource_leases['microphone'].value
 if 'audio_analyzer' not in st.session_state:
-    st.session_state.audio_analyzer = AudioEmotionAnalyzer()
+    st.session_state.audio_analyzer = st.session_state.resource_leases['audio_analyzer'].value
 if 'fusion_engine' not in st.session_state:
     st.session_state.fusion_engine = FusionEngine()
+if 'fusion_buffer' not in st.session_state:
+    st.session_state.fusion_buffer = AlignedFusionBuffer(st.session_state.fusion_engine)
+if 'audio_stream' not in st.session_state:
+    st.session_state.audio_stream = AudioStreamWorker(
+        st.session_state.resource_leases['audio_capture'].value,
+        st.session_state.audio_analyzer,
+        on_result=st.session_state.fusion_buffer.push_audio,
+        latency_tracker=st.session_state.perf_tracker
+    )
+if 'alert_engine' not in st.session_state:
+    st.session_state.alert_engine = AlertEngine()
 if 'fallback_generator' not in st.session_state:
     st.session_state.fallback_generator = FallbackEmotionGenerator()
 if 'report_generator' not in st.session_state:
-    st.session_state.report_generator = ReportGenerator()
+    st.session_state.report_generator = st.session_state.resource_leases['report_generator'].value
+if 'report_worker' not in st.session_state:
+    st.session_state.report_worker = ReportWorker(st.session_state.report_generator)
+if 'report_job' not in st.session_state:
+    st.session_state.report_job = None
 if 'session_active' not in st.session_state:
     st.session_state.session_active = False
 if 'simulation_mode' not in st.session_state:
     st.session_state.simulation_mode = False
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = None
+if 'replay' not in st.session_state:
+    st.session_state.replay = None
+if 'input_recorder' not in st.session_state:
+    st.session_state.input_recorder = None
+if 'inference_pool' not in st.session_state:
+    st.session_state.inference_pool = None
+if 'inference_fallback' not in st.session_state:
+    st.session_state.inference_fallback = None  # Why workers were abandoned this session
+if 'preview_encoder' not in st.session_state:
+    st.session_state.preview_encoder = PreviewEncoder()
 
 def main():
     st.title("🧠 EMOTISENSE AI")
@@ -75,13 +126,43 @@ def main():
         # Session controls
         start_session, stop_session, simulation_mode = display_session_controls()
         st.session_state.simulation_mode = simulation_mode
+        profiling_mode = st.checkbox("Profiling Mode", value=PROFILING_ENABLED,
+                                     disabled=st.session_state.session_active)
+        record_inputs = st.checkbox("Record Raw Inputs", value=False,
+                                    disabled=st.session_state.session_active or simulation_mode)
+        worker_inference = st.checkbox("Out-of-process Inference", value=INFERENCE_PROCESS_ENABLED,
+                                       disabled=st.session_state.session_active or simulation_mode,
+                                       help=f"Run face detection and FER in {INFERENCE_WORKERS} worker process(es)")
+        display_profile_controls()
+        display_preview_controls()
         
         # Handle session controls
         if start_session and not st.session_state.session_active:
+            st.session_state.replay = None
             st.session_state.session_active = True
             st.session_state.session_logger.start_session()
+            st.session_state.perf_tracker.reset()
+            st.session_state.alert_engine.reset()
+            st.session_state.preview_encoder.reset()
+            if profiling_mode:
+                st.session_state.profiler = SessionProfiler(st.session_state.session_logger.session_id)
+                st.session_state.profiler.start()
+            if record_inputs and not simulation_mode:
+                recording_path = recording_path_for(st.session_state.session_logger.session_id)
+                st.session_state.input_recorder = InputRecorder(recording_path)
+                st.session_state.input_recorder.start()
+            st.session_state.inference_fallback = None
+            if worker_inference and not simulation_mode:
+                st.session_state.inference_pool = InferencePool()
+                if not st.session_state.inference_pool.start():
+                    st.session_state.inference_pool = None
+                    st.warning("Inference workers failed to start - running inference in-process")
             if not simulation_mode:
-                camera_started = st.session_state.camera.start()
+                # Audio runs at its own chunk rate and is time-aligned with face results
+                st.session_state.fusion_buffer.reset()
+                st.session_state.audio_stream.recorder = st.session_state.input_recorder
+                st.session_state.audio_stream.start()
+                camera_started = start_camera().is_active
                 if camera_started:
                     st.success("Session started with camera!")
                 else:
@@ -92,18 +173,45 @@ def main():
         
         if stop_session and st.session_state.session_active:
             st.session_state.session_active = False
-            session_df = st.session_state.session_logger.stop_session()
-            st.session_state.camera.stop()
+            filepath = save_session_log(st.session_state.session_logger)
+            release_camera()
+            st.session_state.audio_stream.stop()
+            st.session_state.audio_stream.recorder = None
+            if st.session_state.inference_pool is not None:
+                st.session_state.inference_pool.stop()
+                st.session_state.inference_pool = None
             
-            if not session_df.empty:
-                # Save session data
-                filepath = save_session_data(session_df, st.session_state.session_logger.session_id)
+            if st.session_state.input_recorder is not None:
+                recording_path = st.session_state.input_recorder.stop()
+                st.session_state.input_recorder = None
+                st.success(f"Raw inputs saved to: {recording_path}")
+            
+            if st.session_state.profiler is not None:
+                profile_paths = st.session_state.profiler.stop()
+                if profile_paths:
+                    st.success(f"Profile saved to: {profile_paths[0]}")
+            
+            if filepath is not None:
                 st.success(f"Session saved to: {filepath}")
+                
+                alerts_df = st.session_state.session_logger.get_alert_dataframe()
+                if not alerts_df.empty:
+                    save_alert_events(alerts_df, st.session_state.session_logger.session_id)
+                
+                # Save performance metrics alongside the session log
+                latency_df = st.session_state.perf_tracker.get_summary_dataframe()
+                if not latency_df.empty:
+                    save_performance_metrics(latency_df, st.session_state.session_logger.session_id)
             st.rerun()
         
+        # Session replay
+        display_replay_controls()
+        
         # Status indicators
         st.subheader("System Status")
-        camera_status = "🟢 Active" if (st.session_state.camera.is_active or simulation_mode) else "🔴 Inactive"
+        camera = get_camera()
+        camera_active = camera is not None and camera.is_active
+        camera_status = "🟢 Active" if (camera_active or simulation_mode) else "🔴 Inactive"
         mic_status = "🟢 Active" if (st.session_state.mic_capture.is_available or simulation_mode) else "🔴 Inactive"
         fer_status = "🟢 Active" if st.session_state.face_detector.is_available else "🔴 Inactive"
         
@@ -114,137 +222,580 @@ def main():
         
         # FER reinitialization button
         if st.button("🔄 Reinit Face Detector"):
-            from src.webcam.face_emotion import FaceEmotionDetector
-            st.session_state.face_detector = FaceEmotionDetector()
+            # Reload the shared models for every viewer, then give this one fresh tracks
+            registry = get_registry()
+            registry.reload('fer_model')
+            registry.reload('face_cascade')
+            st.session_state.face_detector = FaceEmotionDetector(st.session_state.perf_tracker)
             st.success("Face detector reinitialized!")
-            st.rerun()    
-    # Main tabs
-    tab1, tab2, tab3 = st.tabs(["Live Dashboard", "Session Report", "About"])
-    
-    with tab1:
-        live_dashboard()
+            st.rerun()
+        display_resource_controls()
+        
+        # Performance panel (refreshed in place by the live render loop)
+        perf_panel = st.empty()
+        render_performance_panel(perf_panel)
+        latency_df = st.session_state.perf_tracker.get_summary_dataframe()
+        if st.button("💾 Export Metrics") and not latency_df.empty:
+            metrics_path = save_performance_metrics(latency_df, st.session_state.session_logger.session_id)
+            st.success(f"Metrics saved to: {metrics_path}")
+        
+        # Memory snapshot diff for the profiled session
+        profiler = st.session_state.profiler
+        if profiler is not None:
+            snapshot_times = profiler.get_snapshot_times()
+            if len(snapshot_times) >= 2:
+                with st.expander("Memory Diff"):
+                    first, last = st.select_slider(
+                        "Snapshots",
+                        options=list(range(len(snapshot_times))),
+                        value=(0, len(snapshot_times) - 1),
+                        format_func=lambda i: f"+{snapshot_times[i]:.0f}s"
+                    )
+                    if first != last:
+                        display_memory_diff(profiler.compare_snapshots(first, last),
+                                            snapshot_times[first], snapshot_times[last])
+    
+    # Only the selected view is rendered, so the report is computed only when opened
+    view = st.radio("View", ["Live Dashboard", "Session Report", "About"],
+                    horizontal=True, key="active_view", label_visibility="collapsed")
+    
+    if view == "Live Dashboard":
+        live_dashboard(perf_panel)
+    elif view == "Session Report":
+        report_progress = session_report()
+        run_background_loop(report_progress)
+    else:
+        display_about_info()
+        run_background_loop()
+
+def display_profile_controls():
+    """Sidebar selector for the performance profile and its effective settings"""
+    runtime_config = st.session_state.runtime_config
+    runtime_config.reload_if_changed()
+    
+    profiles = list(PERFORMANCE_PROFILES)
+    profile = st.selectbox("Performance Profile", profiles, index=profiles.index(runtime_config.profile))
+    if profile != runtime_config.profile:
+        runtime_config.set_profile(profile)
+    # The profile is shared by every dashboard session in this process
+    st.caption(f"Profile from {runtime_config.profile_source}; applies to all sessions")
+    
+    for error in runtime_config.errors:
+        st.warning(f"Config: {error}")
+    
+    with st.expander("Effective Settings"):
+        st.json(runtime_config.as_dict())
+
+def display_resource_controls():
+    """Sidebar view of the shared resource registry, with warm-standby model reloads"""
+    registry = get_registry()
+    with st.expander("Shared Resources"):
+        st.dataframe(pd.DataFrame(registry.get_stats()), hide_index=True, use_container_width=True)
+        
+        # Build a replacement in the background while the live model keeps serving, then swap
+        name = st.selectbox("Model", ['fer_model', 'face_cascade'], key="standby_resource")
+        col1, col2 = st.columns(2)
+        if col1.button("Prepare Standby"):
+            if not registry.prepare_standby(name):
+                st.info("A standby is already being built")
+        if col2.button("Swap In"):
+            if registry.swap(name):
+                st.success(f"{name} swapped for all viewers")
+            else:
+                st.warning("No standby ready yet")
+
+def get_camera():
+    """The shared camera while this viewer's session holds it, else None"""
+    lease = st.session_state.camera_lease
+    return lease.value if lease is not None else None
+
+def start_camera():
+    """Take a reference on the shared camera and start it (a no-op if another session already did)"""
+    if st.session_state.camera_lease is None:
+        st.session_state.camera_lease = get_registry().acquire('camera')
+    camera = st.session_state.camera_lease.value
+    camera.start()
+    return camera
+
+def release_camera():
+    """Drop this viewer's camera reference; the last session to stop closes the device"""
+    lease = st.session_state.camera_lease
+    if lease is not None:
+        lease.release()
+        st.session_state.camera_lease = None
+
+def apply_preview_settings():
+    """Push the profile's preview settings to the encoder"""
+    runtime_config = st.session_state.runtime_config
+    # Keep the 4:3 analysis aspect ratio; the encoder only ever downscales
+    st.session_state.preview_encoder.configure(runtime_config.preview_width,
+                                               runtime_config.preview_width * 3 // 4,
+                                               runtime_config.preview_quality,
+                                               runtime_config.preview_max_fps)
+
+def display_preview_controls():
+    """Sidebar controls for the dashboard video preview"""
+    with st.expander("Video Preview"):
+        st.checkbox("Show Video Preview", value=PREVIEW_ENABLED, key="preview_enabled")
+        
+        stats = st.session_state.preview_encoder.get_stats()
+        if stats['encoded']:
+            st.caption(f"{stats['encoded']} previews sent, {stats['avg_kb']:.1f} KB avg, "
+                       f"{stats['rate_limited']} skipped by the FPS cap")
+
+def viewer_connected():
+    """Whether a browser is still attached to this script's session"""
+    try:
+        ctx = get_script_run_ctx()
+        if ctx is None or not runtime.exists():
+            return True
+        return runtime.get_instance().is_active_session(ctx.session_id)
+    except Exception:
+        return True
+
+def render_performance_panel(perf_panel):
+    """Render the sidebar performance panel into its placeholder"""
+    latency_df = st.session_state.perf_tracker.get_summary_dataframe()
+    face_detector = st.session_state.face_detector
+    cache_stats = face_detector.result_cache.get_stats() if face_detector.result_cache is not None else None
+    camera = get_camera()
+    with perf_panel.container():
+        inference_pool = st.session_state.inference_pool
+        display_performance_panel(latency_df, st.session_state.perf_tracker.get_fps(),
+                                  face_detector.get_gate_stats(), cache_stats,
+                                  camera.get_stats() if camera is not None else None,
+                                  inference_pool.get_stats() if inference_pool is not None else None)
+
+def run_background_loop(report_progress=None):
+    """Keep sampling the live session and polling report progress while another view is open"""
+    job = st.session_state.report_job
+    polling_job = report_progress is not None and job is not None and not job.is_finished
+    if not st.session_state.session_active and not polling_job:
+        return
     
-    with tab2:
-        session_report()
+    status = st.empty()
+    while True:
+        tick_start = time.monotonic()
+        if st.session_state.session_active:
+            process_live_tick()
+            sample_count = st.session_state.session_logger.total_records
+            status.caption(f"🔴 Session running in the background - {sample_count} samples logged")
+        
+        if polling_job:
+            if job.is_finished:
+                # Rerun once so the download button appears
+                st.rerun()
+            report_progress.progress(job.progress, text=f"📄 {job.message}")
+        elif not st.session_state.session_active:
+            break
+        
+        time.sleep(max(0.0, st.session_state.runtime_config.refresh_interval - (time.monotonic() - tick_start)))
+
+def display_replay_controls():
+    """Sidebar controls for replaying a saved session"""
+    with st.expander("Session Replay", expanded=st.session_state.replay is not None):
+        if st.session_state.session_active:
+            st.caption("Stop the live session to replay a saved one.")
+            return
+        
+        sessions = list_saved_sessions()
+        if not sessions:
+            st.caption("No saved sessions found.")
+            return
+        
+        selected = st.selectbox("Saved session", sessions, format_func=os.path.basename)
+        speed = st.slider("Speed", REPLAY_MIN_SPEED, REPLAY_MAX_SPEED, 1.0, step=1.0, format="%.0fx")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("▶ Load"):
+                st.session_state.replay = SessionReplay(selected, speed)
+                st.session_state.replay.play()
+                st.rerun()
+        with col2:
+            if st.button("⏹ Close") and st.session_state.replay is not None:
+                st.session_state.replay = None
+                st.rerun()
+        
+        replay = st.session_state.replay
+        if replay is None:
+            return
+        
+        if speed != replay.speed:
+            replay.set_speed(speed)
+        
+        if replay.is_playing:
+            if st.button("⏸ Pause"):
+                replay.pause()
+                st.rerun()
+        elif st.button("▶ Play"):
+            replay.play()
+            st.rerun()
+        
+        def seek_replay():
+            st.session_state.replay.seek(st.session_state.replay_seek)
+        
+        st.slider("Seek (s)", 0.0, max(replay.duration_s, 1.0), key="replay_seek", on_change=seek_replay)
+
+def replay_dashboard():
+    """Render a saved session through the live dashboard widgets"""
+    replay = st.session_state.replay
+    if replay.current_sample() is None:
+        st.info("The selected session has no data to replay.")
+        return
     
-    with tab3:
-        display_about_info()
+    placeholders = {
+        'status': st.empty(),
+        'progress': st.empty(),
+        'timestamp': st.empty(),
+        'metrics': st.empty(),
+        'state': st.empty(),
+        'alerts': st.empty(),
+        'timeline': st.empty()
+    }
+    col1, col2 = st.columns(2)
+    with col1:
+        placeholders['gauge'] = st.empty()
+    with col2:
+        placeholders['pie'] = st.empty()
+    placeholders['breakdown'] = st.empty()
+    
+    tick_count = 0
+    while True:
+        tick_start = time.monotonic()
+        st.session_state.runtime_config.reload_if_changed()
+        render_replay_tick(placeholders, replay, tick_count)
+        tick_count += 1
+        
+        if not replay.is_playing:
+            break
+        if replay.is_finished:
+            replay.pause()
+            # Rerun once so the sidebar shows the paused controls
+            st.rerun()
+        
+        time.sleep(max(0.0, st.session_state.runtime_config.refresh_interval - (time.monotonic() - tick_start)))
+
+def render_replay_tick(placeholders, replay, tick_count):
+    """Update the replay placeholders with the sample at the current position"""
+    sample = replay.current_sample()
+    fused_metrics = sample['fused_metrics']
+    face_emotions = sample['face_emotions']
+    df = replay.history()
+    
+    placeholders['status'].info(f"⏪ Replaying session {replay.session_id} at {replay.speed:.0f}x")
+    placeholders['progress'].progress(min(replay.elapsed_s / max(replay.duration_s, 1e-9), 1.0),
+                                      text=f"{replay.elapsed_s:.0f}s / {replay.duration_s:.0f}s")
+    placeholders['timestamp'].write(f"**Recorded At:** {sample['timestamp'].strftime('%H:%M:%S')}")
+    
+    with placeholders['metrics'].container():
+        display_metrics_cards(fused_metrics)
+    with placeholders['state'].container():
+        display_dominant_state(fused_metrics['dominant_state'])
+    with placeholders['alerts'].container():
+        display_active_alerts(replay.active_alerts(), sample['timestamp'])
     
-    # Auto-refresh only when session is active and on Live Dashboard tab
-    if st.session_state.get('session_active', False):
-        time.sleep(2)
-        st.rerun()
+    if len(df) > 0:
+        timeline_chart = create_timeline_chart(df, TIMELINE_SECONDS, end_time=sample['timestamp'],
+                                               max_points=st.session_state.runtime_config.chart_points)
+        placeholders['timeline'].plotly_chart(timeline_chart, use_container_width=True,
+                                              key=f"replay_timeline_{tick_count}")
+    
+    placeholders['gauge'].plotly_chart(create_stress_gauge(fused_metrics['stress']),
+                                       use_container_width=True, key=f"replay_gauge_{tick_count}")
+    placeholders['pie'].plotly_chart(create_emotion_pie_chart(face_emotions),
+                                     use_container_width=True, key=f"replay_pie_{tick_count}")
+    
+    with placeholders['breakdown'].container():
+        display_emotion_breakdown(face_emotions)
 
-def live_dashboard():
+def live_dashboard(perf_panel):
     """Live dashboard tab"""
+    if st.session_state.replay is not None and not st.session_state.session_active:
+        replay_dashboard()
+        return
+    
     if not st.session_state.session_active:
         st.info("Start a session to begin monitoring emotions.")
         return
     
-    # Add refresh button
-    col1, col2 = st.columns([3, 1])
+    # Placeholders are created once and updated in place on every tick
+    placeholders = create_live_placeholders()
+    tick_count = 0
+    while st.session_state.session_active:
+        tick_start = time.monotonic()
+        tick = process_live_tick()
+        render_live_tick(placeholders, tick, tick_count)
+        render_performance_panel(perf_panel)
+        tick_count += 1
+        time.sleep(max(0.0, st.session_state.runtime_config.refresh_interval - (time.monotonic() - tick_start)))
+
+def create_live_placeholders():
+    """Lay out the live dashboard as empty slots"""
+    placeholders = {
+        'status': st.empty(),
+        'timestamp': st.empty(),
+        'video': st.empty(),
+        'metrics': st.empty(),
+        'audio_level': st.empty(),
+        'state': st.empty(),
+        'alerts': st.empty(),
+        'people': st.empty(),
+        'timeline': st.empty()
+    }
+    col1, col2 = st.columns(2)
+    with col1:
+        placeholders['gauge'] = st.empty()
     with col2:
-        if st.button("🔄 Refresh"):
-            st.rerun()
+        placeholders['pie'] = st.empty()
+    placeholders['breakdown'] = st.empty()
+    placeholders['audio_details'] = st.empty()
+    return placeholders
+
+def process_live_tick():
+    """Capture, analyze, fuse and log one sample without rendering anything"""
+    tracker = st.session_state.perf_tracker
+    # Pick up edits to the runtime config file while the session runs
+    st.session_state.runtime_config.reload_if_changed()
     
     # Process current frame/audio
+    audio_sample = None
     if st.session_state.simulation_mode:
         # Simulation mode - use fallback generator
         face_emotions = st.session_state.fallback_generator.generate_face_emotions()
         audio_stress_score = st.session_state.fallback_generator.generate_audio_stress()
+        speech_detected = True
+        fused_people = {}
         frame = None
-        st.info("🎭 Simulation Mode Active - Generating synthetic emotions")
+        status = ('info', "🎭 Simulation Mode Active - Generating synthetic emotions")
+        
+        # Fuse emotions
+        with tracker.track('fusion'):
+            fused_metrics = st.session_state.fusion_engine.fuse_emotions(face_emotions, audio_stress_score)
+        is_new_sample = True
     else:
         # Live mode - try to use camera and FER
-        if not st.session_state.camera.is_active:
-            st.session_state.camera.start()
+        camera = get_camera()
+        if camera is None or not camera.is_active:
+            camera = start_camera()
+        if not st.session_state.audio_stream.is_active:
+            st.session_state.audio_stream.start()
         
-        frame = st.session_state.camera.get_frame()
+        # The grabber thread keeps the newest frame; this never waits on the device
+        with tracker.track('frame_grab'):
+            latest = camera.latest()
+        if latest is not None:
+            frame, frame_time, _ = latest
+        else:
+            frame, frame_time = None, time.monotonic()
+        
+        recorder = st.session_state.input_recorder
+        if recorder is not None:
+            recorder.record_frame(frame, frame_time)
         
-        if frame is not None and st.session_state.face_detector.is_available:
-            # Use real FER detection
-            emotion_result = st.session_state.face_detector.detect_emotions(frame)
-            if isinstance(emotion_result, dict):
-                face_emotions = emotion_result['probs']
-                frame = st.session_state.face_detector.draw_emotion_box(frame, emotion_result)
-                st.success("🎥 Live FER Detection Active")
+        face_detector = st.session_state.face_detector
+        inference_pool = st.session_state.inference_pool
+        if inference_pool is not None:
+            failure = inference_pool.check_health()
+            if failure is not None:
+                # Stale worker results must not keep being drawn as live; detect in-process instead
+                print(f"Inference workers unavailable ({failure}) - falling back to in-process detection")
+                inference_pool.stop()
+                st.session_state.inference_pool = inference_pool = None
+                st.session_state.inference_fallback = failure
+        people = []
+        face_samples = []  # (capture time, headline emotions, people) to fuse
+        if frame is not None and inference_pool is not None:
+            # Inference runs in worker processes; results for earlier frames arrive here
+            inference_pool.submit(frame, timestamp=frame_time)
+            for result in inference_pool.poll():
+                tracker.record('worker_inference', result['inference_s'])
+                if result['roundtrip_s'] is not None:
+                    tracker.record('worker_roundtrip', result['roundtrip_s'])
+                result_people = result['people']
+                headline = result_people[0]['probs'] if result_people else face_detector.get_neutral_emotions()
+                face_samples.append((result['timestamp'], headline, result_people))
+            
+            latest_result = inference_pool.latest()
+            people = latest_result['people'] if latest_result is not None else []
+            face_emotions = people[0]['probs'] if people else face_detector.get_neutral_emotions()
+            if latest_result is None:
+                status = ('info', "⚙️ Waiting for the first worker FER result")
             else:
-                # Fallback if old format returned
-                face_emotions = st.session_state.fallback_generator.generate_face_emotions()
-                st.warning("📹 FER format issue - Using dynamic fallback")
+                status = ('success', f"⚙️ Worker FER Detection Active - {len(people)} face(s) tracked")
+        elif frame is not None and face_detector.is_available:
+            # Track and classify every face; the largest one drives the headline metrics
+            people = face_detector.detect_people(frame)
+            face_emotions = people[0]['probs'] if people else face_detector.get_neutral_emotions()
+            face_samples.append((frame_time, face_emotions, people))
+            status = ('success', f"🎥 Live FER Detection Active - {len(people)} face(s) tracked")
+            if st.session_state.inference_fallback:
+                status = ('warning', f"🎥 Inference workers unavailable ({st.session_state.inference_fallback}) - "
+                                     f"FER running in-process - {len(people)} face(s) tracked")
         elif frame is not None:
             # Camera works but FER failed
             face_emotions = st.session_state.fallback_generator.generate_face_emotions()
-            st.warning("📹 Camera active but FER unavailable - Using dynamic fallback")
+            face_samples.append((frame_time, face_emotions, []))
+            status = ('warning', "📹 Camera active but FER unavailable - Using dynamic fallback")
         else:
             # No camera frame
             face_emotions = st.session_state.fallback_generator.generate_face_emotions()
-            st.error("📷 Camera unavailable - Using dynamic fallback")
+            face_samples.append((frame_time, face_emotions, []))
+            status = ('error', "📷 Camera unavailable - Using dynamic fallback")
         
-        # Capture audio
-        audio_data = st.session_state.mic_capture.capture_audio_chunk()
-        audio_stress_score = st.session_state.audio_analyzer.analyze_stress(audio_data)
-    
-    # Fuse emotions
-    fused_metrics = st.session_state.fusion_engine.fuse_emotions(face_emotions, audio_stress_score)
+        for person in people:
+            frame = face_detector.draw_emotion_box(frame, person)
+        
+        # Audio is captured by the background stream; fuse time-aligned samples
+        fusion_buffer = st.session_state.fusion_buffer
+        for sample_time, sample_emotions, sample_people in face_samples:
+            fusion_buffer.push_face(sample_time, sample_emotions,
+                                    {person['person_id']: person['probs'] for person in sample_people})
+        with tracker.track('fusion'):
+            aligned = fusion_buffer.poll()
+        is_new_sample = aligned is not None
+        if aligned is None:
+            # Between output slots, fuse the face result shown this tick so the metric cards
+            # agree with the emotion readout and the person boxes
+            aligned = fusion_buffer.fuse_at(frame_time)
+        if aligned is None:
+            # No face result close enough to align with (e.g. waiting for the first worker
+            # result): fuse what is shown without audio
+            fusion_engine = st.session_state.fusion_engine
+            aligned = {
+                'fused_metrics': fusion_engine.fuse_emotions(face_emotions, 0.0, False),
+                'people': {
+                    person['person_id']: {
+                        'face_emotions': person['probs'],
+                        'fused_metrics': fusion_engine.fuse_emotions(person['probs'], 0.0, False)
+                    }
+                    for person in people
+                },
+                'audio_stress_score': 0.0,
+                'speech_detected': False
+            }
+        
+        fused_metrics = aligned['fused_metrics']
+        fused_people = aligned['people']
+        audio_stress_score = aligned['audio_stress_score']
+        speech_detected = aligned['speech_detected']
+        audio_sample = st.session_state.audio_stream.latest
     
     # Log data
-    st.session_state.session_logger.log_data(face_emotions, audio_stress_score, fused_metrics)
+    with tracker.track('logging'):
+        if is_new_sample:
+            # One row per tracked person; alerts follow the headline (largest face)
+            if fused_people:
+                st.session_state.session_logger.log_people(fused_people, audio_stress_score)
+            else:
+                st.session_state.session_logger.log_data(face_emotions, audio_stress_score, fused_metrics)
+            alert_events = st.session_state.alert_engine.update(fused_metrics, face_emotions)
+            st.session_state.session_logger.log_alert_events(alert_events)
+            
+            # Push to local stream subscribers
+            publisher = get_publisher()
+            if publisher is not None:
+                session_id = st.session_state.session_logger.session_id
+                publisher.publish('sample', {
+                    'session_id': session_id,
+                    'timestamp': datetime.now(),
+                    'audio_stress_score': audio_stress_score,
+                    **face_emotions,
+                    **fused_metrics
+                })
+                for event in alert_events:
+                    publisher.publish('alert', {'session_id': session_id, **event})
+    
+    tracker.mark_tick()
+    
+    return {
+        'status': status,
+        'frame': frame,
+        'face_emotions': face_emotions,
+        'fused_metrics': fused_metrics,
+        'people': fused_people,
+        'audio_stress_score': audio_stress_score,
+        'speech_detected': speech_detected,
+        'audio_sample': audio_sample
+    }
+
+def render_live_tick(placeholders, tick, tick_count):
+    """Update the live dashboard placeholders with the latest tick"""
+    tracker = st.session_state.perf_tracker
+    face_emotions = tick['face_emotions']
+    fused_metrics = tick['fused_metrics']
+    audio_sample = tick['audio_sample']
     
-    # Get current session data
-    df = st.session_state.session_logger.get_session_dataframe()
+    level, message = tick['status']
+    getattr(placeholders['status'], level)(message)
     
     # Show current timestamp
-    st.write(f"**Last Update:** {datetime.now().strftime('%H:%M:%S')}")
-    
-    # Display video feed
-    if frame is not None:
-        st.image(frame, channels="BGR", caption="Live Video Feed")
-    else:
-        st.info("Video feed not available - using simulation mode")
+    placeholders['timestamp'].write(f"**Last Update:** {datetime.now().strftime('%H:%M:%S')}")
+    
+    # Display video feed as a downscaled JPEG, only when someone is watching it
+    if tick['frame'] is None:
+        placeholders['video'].info("Video feed not available - using simulation mode")
+    elif not st.session_state.get('preview_enabled', PREVIEW_ENABLED):
+        placeholders['video'].caption("Video preview hidden")
+    elif viewer_connected():
+        apply_preview_settings()
+        with tracker.track('preview_encode'):
+            preview = st.session_state.preview_encoder.encode(tick['frame'])
+        # None means the preview FPS cap skipped this frame; keep the previous image
+        if preview is not None:
+            placeholders['video'].image(preview, caption="Live Video Feed")
     
     # Display metrics
-    display_metrics_cards(fused_metrics)
+    with placeholders['metrics'].container():
+        display_metrics_cards(fused_metrics)
     
     # Show audio level indicator
     if not st.session_state.simulation_mode:
-        audio_level = np.sqrt(np.mean(audio_data**2)) if 'audio_data' in locals() else 0
-        st.progress(min(audio_level * 10, 1.0), text=f"🎤 Audio Level: {audio_level:.3f}")
+        audio_level = float(np.sqrt(np.mean(audio_sample['audio_data']**2))) if audio_sample is not None else 0.0
+        placeholders['audio_level'].progress(min(audio_level * 10, 1.0), text=f"🎤 Audio Level: {audio_level:.3f}")
     
     # Display dominant state
-    display_dominant_state(fused_metrics['dominant_state'])
-    
-    # Check for stress alert
-    if len(df) > 0:
-        stress_history = df['stress'].tolist()
-        display_stress_alert(stress_history, STRESS_THRESHOLD, ALERT_DURATION)
-    
-    # Display charts
-    if len(df) > 0:
-        timeline_chart = create_timeline_chart(df, TIMELINE_SECONDS)
-        st.plotly_chart(timeline_chart, use_container_width=True)
-    
-    col1, col2 = st.columns(2)
-    with col1:
+    with placeholders['state'].container():
+        display_dominant_state(fused_metrics['dominant_state'])
+    
+    # Display raised alerts
+    with placeholders['alerts'].container():
+        display_active_alerts(st.session_state.alert_engine.get_active_alerts())
+    
+    # Per-person readings when several faces are tracked
+    with placeholders['people'].container():
+        display_people_table(tick['people'])
+    
+    # Display charts; only the visible timeline window is materialized
+    with tracker.track('chart_building'):
+        df = st.session_state.session_logger.get_recent_dataframe(TIMELINE_SECONDS)
+        chart_points = st.session_state.runtime_config.chart_points
+        timeline_chart = create_timeline_chart(df, TIMELINE_SECONDS, max_points=chart_points) if len(df) > 0 else None
         gauge_chart = create_stress_gauge(fused_metrics['stress'])
-        st.plotly_chart(gauge_chart, use_container_width=True)
-    
-    with col2:
         pie_chart = create_emotion_pie_chart(face_emotions)
-        st.plotly_chart(pie_chart, use_container_width=True)
+    
+    # Per-tick keys keep chart IDs unique across in-place updates within one script run
+    if timeline_chart is not None:
+        placeholders['timeline'].plotly_chart(timeline_chart, use_container_width=True,
+                                              key=f"live_timeline_{tick_count}")
+    placeholders['gauge'].plotly_chart(gauge_chart, use_container_width=True, key=f"live_gauge_{tick_count}")
+    placeholders['pie'].plotly_chart(pie_chart, use_container_width=True, key=f"live_pie_{tick_count}")
     
     # Display emotion breakdown
-    display_emotion_breakdown(face_emotions)
+    with placeholders['breakdown'].container():
+        display_emotion_breakdown(face_emotions)
     
     # Show audio analysis details
-    if not st.session_state.simulation_mode and 'audio_data' in locals():
-        st.subheader("🎤 Audio Analysis")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Audio Stress Score", f"{audio_stress_score:.3f}")
-        with col2:
-            rms_energy = np.sqrt(np.mean(audio_data**2))
-            st.metric("RMS Energy", f"{rms_energy:.4f}")
+    if audio_sample is not None:
+        with placeholders['audio_details'].container():
+            st.subheader("🎤 Audio Analysis")
+            col1, col2 = st.columns(2)
+            with col1:
+                audio_score_text = f"{tick['audio_stress_score']:.3f}" if tick['speech_detected'] else "No speech"
+                st.metric("Audio Stress Score", audio_score_text)
+            with col2:
+                rms_energy = np.sqrt(np.mean(audio_sample['audio_data']**2))
+                st.metric("RMS Energy", f"{rms_energy:.4f}")
 
 def session_report():
     """Session report tab"""
@@ -256,7 +807,7 @@ def session_report():
     
     if df.empty:
         st.info("No session data available. Start a session to generate reports.")
-        return
+        return None
     
     # Display session statistics
     col1, col2 = st.columns(2)
@@ -280,7 +831,8 @@ def session_report():
     
     col1, col2 = st.columns(2)
     with col1:
-        timeline_chart = create_timeline_chart(df, len(df))
+        chart_points = st.session_state.runtime_config.chart_points
+        timeline_chart = create_timeline_chart(df, len(df), max_points=chart_points)
         st.plotly_chart(timeline_chart, use_container_width=True)
     
     with col2:
@@ -307,19 +859,28 @@ def session_report():
     
     with col2:
         if st.button("Generate PDF Report"):
-            try:
-                pdf_path = st.session_state.report_generator.generate_pdf_report(session_stats, df)
-                if pdf_path:
-                    st.success(f"PDF report generated: {pdf_path}")
-                    with open(pdf_path, "rb") as pdf_file:
-                        st.download_button(
-                            label="Download PDF",
-                            data=pdf_file.read(),
-                            file_name=f"emotion_report_{session_stats['session_id']}.pdf",
-                            mime="application/pdf"
-                        )
-            except Exception as e:
-                st.error(f"Error generating PDF: {e}")
+            st.session_state.report_job = st.session_state.report_worker.submit(session_stats, df)
+        
+        job = st.session_state.report_job
+        if job is not None:
+            if not job.is_finished:
+                # Progress is refreshed in place by the background loop
+                report_progress = st.empty()
+                report_progress.progress(job.progress, text=f"📄 {job.message}")
+                return report_progress
+            elif job.status == 'failed':
+                st.error(f"Error generating PDF: {job.error}")
+            else:
+                cache_note = " (cached)" if job.cached else ""
+                st.success(f"PDF report generated{cache_note}: {job.result_path}")
+                with open(job.result_path, "rb") as pdf_file:
+                    st.download_button(
+                        label="Download PDF",
+                        data=pdf_file.read(),
+                        file_name=f"emotion_report_{session_stats['session_id']}.pdf",
+                        mime="application/pdf"
+                    )
+    return None
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
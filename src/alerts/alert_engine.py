@@ -0,0 +1,89 @@
+from datetime import datetime
+from src.config import ALERT_RULES
+from src.utils import calculate_negative_score
+
+class AlertRule:
+    """One time-based alert rule with enter/exit hysteresis, updated in O(1) per sample"""
+    def __init__(self, name, label, metric, direction, enter, exit, enter_seconds, exit_seconds):
+        self.name = name
+        self.label = label
+        self.metric = metric
+        self.direction = direction
+        self.enter = enter
+        self.exit = exit
+        self.enter_seconds = enter_seconds
+        self.exit_seconds = exit_seconds
+        self.reset()
+    
+    def reset(self):
+        self.is_active = False
+        self.raised_at = None
+        self._condition_since = None  # Start of the current enter (or exit) streak
+    
+    def _entering(self, value):
+        return value > self.enter if self.direction == 'above' else value < self.enter
+    
+    def _exiting(self, value):
+        return value < self.exit if self.direction == 'above' else value > self.exit
+    
+    def update(self, timestamp, value):
+        """Feed one sample; returns 'raised', 'cleared' or None"""
+        condition = self._exiting(value) if self.is_active else self._entering(value)
+        if not condition:
+            self._condition_since = None
+            return None
+        
+        if self._condition_since is None:
+            self._condition_since = timestamp
+        
+        held = (timestamp - self._condition_since).total_seconds()
+        if not self.is_active and held >= self.enter_seconds:
+            self.is_active = True
+            self.raised_at = self._condition_since
+            self._condition_since = None
+            return 'raised'
+        if self.is_active and held >= self.exit_seconds:
+            self.is_active = False
+            self._condition_since = None
+            return 'cleared'
+        return None
+
+class AlertEngine:
+    def __init__(self, rules=None):
+        self.rules = [AlertRule(**rule) for rule in (rules if rules is not None else ALERT_RULES)]
+    
+    def reset(self):
+        for rule in self.rules:
+            rule.reset()
+    
+    def update(self, fused_metrics, face_emotions=None, timestamp=None):
+        """Feed one fused sample to every rule and return any raised/cleared events"""
+        timestamp = timestamp or datetime.now()
+        values = dict(fused_metrics)
+        if face_emotions is not None:
+            values['negative_score'] = calculate_negative_score(face_emotions)
+        
+        events = []
+        for rule in self.rules:
+            value = values.get(rule.metric)
+            if value is None:
+                continue
+            
+            transition = rule.update(timestamp, value)
+            if transition is not None:
+                events.append({
+                    'timestamp': timestamp,
+                    'alert': rule.name,
+                    'event': transition,
+                    'value': float(value),
+                    'active_since': rule.raised_at
+                })
+        return events
+    
+    def get_active_alerts(self):
+        """Currently raised alerts"""
+        return [
+            {'alert': rule.name, 'label': rule.label, 'since': rule.raised_at, 'threshold': rule.enter,
+             'direction': rule.direction, 'metric': rule.metric}
+            for rule in self.rules if rule.is_active
+        ]
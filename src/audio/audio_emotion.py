@@ -1,14 +1,31 @@
+import threading
 import numpy as np
 import librosa
-from src.config import AUDIO_SAMPLE_RATE
+from src.config import AUDIO_SAMPLE_RATE, VAD_ENABLED
+from src.audio.vad import VoiceActivityDetector
 
 class AudioEmotionAnalyzer:
     def __init__(self):
         self.sample_rate = AUDIO_SAMPLE_RATE
+        self.vad = VoiceActivityDetector(self.sample_rate) if VAD_ENABLED else None
+        self.last_speech_detected = True
+        self._lock = threading.Lock()
+    
+    def analyze(self, audio_data):
+        """Return (stress score, speech detected) atomically, so one analyzer can serve several streams"""
+        with self._lock:
+            stress = self.analyze_stress(audio_data)
+            return stress, self.last_speech_detected
     
     def analyze_stress(self, audio_data):
-        """Analyze stress level from audio data"""
+        """Analyze stress level from audio data (0.0 and no speech flagged for non-speech)"""
         try:
+            # Skip feature extraction for silence and background noise
+            if self.vad is not None:
+                self.last_speech_detected = self.vad.analyze(audio_data)['is_speech']
+                if not self.last_speech_detected:
+                    return 0.0
+            
             # Extract audio features
             features = self._extract_features(audio_data)
             
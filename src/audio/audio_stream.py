@@ -0,0 +1,151 @@
+import time
+import queue
+import threading
+import numpy as np
+from src.config import AUDIO_HUB_QUEUE_SIZE
+from src.perf.latency import track_stage
+from src.runtime_config import get_runtime_config
+
+class AudioCaptureHub:
+    """Records the shared microphone once and fans every chunk out to each subscribed stream,
+    so any number of sessions get the full audio at their own hop"""
+    def __init__(self, mic_capture, runtime_config=None, queue_size=AUDIO_HUB_QUEUE_SIZE):
+        self.mic_capture = mic_capture
+        self.runtime_config = runtime_config if runtime_config is not None else get_runtime_config()
+        self.queue_size = queue_size
+        self.stats = {'chunks': 0, 'dropped': 0}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+    
+    @property
+    def sample_rate(self):
+        return self.mic_capture.sample_rate
+    
+    def subscribe(self):
+        """Start receiving (capture end time, audio chunk, capture seconds); capture starts with
+        the first subscriber"""
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.append(subscriber)
+            # A thread told to stop finishes its current chunk and exits; start a fresh one
+            if self._thread is None or self._stop_event.is_set() or not self._thread.is_alive():
+                self._stop_event = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stop_event,),
+                                                name="audio-capture", daemon=True)
+                self._thread.start()
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        """Stop delivering to a subscriber; capture stops with the last one"""
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+            if not self._subscribers:
+                self._stop_event.set()
+    
+    def _run(self, stop_event):
+        while not stop_event.is_set():
+            started = time.monotonic()
+            hop = self.runtime_config.audio_hop
+            chunk = self.mic_capture.capture_audio_chunk(hop)
+            captured = time.monotonic()
+            
+            with self._lock:
+                subscribers = list(self._subscribers)
+            item = (captured, chunk, captured - started)
+            for subscriber in subscribers:
+                try:
+                    subscriber.put_nowait(item)
+                except queue.Full:
+                    # A stalled session loses its oldest chunk instead of holding up the others
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+                    subscriber.put_nowait(item)
+                    self.stats['dropped'] += 1
+            self.stats['chunks'] += 1
+            
+            # Fallback audio returns instantly; keep to the hop rate
+            remaining = hop - (time.monotonic() - started)
+            if remaining > 0:
+                stop_event.wait(remaining)
+    
+    def stop(self):
+        with self._lock:
+            self._subscribers = []
+            self._stop_event.set()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.runtime_config.audio_hop + 1.0)
+
+class AudioStreamWorker:
+    """Scores a sliding window over the shared capture stream every hop, on its own thread"""
+    def __init__(self, capture_hub, audio_analyzer, on_result=None, latency_tracker=None, runtime_config=None):
+        self.capture_hub = capture_hub
+        self.audio_analyzer = audio_analyzer
+        self.on_result = on_result
+        self.latency_tracker = latency_tracker
+        self.runtime_config = runtime_config if runtime_config is not None else get_runtime_config()
+        self.recorder = None
+        self.latest = None  # Most recent {'timestamp', 'audio_data', 'stress', 'speech_detected'}
+        self.is_active = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._subscription = None
+        self._window = np.zeros(0, dtype=np.float32)  # Audio scored on the last pass
+    
+    def start(self):
+        if self.is_active:
+            return
+        self._stop_event.clear()
+        self._window = np.zeros(0, dtype=np.float32)
+        self._subscription = self.capture_hub.subscribe()
+        self.is_active = True
+        self._thread = threading.Thread(target=self._run, args=(self._subscription,),
+                                        name="audio-stream", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if not self.is_active:
+            return
+        self._stop_event.set()
+        self.capture_hub.unsubscribe(self._subscription)
+        self._thread.join(timeout=1.0)
+        self._subscription = None
+        self.is_active = False
+    
+    def _run(self, subscription):
+        sample_rate = self.capture_hub.sample_rate
+        while not self._stop_event.is_set():
+            try:
+                captured, chunk, capture_s = subscription.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if self.latency_tracker is not None:
+                self.latency_tracker.record('audio_capture', capture_s)
+            
+            if self.recorder is not None:
+                self.recorder.record_audio(chunk, captured)
+            
+            # Score the last `window` seconds; windows overlap when the hop is shorter.
+            # The window is re-read every pass so profile changes apply live
+            window_samples = int(self.runtime_config.audio_window * sample_rate)
+            audio_data = np.concatenate([self._window, chunk])[-window_samples:]
+            self._window = audio_data
+            # Timestamp the middle of the scored window
+            capture_time = captured - len(audio_data) / sample_rate / 2
+            
+            with track_stage(self.latency_tracker, 'audio_features'):
+                stress, speech_detected = self.audio_analyzer.analyze(audio_data)
+            
+            self.latest = {
+                'timestamp': capture_time,
+                'audio_data': audio_data,
+                'stress': stress,
+                'speech_detected': speech_detected
+            }
+            if self.on_result is not None:
+                self.on_result(capture_time, stress, speech_detected)
@@ -1,3 +1,4 @@
+import threading
 import sounddevice as sd
 import numpy as np
 from src.config import AUDIO_SAMPLE_RATE, AUDIO_CHUNK_DURATION, AUDIO_CHANNELS
@@ -7,6 +8,7 @@ class MicrophoneCapture:
         self.sample_rate = AUDIO_SAMPLE_RATE
         self.chunk_duration = AUDIO_CHUNK_DURATION
         self.channels = AUDIO_CHANNELS
+        self._lock = threading.Lock()  # One recording at a time; live sessions share it through AudioCaptureHub
         self.is_available = self._test_microphone()
     
     def _test_microphone(self):
@@ -18,27 +20,28 @@ class MicrophoneCapture:
             print(f"Microphone not available: {e}")
             return False
     
-    def capture_audio_chunk(self):
-        """Capture audio chunk from microphone"""
+    def capture_audio_chunk(self, duration=None):
+        """Capture audio chunk from microphone; duration defaults to chunk_duration"""
+        if duration is None:
+            duration = self.chunk_duration
         if not self.is_available:
-            return self._generate_dummy_audio()
+            return self._generate_dummy_audio(duration)
         
         try:
-            duration = self.chunk_duration
-            audio_data = sd.rec(
-                int(duration * self.sample_rate),
-                samplerate=self.sample_rate,
-                channels=self.channels,
-                dtype=np.float32
-            )
-            sd.wait()  # Wait for recording to complete
+            with self._lock:
+                audio_data = sd.rec(
+                    int(duration * self.sample_rate),
+                    samplerate=self.sample_rate,
+                    channels=self.channels,
+                    dtype=np.float32
+                )
+                sd.wait()  # Wait for recording to complete
             return audio_data.flatten()
         except Exception as e:
             print(f"Audio capture error: {e}")
-            return self._generate_dummy_audio()
+            return self._generate_dummy_audio(duration)
     
-    def _generate_dummy_audio(self):
+    def _generate_dummy_audio(self, duration):
         """Generate dummy audio data for fallback"""
-        duration = self.chunk_duration
         samples = int(duration * self.sample_rate)
         return np.random.normal(0, 0.1, samples).astype(np.float32)
\ No newline at end of file
@@ -0,0 +1,39 @@
+import numpy as np
+from src.config import (AUDIO_SAMPLE_RATE, VAD_FRAME_MS, VAD_ENERGY_THRESHOLD, VAD_NOISE_FLOOR_FACTOR,
+                        VAD_MAX_ZCR, VAD_MIN_SPEECH_RATIO)
+
+class VoiceActivityDetector:
+    def __init__(self, sample_rate=AUDIO_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(sample_rate * VAD_FRAME_MS / 1000))
+        self.noise_floor = None  # Running estimate of background frame RMS
+    
+    def analyze(self, audio_data):
+        """Classify an audio chunk as speech or not using frame energy and ZCR"""
+        audio = np.asarray(audio_data, dtype=np.float32).ravel()
+        frame_count = len(audio) // self.frame_length
+        if frame_count == 0:
+            return {'is_speech': False, 'speech_ratio': 0.0, 'rms': 0.0}
+        
+        frames = audio[:frame_count * self.frame_length].reshape(frame_count, self.frame_length)
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        
+        # Quietest frames of the chunk track the background level: follow drops
+        # immediately, rises slowly so sustained speech does not raise the floor
+        chunk_floor = float(np.percentile(rms, 10))
+        if self.noise_floor is None or chunk_floor < self.noise_floor:
+            self.noise_floor = chunk_floor
+        else:
+            self.noise_floor = 0.9 * self.noise_floor + 0.1 * chunk_floor
+        
+        energy_threshold = max(VAD_ENERGY_THRESHOLD, self.noise_floor * VAD_NOISE_FLOOR_FACTOR)
+        speech_frames = (rms > energy_threshold) & (zcr < VAD_MAX_ZCR)
+        speech_ratio = float(np.mean(speech_frames))
+        
+        return {
+            'is_speech': speech_ratio >= VAD_MIN_SPEECH_RATIO,
+            'speech_ratio': speech_ratio,
+            'rms': float(np.sqrt(np.mean(audio ** 2)))
+        }
@@ -11,12 +11,20 @@ REPORTS_DIR = os.path.join(OUTPUTS_DIR, "reports")
 AUDIO_SAMPLE_RATE = 16000
 AUDIO_CHUNK_DURATION = 2.0
 AUDIO_CHANNELS = 1
+AUDIO_HUB_QUEUE_SIZE = 8  # Chunks buffered per session stream before the oldest is dropped
 
 # Video settings
 VIDEO_WIDTH = 640
 VIDEO_HEIGHT = 480
 FPS = 30
 
+# Dashboard preview settings (independent of the analysis resolution)
+PREVIEW_ENABLED = True
+PREVIEW_WIDTH = 320
+PREVIEW_HEIGHT = 240
+PREVIEW_JPEG_QUALITY = 70
+PREVIEW_MAX_FPS = 5.0
+
 # Emotion settings
 EMOTIONS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
 STRESS_THRESHOLD = 0.7
@@ -24,8 +32,172 @@ ALERT_DURATION = 5
 
 # Dashboard settings
 TIMELINE_SECONDS = 60
-UPDATE_INTERVAL = 1.0
+UPDATE_INTERVAL = 1.0  # Seconds between in-place dashboard updates
 
 # Fusion weights
 FACE_WEIGHT = 0.6
-AUDIO_WEIGHT = 0.4
\ No newline at end of file
+AUDIO_WEIGHT = 0.4
+
+# Performance monitoring
+PERF_WINDOW_SIZE = 500  # Samples kept per stage for rolling percentiles
+
+# Profiling (opt-in, per session)
+PROFILING_ENABLED = False
+PROFILE_SAMPLE_INTERVAL = 0.01  # Seconds between CPU stack samples
+MEMORY_SNAPSHOT_INTERVAL = 30.0  # Seconds between tracemalloc snapshots
+PROFILE_MAX_SNAPSHOTS = 20
+PROFILE_TOP_ALLOCATIONS = 25
+
+# Report generation
+REPORT_CACHE_SIZE = 16  # Generated reports remembered by session fingerprint
+BATCH_REPORT_WORKERS = max(1, (os.cpu_count() or 2) - 1)  # Processes used by the batch report command
+
+# Report period analysis: column -> (label, threshold)
+REPORT_PERIOD_RULES = {
+    'stress': ('High Stress', 0.7),
+    'happy': ('Happy', 0.5),
+    'sad': ('Sad', 0.4),
+    'angry': ('Angry', 0.4),
+    'fear': ('Fear', 0.4)
+}
+
+# Session catalog
+SESSION_CATALOG_PATH = os.path.join(OUTPUTS_DIR, "session_catalog.db")
+
+# Binary session format
+SAVE_BINARY_SESSIONS = True  # Also write a memory-mappable .emsb next to each CSV
+SESSION_EXPORT_CHUNK_ROWS = 100000  # Rows converted at a time when a saved session CSV is written as .emsb
+
+# Session retention tiers (memory stays flat however long a session runs)
+RETENTION_RAW_SECONDS = 900  # Full-resolution samples kept in memory
+RETENTION_SECOND_SECONDS = 6 * 3600  # Per-second aggregates kept before compacting to per-minute
+RETENTION_MINUTE_SECONDS = 7 * 24 * 3600  # Per-minute aggregates kept in memory
+RETENTION_SPILL_TO_DISK = True  # Write evicted raw samples to disk so the saved log stays full resolution
+RETENTION_SPILL_DIR = os.path.join(SESSION_LOGS_DIR, "spill")
+RETENTION_SPILL_FLUSH_ROWS = 100
+
+# Soak testing (python -m src.perf.soak)
+SOAK_DURATION_SECONDS = 2 * 3600  # Simulated time unless run with --realtime
+SOAK_TICK_INTERVAL = 0.5  # Seconds between face samples
+SOAK_SAMPLE_INTERVAL = 60.0  # Seconds between RSS/latency/queue-depth samples
+SOAK_REPORT_INTERVAL = 900.0  # Seconds between periodic PDF reports; the default run fits 5 after warmup
+SOAK_RETENTION_SECONDS = (60, 600, 1800)  # Raw, per-second, per-minute tiers; short so they fill during a run
+SOAK_WARMUP_FRACTION = 0.25  # Leading share of samples left out of the growth fits
+SOAK_MIN_STEADY_SAMPLES = 10  # Samples after warmup a run must yield; fewer are dominated by RSS swings during report builds
+SOAK_MAX_RSS_SLOPE_MB_PER_HOUR = 10.0
+SOAK_MAX_LATENCY_SLOPE_MS_PER_HOUR = 2.0  # Per stage, on the rolling p50; enforced on --realtime runs only
+SOAK_MAX_QUEUE_SLOPE_PER_HOUR = 100.0  # Items per hour, per buffer
+SOAK_MAX_REPORT_SLOPE_MS_PER_HOUR = 250.0  # Report builds take seconds, so jitter is larger
+
+# Session replay
+REPLAY_MIN_SPEED = 1.0
+REPLAY_MAX_SPEED = 100.0
+
+# Raw input recording
+RECORDING_JPEG_QUALITY = 85
+RECORDING_QUEUE_SIZE = 64  # Pending frames/chunks before the recorder drops
+
+# Face inference change-detection gate
+CHANGE_GATE_ENABLED = True
+CHANGE_GATE_THRESHOLD = 6.0  # Mean absolute gray-level difference of the face ROI thumbnail
+CHANGE_GATE_MAX_STALE_SECONDS = 3.0  # Re-run inference at least this often
+CHANGE_GATE_THUMBNAIL_SIZE = 32
+
+# Multi-face tracking
+MAX_TRACKED_FACES = 8  # Largest faces classified per frame
+FER_TILE_GAP = 48  # Blank pixels between batched face tiles, wider than FER's crop offsets
+FACE_TRACK_IOU_THRESHOLD = 0.3  # Minimum box overlap to keep a person's ID between frames
+FACE_TRACK_MAX_MISSING_SECONDS = 2.0  # A person's ID is retired after this long unseen
+
+# Out-of-process face inference (frames travel through shared memory, results through a queue)
+INFERENCE_PROCESS_ENABLED = False
+INFERENCE_WORKERS = 1  # Worker processes; each video stream is pinned to one worker
+INFERENCE_RING_SLOTS = 4  # Shared-memory frame slots, i.e. frames in flight
+INFERENCE_RESULT_QUEUE_SIZE = 64
+INFERENCE_STARTUP_TIMEOUT = 60.0  # Seconds to wait for the first result (workers load the models)
+INFERENCE_RESULT_TIMEOUT = 10.0  # Seconds without a result, frames in flight, before workers count as stalled
+INFERENCE_MAX_CONSECUTIVE_ERRORS = 5  # Failed requests in a row before falling back to in-process inference
+
+# FER result cache (shared across detectors)
+FER_CACHE_ENABLED = True
+FER_CACHE_SIZE = 2048
+FER_CACHE_TTL = 600.0  # Seconds
+FER_CACHE_FINGERPRINT_SIZE = 16  # Face crop is reduced to NxN grayscale
+FER_CACHE_QUANT_LEVELS = 16  # Gray levels kept when fingerprinting
+
+# Voice activity detection
+VAD_ENABLED = True
+VAD_FRAME_MS = 30
+VAD_ENERGY_THRESHOLD = 0.01  # Minimum frame RMS treated as possible speech
+VAD_NOISE_FLOOR_FACTOR = 3.0  # Speech frames must exceed the noise floor by this factor
+VAD_MAX_ZCR = 0.3  # Higher zero-crossing rates look like broadband noise
+VAD_MIN_SPEECH_RATIO = 0.1  # Fraction of speech frames needed to call a chunk speech
+NO_SPEECH_AUDIO_WEIGHT_SCALE = 0.25  # Audio weight multiplier in fusion when no speech
+
+# Multi-rate fusion
+FUSION_OUTPUT_RATE = 1.0  # Fused samples per second
+FUSION_ALIGN_TOLERANCE = 3.0  # Max age (s) of a modality sample used at an output time
+FUSION_BUFFER_SIZE = 256  # Samples kept per modality
+
+# Alert rules: metric, direction, enter/exit thresholds (hysteresis) and how many
+# seconds the condition must hold before raising / clearing
+ALERT_RULES = [
+    {'name': 'high_stress', 'label': 'HIGH STRESS', 'metric': 'stress', 'direction': 'above',
+     'enter': STRESS_THRESHOLD, 'exit': STRESS_THRESHOLD - 0.1, 'enter_seconds': ALERT_DURATION, 'exit_seconds': 3},
+    {'name': 'sustained_negative', 'label': 'SUSTAINED NEGATIVE EMOTION', 'metric': 'negative_score', 'direction': 'above',
+     'enter': 0.5, 'exit': 0.4, 'enter_seconds': 10, 'exit_seconds': 5},
+    {'name': 'low_engagement', 'label': 'LOW ENGAGEMENT', 'metric': 'engagement', 'direction': 'below',
+     'enter': 0.2, 'exit': 0.3, 'enter_seconds': 30, 'exit_seconds': 5}
+]
+
+# Local metrics/event streaming
+STREAM_ENABLED = False
+STREAM_HOST = "127.0.0.1"
+STREAM_PORT = 8765  # Server-Sent Events at http://STREAM_HOST:STREAM_PORT/events
+STREAM_UNIX_SOCKET = None  # e.g. "/tmp/emotisense.sock" to also serve a Unix socket
+STREAM_UNIX_FORMAT = "json"  # "json" (newline-delimited) or "msgpack" (4-byte length prefix)
+STREAM_SUBSCRIBER_BUFFER = 256  # Events queued per subscriber before the oldest are dropped
+
+# Performance profiles (see src/runtime_config.py); values can be overridden per site
+# from RUNTIME_CONFIG_PATH or EMOTISENSE_* environment variables and are hot-reloaded
+PERFORMANCE_PROFILES = {
+    'low-latency': {
+        'detection_scale': 0.5,  # Face detection runs on a frame downscaled by this factor
+        'inference_interval': 0.5,  # Minimum seconds between FER inferences
+        'change_gate': True,
+        'audio_window': 1.0,  # Seconds of audio scored per analysis
+        'audio_hop': 0.5,  # Seconds between analyses (window overlap when smaller)
+        'chart_points': 60,  # Max points drawn per timeline trace
+        'preview_width': 240,
+        'preview_quality': 50,
+        'preview_max_fps': 10.0,
+        'refresh_interval': 0.5
+    },
+    'balanced': {
+        'detection_scale': 1.0,
+        'inference_interval': 0.0,
+        'change_gate': CHANGE_GATE_ENABLED,
+        'audio_window': AUDIO_CHUNK_DURATION,
+        'audio_hop': AUDIO_CHUNK_DURATION,
+        'chart_points': 120,
+        'preview_width': PREVIEW_WIDTH,
+        'preview_quality': PREVIEW_JPEG_QUALITY,
+        'preview_max_fps': PREVIEW_MAX_FPS,
+        'refresh_interval': UPDATE_INTERVAL
+    },
+    'max-accuracy': {
+        'detection_scale': 1.0,
+        'inference_interval': 0.0,
+        'change_gate': False,
+        'audio_window': 3.0,
+        'audio_hop': 1.0,
+        'chart_points': 300,
+        'preview_width': 480,
+        'preview_quality': 85,
+        'preview_max_fps': 5.0,
+        'refresh_interval': UPDATE_INTERVAL
+    }
+}
+DEFAULT_PROFILE = 'balanced'
+RUNTIME_CONFIG_PATH = os.path.join(BASE_DIR, "runtime_config.json")
+RUNTIME_CONFIG_ENV_PREFIX = "EMOTISENSE_"
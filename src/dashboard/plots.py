@@ -2,20 +2,30 @@ import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
 from datetime import datetime, timedelta
+from src.logger.retention import weighted_mean
 
-def create_timeline_chart(df, timeline_seconds=60):
-    """Create timeline chart for last N seconds"""
+def create_timeline_chart(df, timeline_seconds=60, end_time=None, max_points=None):
+    """Create timeline chart for the N seconds before end_time (default: now)"""
     if df.empty:
         return go.Figure()
     
     # Filter last N seconds
-    current_time = datetime.now()
+    current_time = end_time if end_time is not None else datetime.now()
     cutoff_time = current_time - timedelta(seconds=timeline_seconds)
     recent_df = df[df['timestamp'] >= cutoff_time].copy()
     
     if recent_df.empty:
         return go.Figure()
     
+    # With several tracked people, plot the room average per timestamp
+    if 'person_id' in recent_df.columns and recent_df['person_id'].nunique() > 1:
+        recent_df = recent_df.groupby('timestamp', as_index=False)[['stress', 'engagement', 'confidence']].mean()
+    
+    # Thin evenly to the point budget, always keeping the newest sample
+    if max_points and len(recent_df) > max_points:
+        step = -(-len(recent_df) // max_points)
+        recent_df = recent_df.iloc[::-1].iloc[::step].iloc[::-1]
+    
     fig = go.Figure()
     
     # Add stress line
@@ -102,12 +112,12 @@ def create_session_summary_chart(df):
     if df.empty:
         return go.Figure()
     
-    # Calculate summary statistics
+    # Calculate summary statistics; aggregate rows count once per sample they stand for
     summary_stats = {
-        'Average Stress': df['stress'].mean(),
-        'Average Engagement': df['engagement'].mean(),
-        'Average Confidence': df['confidence'].mean(),
-        'Average Confusion': df['confusion'].mean()
+        'Average Stress': weighted_mean(df, 'stress'),
+        'Average Engagement': weighted_mean(df, 'engagement'),
+        'Average Confidence': weighted_mean(df, 'confidence'),
+        'Average Confusion': weighted_mean(df, 'confusion')
     }
     
     fig = go.Figure(data=[
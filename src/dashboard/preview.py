@@ -0,0 +1,92 @@
+import time
+import threading
+import cv2
+from src.config import PREVIEW_WIDTH, PREVIEW_HEIGHT, PREVIEW_JPEG_QUALITY, PREVIEW_MAX_FPS
+
+class PreviewEncoder:
+    """Downscale and JPEG-encode frames for the dashboard preview at a capped rate"""
+    def __init__(self, width=PREVIEW_WIDTH, height=PREVIEW_HEIGHT,
+                 quality=PREVIEW_JPEG_QUALITY, max_fps=PREVIEW_MAX_FPS):
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.max_fps = max_fps
+        self.last_encoded = None
+        self._last_time = None
+        self._lock = threading.Lock()
+        self.stats = {'encoded': 0, 'rate_limited': 0, 'bytes': 0}
+    
+    def configure(self, width=None, height=None, quality=None, max_fps=None):
+        """Change preview settings without touching the analysis frames"""
+        with self._lock:
+            if width is not None:
+                self.width = width
+            if height is not None:
+                self.height = height
+            if quality is not None:
+                self.quality = quality
+            if max_fps is not None:
+                self.max_fps = max_fps
+    
+    def is_due(self, now=None):
+        """Whether enough time has passed since the last preview was sent"""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            if self._last_time is None or not self.max_fps:
+                return True
+            return now - self._last_time >= 1.0 / self.max_fps
+    
+    def encode(self, frame, now=None):
+        """Return JPEG bytes for the frame, or None if the preview rate cap says skip"""
+        if frame is None:
+            return None
+        if now is None:
+            now = time.monotonic()
+        
+        if not self.is_due(now):
+            with self._lock:
+                self.stats['rate_limited'] += 1
+            return None
+        
+        try:
+            with self._lock:
+                size = (self.width, self.height)
+                quality = int(self.quality)
+            
+            # Only shrink; never upscale a smaller source frame
+            height, width = frame.shape[:2]
+            if width > size[0] or height > size[1]:
+                scale = min(size[0] / width, size[1] / height)
+                frame = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+            
+            ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                return None
+            
+            jpeg = buffer.tobytes()
+            with self._lock:
+                self._last_time = now
+                self.last_encoded = jpeg
+                self.stats['encoded'] += 1
+                self.stats['bytes'] += len(jpeg)
+            return jpeg
+        
+        except Exception as e:
+            print(f"Preview encoding error: {e}")
+            return None
+    
+    def get_stats(self):
+        """Encoded/skipped counts and average preview size"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['avg_kb'] = stats['bytes'] / stats['encoded'] / 1024 if stats['encoded'] else 0.0
+        return stats
+    
+    def reset(self):
+        """Forget the last preview so the next frame is sent immediately"""
+        with self._lock:
+            self.last_encoded = None
+            self._last_time = None
+            self.stats = {'encoded': 0, 'rate_limited': 0, 'bytes': 0}
@@ -0,0 +1,143 @@
+import os
+import time
+import numpy as np
+from src.config import EMOTIONS, SESSION_LOGS_DIR, REPLAY_MIN_SPEED, REPLAY_MAX_SPEED
+from src.logger.session_binary import binary_path_for, load_session_dataframe
+from src.alerts.alert_engine import AlertEngine
+
+FUSED_METRICS = ['stress', 'engagement', 'confusion', 'confidence']
+
+def list_saved_sessions(directory=SESSION_LOGS_DIR):
+    """List saved session logs, newest first, preferring the binary copy"""
+    if not os.path.isdir(directory):
+        return []
+    
+    sessions = []
+    for filename in os.listdir(directory):
+        if not (filename.startswith("session_") and filename.endswith(".csv")):
+            continue
+        if filename.endswith("_perf.csv") or filename.endswith("_alerts.csv"):
+            continue
+        
+        csv_path = os.path.join(directory, filename)
+        binary_path = binary_path_for(csv_path)
+        sessions.append(binary_path if os.path.exists(binary_path) else csv_path)
+    
+    return sorted(sessions, key=os.path.getmtime, reverse=True)
+
+class SessionReplay:
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.df = load_session_dataframe(path)
+        self.session_id = str(self.df['session_id'].iloc[0]) if 'session_id' in self.df.columns and not self.df.empty else ""
+        
+        # Sorted int64 timestamp index used for seeking
+        self.timestamps_ns = self.df['timestamp'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        self.start_ns = int(self.timestamps_ns[0]) if len(self.timestamps_ns) else 0
+        self.end_ns = int(self.timestamps_ns[-1]) if len(self.timestamps_ns) else 0
+        
+        self.speed = self._clamp_speed(speed)
+        self.is_playing = False
+        self.alert_engine = AlertEngine()
+        self._alerts_fed_until = -1  # Last row index fed to the alert engine
+        # Live alerts follow the headline person only: the first row logged at each timestamp
+        # (people are logged largest face first), which is also every row without a person_id
+        self._alert_rows = ~self.df['timestamp'].duplicated(keep='first').to_numpy(dtype=bool)
+        self._position_ns = self.start_ns
+        self._anchor_wall = time.monotonic()
+    
+    def _clamp_speed(self, speed):
+        return max(REPLAY_MIN_SPEED, min(REPLAY_MAX_SPEED, float(speed)))
+    
+    @property
+    def duration_s(self):
+        return (self.end_ns - self.start_ns) / 1e9
+    
+    @property
+    def position_ns(self):
+        """Current replay position, advanced by wall-clock time while playing"""
+        if self.is_playing:
+            elapsed = time.monotonic() - self._anchor_wall
+            position = self._position_ns + int(elapsed * self.speed * 1e9)
+            return min(position, self.end_ns)
+        return self._position_ns
+    
+    @property
+    def elapsed_s(self):
+        return (self.position_ns - self.start_ns) / 1e9
+    
+    @property
+    def is_finished(self):
+        return self.position_ns >= self.end_ns
+    
+    def _reanchor(self):
+        """Freeze the current position as the new playback origin"""
+        self._position_ns = self.position_ns
+        self._anchor_wall = time.monotonic()
+    
+    def play(self):
+        if self.is_finished:
+            self._position_ns = self.start_ns
+        self._anchor_wall = time.monotonic()
+        self.is_playing = True
+    
+    def pause(self):
+        self._reanchor()
+        self.is_playing = False
+    
+    def set_speed(self, speed):
+        self._reanchor()
+        self.speed = self._clamp_speed(speed)
+    
+    def seek(self, offset_s):
+        """Jump to an offset (seconds) from the start of the session"""
+        offset_ns = int(max(0.0, min(self.duration_s, offset_s)) * 1e9)
+        self._position_ns = self.start_ns + offset_ns
+        self._anchor_wall = time.monotonic()
+    
+    def current_index(self):
+        """Index of the last sample at or before the replay position"""
+        if not len(self.timestamps_ns):
+            return -1
+        index = int(np.searchsorted(self.timestamps_ns, self.position_ns, side='right')) - 1
+        return max(index, 0)
+    
+    def current_sample(self):
+        """Face emotions, audio stress and fused metrics at the replay position"""
+        index = self.current_index()
+        if index < 0:
+            return None
+        
+        row = self.df.iloc[index]
+        face_emotions = {emotion: float(row[emotion]) for emotion in EMOTIONS if emotion in row.index}
+        fused_metrics = {metric: float(row[metric]) for metric in FUSED_METRICS if metric in row.index}
+        fused_metrics['dominant_state'] = str(row.get('dominant_state', 'neutral'))
+        
+        return {
+            'timestamp': row['timestamp'],
+            'face_emotions': face_emotions,
+            'audio_stress_score': float(row.get('audio_stress_score', 0.0)),
+            'fused_metrics': fused_metrics
+        }
+    
+    def active_alerts(self):
+        """Alerts active at the replay position, feeding only rows not seen yet"""
+        index = self.current_index()
+        if index < self._alerts_fed_until:
+            # Seeking backwards: replay the rule state from the start
+            self.alert_engine.reset()
+            self._alerts_fed_until = -1
+        
+        columns = [col for col in EMOTIONS + FUSED_METRICS if col in self.df.columns]
+        new_rows = self.df.iloc[self._alerts_fed_until + 1:index + 1]
+        new_rows = new_rows[self._alert_rows[self._alerts_fed_until + 1:index + 1]]
+        for timestamp, row in zip(new_rows['timestamp'], new_rows[columns].to_dict('records')):
+            face_emotions = {emotion: row[emotion] for emotion in EMOTIONS if emotion in row}
+            self.alert_engine.update(row, face_emotions, timestamp)
+        
+        self._alerts_fed_until = index
+        return self.alert_engine.get_active_alerts()
+    
+    def history(self):
+        """Session data up to and including the replay position"""
+        return self.df.iloc[:self.current_index() + 1]
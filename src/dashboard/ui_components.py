@@ -36,16 +36,76 @@ def display_dominant_state(dominant_state):
     icon = state_colors.get(dominant_state, '⚪')
     st.subheader(f"Current State: {icon} {dominant_state.title()}")
 
-def display_stress_alert(stress_history, threshold=0.7, duration=5):
-    """Display stress alert if threshold exceeded for duration"""
-    if len(stress_history) < duration:
-        return False
-    
-    recent_stress = stress_history[-duration:]
-    if all(stress > threshold for stress in recent_stress):
-        st.error(f"⚠️ HIGH STRESS ALERT: Stress level above {threshold:.1f} for {duration} seconds!")
-        return True
-    return False
+def display_active_alerts(active_alerts, current_time=None):
+    """Display currently raised alerts"""
+    current_time = current_time or datetime.now()
+    for alert in active_alerts:
+        held = int((current_time - alert['since']).total_seconds())
+        comparison = "above" if alert['direction'] == 'above' else "below"
+        st.error(f"⚠️ {alert['label']} ALERT: {alert['metric'].replace('_', ' ').title()} "
+                 f"{comparison} {alert['threshold']:.1f} for {held} seconds!")
+    return bool(active_alerts)
+
+def display_people_table(people):
+    """Display per-person fused metrics when several faces are tracked"""
+    if len(people) < 2:
+        return
+    
+    st.subheader(f"👥 People in View ({len(people)})")
+    rows = []
+    for person_id, person in sorted(people.items()):
+        metrics = person['fused_metrics']
+        rows.append({
+            'Person': f"#{person_id}",
+            'State': metrics['dominant_state'].title(),
+            'Stress': round(metrics['stress'], 2),
+            'Engagement': round(metrics['engagement'], 2),
+            'Confidence': round(metrics['confidence'], 2)
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+def display_performance_panel(latency_df, fps, gate_stats=None, cache_stats=None, camera_stats=None,
+                              worker_stats=None):
+    """Display per-stage latency percentiles, effective FPS and inference savings"""
+    st.subheader("Performance")
+    st.metric("Effective FPS", f"{fps:.2f}")
+    
+    if gate_stats and gate_stats['frames']:
+        st.caption(f"Inference skipped on {gate_stats['skipped']}/{gate_stats['frames']} frames "
+                   f"({gate_stats['skip_ratio']:.0%}) - unchanged face")
+    
+    if cache_stats and (cache_stats['hits'] or cache_stats['misses']):
+        st.caption(f"FER cache: {cache_stats['hit_ratio']:.0%} hits, {cache_stats['size']} entries, "
+                   f"{cache_stats['evictions']} evicted")
+    
+    if camera_stats and camera_stats['captured']:
+        st.caption(f"Camera: {camera_stats['captured']} frames grabbed, {camera_stats['dropped']} superseded "
+                   f"before use, {camera_stats['read_errors']} read errors")
+    
+    if worker_stats:
+        st.caption(f"Inference workers: {worker_stats['workers_alive']} alive, {worker_stats['in_flight']} frames in flight, "
+                   f"{worker_stats['dropped']} dropped while busy, {worker_stats['resized']} resized, "
+                   f"{worker_stats['rejected']} rejected")
+    
+    if latency_df.empty:
+        st.caption("No timing samples yet.")
+        return
+    
+    panel_df = latency_df[['stage', 'p50_ms', 'p95_ms', 'p99_ms']].copy()
+    panel_df.columns = ['Stage', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)']
+    st.dataframe(panel_df.round(1), use_container_width=True, hide_index=True)
+
+def display_memory_diff(diff_rows, start_offset, end_offset):
+    """Display allocation growth between two memory snapshots"""
+    st.caption(f"Allocation growth from +{start_offset:.0f}s to +{end_offset:.0f}s")
+    
+    if not diff_rows:
+        st.caption("No allocation differences recorded.")
+        return
+    
+    diff_df = pd.DataFrame(diff_rows)
+    diff_df.columns = ['Location', 'Change (KiB)', 'Size (KiB)', 'Blocks']
+    st.dataframe(diff_df.round(1), use_container_width=True, hide_index=True)
 
 def display_emotion_breakdown(face_emotions):
     """Display face emotion breakdown"""
@@ -1,5 +1,5 @@
 import numpy as np
-from src.config import FACE_WEIGHT, AUDIO_WEIGHT
+from src.config import FACE_WEIGHT, AUDIO_WEIGHT, NO_SPEECH_AUDIO_WEIGHT_SCALE
 from src.utils import calculate_negative_score
 
 class FusionEngine:
@@ -7,18 +7,23 @@ class FusionEngine:
         self.face_weight = FACE_WEIGHT
         self.audio_weight = AUDIO_WEIGHT
     
-    def fuse_emotions(self, face_emotions, audio_stress_score):
+    def fuse_emotions(self, face_emotions, audio_stress_score, speech_detected=True):
         """Fuse face emotions and audio stress into comprehensive metrics"""
         
         # Calculate face negative score
         face_negative_score = calculate_negative_score(face_emotions)
         
+        # Without speech the audio score carries little information, so shift weight to the face
+        audio_scale = 1.0 if speech_detected else NO_SPEECH_AUDIO_WEIGHT_SCALE
+        audio_weight = self.audio_weight * audio_scale
+        face_weight = self.face_weight + self.audio_weight - audio_weight
+        
         # Calculate fused metrics with more realistic formulas
         metrics = {}
         
         # Stress: weighted combination with non-linear scaling
-        raw_stress = (face_negative_score * self.face_weight + 
-                     audio_stress_score * self.audio_weight)
+        raw_stress = (face_negative_score * face_weight + 
+                     audio_stress_score * audio_weight)
         metrics['stress'] = min(1.0, raw_stress * 1.2)  # Amplify stress signals
         
         # Engagement: based on positive emotions, reduced by stress
@@ -33,7 +38,7 @@ class FusionEngine:
         uncertainty_factor = 1 - max(emotion_values)  # Low when one emotion dominates
         
         confusion_base = (emotion_variance * 2 + uncertainty_factor * 0.5 + 
-                         audio_stress_score * 0.3)
+                         audio_stress_score * 0.3 * audio_scale)
         metrics['confusion'] = max(0.0, min(1.0, confusion_base))
         
         # Confidence: inverse relationship with stress and confusion
@@ -46,6 +51,7 @@ class FusionEngine:
         metrics['dominant_state'] = self._determine_dominant_state(
             face_emotions, metrics['stress'], metrics['engagement'], metrics['confusion']
         )
+        metrics['speech_detected'] = bool(speech_detected)
         
         return metrics
     
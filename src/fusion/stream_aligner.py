@@ -0,0 +1,119 @@
+import time
+import bisect
+import threading
+from collections import deque
+from src.config import FUSION_OUTPUT_RATE, FUSION_ALIGN_TOLERANCE, FUSION_BUFFER_SIZE
+
+class AlignedFusionBuffer:
+    """Time-aligns face and audio streams arriving at different rates before fusion"""
+    def __init__(self, fusion_engine, output_rate=FUSION_OUTPUT_RATE,
+                 tolerance=FUSION_ALIGN_TOLERANCE, buffer_size=FUSION_BUFFER_SIZE):
+        self.fusion_engine = fusion_engine
+        self.output_period = 1.0 / output_rate
+        self.tolerance = tolerance
+        self.face_samples = deque(maxlen=buffer_size)  # (capture time, face emotions, {person id: face emotions})
+        self.audio_samples = deque(maxlen=buffer_size)  # (capture time, stress score, speech detected)
+        self.last_output = None
+        self._next_emit = None
+        self._lock = threading.Lock()
+    
+    def reset(self):
+        with self._lock:
+            self.face_samples.clear()
+            self.audio_samples.clear()
+            self.last_output = None
+            self._next_emit = None
+    
+    def _insert(self, samples, sample):
+        """Append keeping capture-time order (late arrivals are rare but possible)"""
+        if not samples or samples[-1][0] <= sample[0]:
+            samples.append(sample)
+        else:
+            items = list(samples)
+            bisect.insort(items, sample, key=lambda item: item[0])
+            samples.clear()
+            samples.extend(items)
+    
+    def push_face(self, timestamp, face_emotions, people=None):
+        """Add a face result captured at a monotonic timestamp, with optional per-person results"""
+        with self._lock:
+            self._insert(self.face_samples, (timestamp, face_emotions, people or {}))
+    
+    def push_audio(self, timestamp, stress_score, speech_detected=True):
+        """Add an audio score whose window is centred on a monotonic timestamp"""
+        with self._lock:
+            self._insert(self.audio_samples, (timestamp, stress_score, speech_detected))
+    
+    def _face_at(self, t):
+        """Hold the latest face result (and people) at or before t, within tolerance"""
+        for timestamp, face_emotions, people in reversed(self.face_samples):
+            if timestamp <= t:
+                return (face_emotions, people) if t - timestamp <= self.tolerance else None
+        return None
+    
+    def _audio_at(self, t):
+        """Interpolate audio stress at t, or hold the nearest sample within tolerance"""
+        before = after = None
+        for sample in reversed(self.audio_samples):
+            if sample[0] <= t:
+                before = sample
+                break
+            after = sample
+        
+        if before is not None and after is not None and after[0] - before[0] <= 2 * self.tolerance:
+            span = after[0] - before[0]
+            weight = (t - before[0]) / span if span > 0 else 0.0
+            score = before[1] + (after[1] - before[1]) * weight
+            speech = before[2] if weight < 0.5 else after[2]
+            return score, speech
+        
+        nearest = min((s for s in (before, after) if s is not None),
+                      key=lambda s: abs(t - s[0]), default=None)
+        if nearest is not None and abs(t - nearest[0]) <= self.tolerance:
+            return nearest[1], nearest[2]
+        return None
+    
+    def fuse_at(self, t):
+        """Fuse the modalities as they were at time t; None without a recent face result"""
+        with self._lock:
+            face = self._face_at(t)
+            audio = self._audio_at(t)
+        
+        if face is None:
+            return None
+        face_emotions, people = face
+        
+        # Missing audio is fused like silence: low weight, no stress contribution
+        audio_stress_score, speech_detected = audio if audio is not None else (0.0, False)
+        fused_metrics = self.fusion_engine.fuse_emotions(face_emotions, audio_stress_score, speech_detected)
+        
+        # The room shares one microphone, so every person is fused with the same audio
+        fused_people = {}
+        for person_id, person_emotions in people.items():
+            fused_people[person_id] = {
+                'face_emotions': person_emotions,
+                'fused_metrics': self.fusion_engine.fuse_emotions(person_emotions, audio_stress_score, speech_detected)
+            }
+        
+        return {
+            'timestamp': t,
+            'face_emotions': face_emotions,
+            'audio_stress_score': audio_stress_score,
+            'speech_detected': speech_detected,
+            'fused_metrics': fused_metrics,
+            'people': fused_people
+        }
+    
+    def poll(self, now=None):
+        """Emit a fused sample when the next output time is due, else None"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self._next_emit is not None and now < self._next_emit:
+                return None
+            # Skip missed slots rather than emitting a burst
+            self._next_emit = now + self.output_period
+        
+        output = self.fuse_at(now)
+        if output is not None:
+            self.last_output = output
+        return output
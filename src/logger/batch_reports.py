@@ -0,0 +1,190 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+from src.config import SESSION_LOGS_DIR, REPORTS_DIR, BATCH_REPORT_WORKERS
+from src.logger.report_generator import ReportGenerator
+from src.logger.session_binary import binary_path_for, load_session_dataframe
+from src.logger.session_catalog import SessionCatalog
+from src.logger.retention import sample_weights, weighted_mean, peak_series
+from src.dashboard.replay import list_saved_sessions
+
+def session_stats_from_dataframe(df, session_id=None):
+    """Session statistics in the SessionLogger.get_session_stats layout, computed from a saved log"""
+    if df.empty:
+        return {}
+    if session_id is None:
+        session_id = str(df['session_id'].iloc[0]) if 'session_id' in df.columns else ""
+    
+    timestamps = pd.to_datetime(df['timestamp'])
+    # Aggregate rows (logs saved without the raw spill) each stand for several samples
+    weights = sample_weights(df)
+    
+    states = {}
+    if 'dominant_state' in df.columns:
+        counts = weights.groupby(df['dominant_state']).sum().sort_values(ascending=False)
+        states = {state: int(count) for state, count in counts.items()}
+    
+    return {
+        'session_id': session_id,
+        'start_time': timestamps.min(),
+        'duration': timestamps.max() - timestamps.min(),
+        'total_records': int(weights.sum()),
+        'avg_stress': weighted_mean(df, 'stress'),
+        'max_stress': float(peak_series(df, 'stress').max()) if 'stress' in df.columns else 0,
+        'avg_engagement': weighted_mean(df, 'engagement'),
+        'avg_confidence': weighted_mean(df, 'confidence'),
+        'dominant_states': states,
+        'people_tracked': df['person_id'].nunique() if 'person_id' in df.columns else 0
+    }
+
+def catalog_session_files(**filters):
+    """Saved session files matching a catalog query, preferring the binary copy"""
+    catalog = SessionCatalog()
+    try:
+        entries = catalog.query(**filters)
+    finally:
+        catalog.close()
+    
+    paths = []
+    for entry in entries:
+        path = entry['file_path']
+        binary_path = binary_path_for(path)
+        if os.path.exists(binary_path):
+            path = binary_path
+        if os.path.exists(path):
+            paths.append(path)
+    return paths
+
+def report_path_for(session_path, reports_dir=REPORTS_DIR):
+    """Stable report path for a saved session, so reruns can tell what is already done"""
+    name = os.path.splitext(os.path.basename(session_path))[0]
+    return os.path.join(reports_dir, f"emotion_report_{name}.pdf")
+
+def is_report_up_to_date(session_path, report_path):
+    """A report is current when it exists and is newer than its session file"""
+    try:
+        return os.path.getmtime(report_path) >= os.path.getmtime(session_path)
+    except OSError:
+        return False
+
+# One generator per worker process, so reportlab styles, the chart thread pool and the
+# matplotlib Agg backend are set up once per worker instead of once per report
+_generator = None
+
+def _init_worker():
+    global _generator
+    _generator = ReportGenerator()
+
+def _build_report(session_path, report_path):
+    """Worker task: load a saved session and write its report; returns (path, status, error, seconds)"""
+    started = time.perf_counter()
+    partial_path = report_path + ".partial"
+    try:
+        df = load_session_dataframe(session_path)
+        stats = session_stats_from_dataframe(df)
+        if not stats:
+            return session_path, 'empty', None, time.perf_counter() - started
+        
+        # Write under a temporary name so an interrupted run never leaves a report that looks current
+        _generator.generate_pdf_report(stats, df, output_path=partial_path)
+        os.replace(partial_path, report_path)
+        return session_path, 'generated', None, time.perf_counter() - started
+    except Exception as e:
+        if os.path.exists(partial_path):
+            try:
+                os.remove(partial_path)
+            except OSError:
+                pass
+        return session_path, 'failed', str(e), time.perf_counter() - started
+
+def run_batch_reports(session_paths, reports_dir=REPORTS_DIR, workers=BATCH_REPORT_WORKERS, force=False,
+                      progress_callback=None):
+    """Generate reports for many saved sessions in a process pool, skipping up-to-date ones.
+    progress_callback(done, total, session_path, status, seconds) is called as each finishes."""
+    os.makedirs(reports_dir, exist_ok=True)
+    started = time.perf_counter()
+    summary = {'total': len(session_paths), 'generated': 0, 'skipped': 0, 'empty': 0, 'failed': 0,
+               'reports': [], 'failures': []}
+    
+    pending = []
+    for session_path in session_paths:
+        report_path = report_path_for(session_path, reports_dir)
+        if not force and is_report_up_to_date(session_path, report_path):
+            summary['skipped'] += 1
+        else:
+            pending.append((session_path, report_path))
+    
+    done = summary['skipped']
+    if pending:
+        workers = max(1, min(workers, len(pending)))
+        # Spawn so workers never inherit threads or GUI state from the parent
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                                 initializer=_init_worker) as executor:
+            futures = {executor.submit(_build_report, session_path, report_path): (session_path, report_path)
+                       for session_path, report_path in pending}
+            for future in as_completed(futures):
+                session_path, report_path = futures[future]
+                try:
+                    _, status, error, seconds = future.result()
+                except Exception as e:
+                    # The worker died (e.g. out of memory); the pool reports it per task
+                    status, error, seconds = 'failed', str(e), 0.0
+                
+                summary[status] += 1
+                if status == 'generated':
+                    summary['reports'].append(report_path)
+                elif status == 'failed':
+                    summary['failures'].append({'session': session_path, 'error': error})
+                
+                done += 1
+                if progress_callback is not None:
+                    progress_callback(done, summary['total'], session_path, status, seconds)
+    
+    summary['elapsed_s'] = time.perf_counter() - started
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate PDF reports for saved sessions in parallel")
+    parser.add_argument("--dir", default=SESSION_LOGS_DIR, help="Directory of saved session logs")
+    parser.add_argument("--catalog", action="store_true", help="Select sessions with a session catalog query instead")
+    parser.add_argument("--session-id", help="Catalog filter: session ID")
+    parser.add_argument("--start-after", help="Catalog filter: sessions started at or after this time")
+    parser.add_argument("--start-before", help="Catalog filter: sessions started before this time")
+    parser.add_argument("--min-mean-stress", type=float, help="Catalog filter: minimum mean stress")
+    parser.add_argument("--state", help="Catalog filter: sessions that had this dominant state")
+    parser.add_argument("--limit", type=int, help="Catalog filter: newest N sessions")
+    parser.add_argument("--output-dir", default=REPORTS_DIR, help="Where to write the reports")
+    parser.add_argument("--workers", type=int, default=BATCH_REPORT_WORKERS, help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Regenerate reports that are already up to date")
+    args = parser.parse_args(argv)
+    
+    if args.catalog:
+        session_paths = catalog_session_files(session_id=args.session_id, start_after=args.start_after,
+                                              start_before=args.start_before,
+                                              min_mean_stress=args.min_mean_stress, state=args.state,
+                                              limit=args.limit)
+    else:
+        session_paths = list_saved_sessions(args.dir)
+    
+    if not session_paths:
+        print("No saved sessions found")
+        return 0
+    
+    def print_progress(done, total, session_path, status, seconds):
+        print(f"[{done}/{total}] {status:<9} {os.path.basename(session_path)} ({seconds:.1f}s)")
+    
+    summary = run_batch_reports(session_paths, reports_dir=args.output_dir, workers=args.workers,
+                                force=args.force, progress_callback=print_progress)
+    
+    print(f"{summary['total']} session(s) in {summary['elapsed_s']:.1f}s: {summary['generated']} generated, "
+          f"{summary['skipped']} up to date, {summary['empty']} empty, {summary['failed']} failed")
+    for failure in summary['failures']:
+        print(f"  {os.path.basename(failure['session'])}: {failure['error']}")
+    return 1 if summary['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
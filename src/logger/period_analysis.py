@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+PERIOD_COLUMNS = ['column', 'person_id', 'start', 'end', 'duration_s']
+
+def find_threshold_periods(df, thresholds):
+    """Find every contiguous above-threshold period for several columns in one pass
+    
+    Returns a DataFrame with one row per episode: column, person_id, start/end
+    timestamps and wall-clock duration in seconds. An episode lasts from its first
+    sample until the first sample back below threshold (or the last sample).
+    Multi-face sessions log one row per person, so each person's rows are scanned
+    separately.
+    """
+    columns = [col for col in thresholds if col in df.columns]
+    if df.empty or not columns:
+        return pd.DataFrame(columns=PERIOD_COLUMNS)
+    
+    if 'person_id' not in df.columns or df['person_id'].nunique(dropna=False) <= 1:
+        person_id = df['person_id'].iloc[0] if 'person_id' in df.columns else None
+        return _find_person_periods(df, columns, thresholds, person_id)
+    
+    frames = [_find_person_periods(rows, columns, thresholds, person_id)
+              for person_id, rows in df.groupby('person_id', sort=False, dropna=False)]
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=PERIOD_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+def _find_person_periods(df, columns, thresholds, person_id):
+    """Episodes within one person's time-ordered rows"""
+    values = df[columns].to_numpy(dtype=np.float64)
+    limits = np.array([thresholds[col] for col in columns], dtype=np.float64)
+    above = values > limits  # NaN compares False
+    
+    # Run edges per column: +1 where a run starts, -1 one past where it ends
+    padded = np.zeros((len(df) + 2, len(columns)), dtype=np.int8)
+    padded[1:-1] = above
+    edges = np.diff(padded, axis=0).T  # column-major so runs pair up per column
+    
+    run_columns, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    if starts.size == 0:
+        return pd.DataFrame(columns=PERIOD_COLUMNS)
+    
+    timestamps = pd.to_datetime(df['timestamp']).to_numpy(dtype='datetime64[ns]')
+    end_times = timestamps[np.minimum(ends, len(df) - 1)]
+    durations = (end_times - timestamps[starts]) / np.timedelta64(1, 's')
+    
+    return pd.DataFrame({
+        'column': np.asarray(columns)[run_columns],
+        'person_id': person_id,
+        'start': timestamps[starts],
+        'end': end_times,
+        'duration_s': durations
+    })
+
+def summarize_periods(periods):
+    """Summarize episodes per column: count, total and longest episode"""
+    if periods.empty:
+        return pd.DataFrame(columns=['column', 'episodes', 'total_s', 'longest_s', 'longest_start', 'first_start'])
+    
+    grouped = periods.groupby('column', sort=False)
+    longest = periods.loc[grouped['duration_s'].idxmax()].set_index('column')
+    
+    summary = pd.DataFrame({
+        'episodes': grouped.size(),
+        'total_s': grouped['duration_s'].sum(),
+        'longest_s': longest['duration_s'],
+        'longest_start': longest['start'],
+        'first_start': grouped['start'].min()
+    })
+    return summary.reset_index()
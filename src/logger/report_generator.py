@@ -1,45 +1,64 @@
 import os
+import io
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-import tempfile
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from src.config import REPORTS_DIR
+import matplotlib
+matplotlib.use('Agg')  # Reports are rendered off the main thread
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from src.config import REPORTS_DIR, REPORT_PERIOD_RULES
 from src.utils import ensure_directories
+from src.logger.period_analysis import find_threshold_periods, summarize_periods
+from src.logger.retention import weighted_mean, peak_series
 
 class ReportGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self.styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            alignment=1  # Center alignment
+        )
+        self.chart_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="report-chart")
         ensure_directories()
     
-    def generate_pdf_report(self, session_stats, df):
-        """Generate PDF report for session"""
+    def generate_pdf_report(self, session_stats, df, progress_callback=None, output_path=None):
+        """Generate PDF report for session, to output_path or a timestamped file in REPORTS_DIR"""
         if df.empty:
             return None
         
+        def report_progress(fraction, message):
+            if progress_callback is not None:
+                progress_callback(fraction, message)
+        
+        report_progress(0.0, "Preparing report")
+        
+        # Render both charts in parallel while the tables are built
+        timeline_future = self.chart_executor.submit(self._create_timeline_chart, df)
+        emotion_future = self.chart_executor.submit(self._create_emotion_distribution_chart, df)
+        
         # Create filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"emotion_report_{session_stats['session_id']}_{timestamp}.pdf"
-        filepath = os.path.join(REPORTS_DIR, filename)
+        if output_path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"emotion_report_{session_stats['session_id']}_{timestamp}.pdf"
+            filepath = os.path.join(REPORTS_DIR, filename)
+        else:
+            filepath = output_path
         
         # Create PDF document
         doc = SimpleDocTemplate(filepath, pagesize=A4)
         story = []
         
         # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=1  # Center alignment
-        )
-        story.append(Paragraph("EMOTISENSE AI - Session Report", title_style))
+        story.append(Paragraph("EMOTISENSE AI - Session Report", self.title_style))
         story.append(Spacer(1, 20))
         
         # Session Information
@@ -66,6 +85,7 @@ class ReportGenerator:
         story.append(Spacer(1, 20))
         
         # Detailed Time Analysis
+        report_progress(0.1, "Analyzing emotion periods")
         story.append(Paragraph("Detailed Time Analysis", self.styles['Heading2']))
         time_analysis = self._analyze_emotion_times(df)
         
@@ -78,8 +98,8 @@ class ReportGenerator:
         metrics_data = [
             ['Metric', 'Average', 'Maximum', 'Peak Time'],
             ['Stress Level', f"{session_stats['avg_stress']:.3f}", f"{session_stats['max_stress']:.3f}", self._get_peak_time(df, 'stress')],
-            ['Engagement', f"{session_stats['avg_engagement']:.3f}", f"{df['engagement'].max():.3f}", self._get_peak_time(df, 'engagement')],
-            ['Confidence', f"{session_stats['avg_confidence']:.3f}", f"{df['confidence'].max():.3f}", self._get_peak_time(df, 'confidence')]
+            ['Engagement', f"{session_stats['avg_engagement']:.3f}", f"{peak_series(df, 'engagement').max():.3f}", self._get_peak_time(df, 'engagement')],
+            ['Confidence', f"{session_stats['avg_confidence']:.3f}", f"{peak_series(df, 'confidence').max():.3f}", self._get_peak_time(df, 'confidence')]
         ]
         
         metrics_table = Table(metrics_data, colWidths=[1.5*inch, 1*inch, 1*inch, 1.5*inch])
@@ -98,18 +118,20 @@ class ReportGenerator:
         
         # Add charts
         try:
+            report_progress(0.3, "Rendering timeline chart")
             story.append(Paragraph("Emotion Timeline Chart", self.styles['Heading2']))
-            timeline_chart_path = self._create_timeline_chart(df)
-            if timeline_chart_path and os.path.exists(timeline_chart_path):
-                story.append(Image(timeline_chart_path, width=6*inch, height=3*inch))
+            timeline_chart = timeline_future.result()
+            if timeline_chart is not None:
+                story.append(Image(timeline_chart, width=6*inch, height=3*inch))
             else:
                 story.append(Paragraph("Timeline chart could not be generated.", self.styles['Normal']))
             story.append(Spacer(1, 20))
             
+            report_progress(0.5, "Rendering emotion distribution chart")
             story.append(Paragraph("Emotion Distribution", self.styles['Heading2']))
-            emotion_chart_path = self._create_emotion_distribution_chart(df)
-            if emotion_chart_path and os.path.exists(emotion_chart_path):
-                story.append(Image(emotion_chart_path, width=6*inch, height=3*inch))
+            emotion_chart = emotion_future.result()
+            if emotion_chart is not None:
+                story.append(Image(emotion_chart, width=6*inch, height=3*inch))
             else:
                 story.append(Paragraph("Emotion distribution chart could not be generated.", self.styles['Normal']))
             story.append(Spacer(1, 20))
@@ -132,112 +154,113 @@ class ReportGenerator:
             story.append(Paragraph(f"• {rec}", self.styles['Normal']))
         
         # Build PDF
+        report_progress(0.7, "Building PDF document")
         doc.build(story)
+        report_progress(1.0, "Report complete")
         return filepath
     
     def _analyze_emotion_times(self, df):
         """Analyze when different emotions were most prominent"""
         analysis = []
+        thresholds = {col: threshold for col, (_, threshold) in REPORT_PERIOD_RULES.items()}
+        summary = summarize_periods(find_threshold_periods(df, thresholds))
         
-        if 'stress' in df.columns:
-            high_stress_times = df[df['stress'] > 0.7]
-            if not high_stress_times.empty:
-                start_time = high_stress_times['timestamp'].iloc[0].strftime('%H:%M:%S')
-                duration = len(high_stress_times)
-                analysis.append(f"<b>High Stress Period:</b> Started at {start_time}, lasted {duration} seconds")
-        
-        if 'happy' in df.columns:
-            happy_times = df[df['happy'] > 0.5]
-            if not happy_times.empty:
-                start_time = happy_times['timestamp'].iloc[0].strftime('%H:%M:%S')
-                duration = len(happy_times)
-                analysis.append(f"<b>Happy Period:</b> Started at {start_time}, lasted {duration} seconds")
-        
-        if 'sad' in df.columns:
-            sad_times = df[df['sad'] > 0.4]
-            if not sad_times.empty:
-                start_time = sad_times['timestamp'].iloc[0].strftime('%H:%M:%S')
-                duration = len(sad_times)
-                analysis.append(f"<b>Sad Period:</b> Started at {start_time}, lasted {duration} seconds")
-        
-        if 'angry' in df.columns:
-            angry_times = df[df['angry'] > 0.4]
-            if not angry_times.empty:
-                start_time = angry_times['timestamp'].iloc[0].strftime('%H:%M:%S')
-                duration = len(angry_times)
-                analysis.append(f"<b>Angry Period:</b> Started at {start_time}, lasted {duration} seconds")
+        for row in summary.itertuples(index=False):
+            label = REPORT_PERIOD_RULES[row.column][0]
+            episode_word = "episode" if row.episodes == 1 else "episodes"
+            analysis.append(
+                f"<b>{label} Period:</b> Started at {row.first_start.strftime('%H:%M:%S')}, "
+                f"{row.episodes} {episode_word} totalling {self._format_seconds(row.total_s)}; "
+                f"longest started at {row.longest_start.strftime('%H:%M:%S')} "
+                f"and lasted {self._format_seconds(row.longest_s)}"
+            )
         
         if not analysis:
             analysis.append("No significant emotion periods detected.")
         
         return analysis
     
+    def _format_seconds(self, seconds):
+        """Format a duration in seconds as e.g. '42 seconds' or '3m 05s'"""
+        seconds = int(round(seconds))
+        if seconds < 60:
+            return f"{seconds} seconds"
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        if hours:
+            return f"{hours}h {minutes:02d}m {seconds:02d}s"
+        return f"{minutes}m {seconds:02d}s"
+    
     def _get_peak_time(self, df, column):
         """Get the time when a metric reached its peak"""
         if column in df.columns and not df.empty:
-            peak_idx = df[column].idxmax()
+            peak_idx = peak_series(df, column).idxmax()
             return df.loc[peak_idx, 'timestamp'].strftime('%H:%M:%S')
         return "N/A"
     
+    def _render_figure(self, fig):
+        """Render a figure to an in-memory PNG buffer and release it"""
+        # Figures built directly (not through pyplot) are never registered
+        # with a GUI manager, so they are safe to render on worker threads
+        try:
+            FigureCanvasAgg(fig)
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
+            buffer.seek(0)
+            return buffer
+        finally:
+            fig.clear()
+    
     def _create_timeline_chart(self, df):
-        """Create timeline chart and save as image"""
+        """Create timeline chart as an in-memory PNG"""
         try:
-            plt.figure(figsize=(10, 6))
+            fig = Figure(figsize=(10, 6))
+            ax = fig.add_subplot(1, 1, 1)
             
             if 'stress' in df.columns:
-                plt.plot(df['timestamp'], df['stress'], 'r-', linewidth=2, label='Stress')
+                ax.plot(df['timestamp'], df['stress'], 'r-', linewidth=2, label='Stress')
             
             if 'engagement' in df.columns:
-                plt.plot(df['timestamp'], df['engagement'], 'g-', linewidth=2, label='Engagement')
+                ax.plot(df['timestamp'], df['engagement'], 'g-', linewidth=2, label='Engagement')
             
-            plt.title('Emotion Timeline', fontsize=16)
-            plt.xlabel('Time', fontsize=12)
-            plt.ylabel('Score', fontsize=12)
-            plt.ylim(0, 1)
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-            plt.tight_layout()
+            ax.set_title('Emotion Timeline', fontsize=16)
+            ax.set_xlabel('Time', fontsize=12)
+            ax.set_ylabel('Score', fontsize=12)
+            ax.set_ylim(0, 1)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+            fig.tight_layout()
             
-            # Save as image
-            temp_path = os.path.join(tempfile.gettempdir(), f"timeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-            plt.savefig(temp_path, dpi=150, bbox_inches='tight')
-            plt.close()
-            
-            print(f"Timeline chart saved to: {temp_path}")
-            return temp_path if os.path.exists(temp_path) else None
+            return self._render_figure(fig)
         except Exception as e:
             print(f"Timeline chart creation error: {e}")
             return None
     
     def _create_emotion_distribution_chart(self, df):
-        """Create emotion distribution chart"""
+        """Create emotion distribution chart as an in-memory PNG"""
         try:
             emotions = ['happy', 'sad', 'angry', 'fear', 'surprise', 'neutral']
             avg_emotions = {}
             
             for emotion in emotions:
                 if emotion in df.columns:
-                    avg_emotions[emotion] = df[emotion].mean()
+                    avg_emotions[emotion] = weighted_mean(df, emotion)
             
             if avg_emotions:
-                plt.figure(figsize=(10, 6))
+                fig = Figure(figsize=(10, 6))
+                ax = fig.add_subplot(1, 1, 1)
                 colors_list = ['gold', 'blue', 'red', 'purple', 'orange', 'gray']
                 
-                plt.bar(list(avg_emotions.keys()), list(avg_emotions.values()), 
+                ax.bar(list(avg_emotions.keys()), list(avg_emotions.values()), 
                        color=colors_list[:len(avg_emotions)])
                 
-                plt.title('Average Emotion Distribution', fontsize=16)
-                plt.xlabel('Emotions', fontsize=12)
-                plt.ylabel('Average Score', fontsize=12)
-                plt.ylim(0, max(avg_emotions.values()) * 1.1)
-                plt.tight_layout()
-                
-                temp_path = os.path.join(tempfile.gettempdir(), f"emotions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-                plt.savefig(temp_path, dpi=150, bbox_inches='tight')
-                plt.close()
+                ax.set_title('Average Emotion Distribution', fontsize=16)
+                ax.set_xlabel('Emotions', fontsize=12)
+                ax.set_ylabel('Average Score', fontsize=12)
+                ax.set_ylim(0, max(avg_emotions.values()) * 1.1)
+                fig.tight_layout()
                 
-                print(f"Emotion chart saved to: {temp_path}")
-                return temp_path if os.path.exists(temp_path) else None
+                return self._render_figure(fig)
             else:
                 print("No emotion data found for chart")
                 return None
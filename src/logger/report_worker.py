@@ -0,0 +1,91 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src.config import REPORT_CACHE_SIZE
+
+class ReportJob:
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.status = 'pending'  # pending, running, done, failed
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result_path = None
+        self.error = None
+        self.cached = False
+    
+    @property
+    def is_finished(self):
+        return self.status in ('done', 'failed')
+    
+    def update_progress(self, fraction, message):
+        """Progress callback passed to the report generator"""
+        self.progress = max(0.0, min(1.0, fraction))
+        self.message = message
+
+class ReportWorker:
+    def __init__(self, report_generator, cache_size=REPORT_CACHE_SIZE):
+        self.report_generator = report_generator
+        self.cache_size = cache_size
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-worker")
+        self.jobs = OrderedDict()  # fingerprint -> ReportJob
+        self._lock = threading.Lock()
+    
+    def fingerprint(self, session_stats, df):
+        """Fingerprint the session data a report would be built from"""
+        digest = hashlib.sha1(str(session_stats.get('session_id', '')).encode())
+        digest.update(",".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return digest.hexdigest()
+    
+    def submit(self, session_stats, df):
+        """Queue report generation, reusing a cached or in-flight job for identical data"""
+        key = self.fingerprint(session_stats, df)
+        
+        with self._lock:
+            job = self.jobs.get(key)
+            if job is not None and job.status != 'failed':
+                if job.status != 'done' or os.path.exists(job.result_path):
+                    self.jobs.move_to_end(key)
+                    job.cached = job.status == 'done'
+                    return job
+            
+            job = ReportJob(key)
+            self.jobs[key] = job
+            while len(self.jobs) > self.cache_size:
+                self.jobs.popitem(last=False)
+        
+        # Snapshot inputs so the live session can keep appending
+        self.executor.submit(self._run, job, dict(session_stats), df.copy())
+        return job
+    
+    def _run(self, job, session_stats, df):
+        """Generate the report on the worker thread"""
+        job.status = 'running'
+        try:
+            job.result_path = self.report_generator.generate_pdf_report(
+                session_stats, df, progress_callback=job.update_progress
+            )
+            if job.result_path:
+                job.status = 'done'
+            else:
+                job.status = 'failed'
+                job.error = "No session data to report"
+        except Exception as e:
+            print(f"Report generation error: {e}")
+            job.status = 'failed'
+            job.error = str(e)
+    
+    def get_active_job(self):
+        """Get the most recent job that has not finished yet"""
+        with self._lock:
+            for job in reversed(self.jobs.values()):
+                if not job.is_finished:
+                    return job
+        return None
+    
+    def shutdown(self):
+        """Stop accepting jobs and wait for the current one"""
+        self.executor.shutdown(wait=True)
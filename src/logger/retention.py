@@ -0,0 +1,317 @@
+import os
+import csv
+import shutil
+from collections import deque, Counter
+from datetime import timedelta
+import pandas as pd
+from src.config import (EMOTIONS, RETENTION_RAW_SECONDS, RETENTION_SECOND_SECONDS, RETENTION_MINUTE_SECONDS,
+                        RETENTION_SPILL_TO_DISK, RETENTION_SPILL_DIR, RETENTION_SPILL_FLUSH_ROWS)
+
+# Numeric columns that are aggregated; everything else is carried by the raw tier only
+METRIC_COLUMNS = EMOTIONS + ['audio_stress_score', 'stress', 'engagement', 'confusion', 'confidence']
+
+def second_bucket(timestamp):
+    return timestamp.replace(microsecond=0)
+
+def minute_bucket(timestamp):
+    return timestamp.replace(second=0, microsecond=0)
+
+def sample_weights(df):
+    """Samples each row stands for: aggregate rows carry a 'samples' count, raw rows count once"""
+    if 'samples' not in df.columns:
+        return pd.Series(1, index=df.index)
+    return df['samples'].fillna(1)
+
+def weighted_mean(df, column):
+    """Mean of a metric over the samples behind a (possibly mixed-tier) session frame"""
+    if column not in df.columns:
+        return 0.0
+    valid = df[column].notna()
+    weights = sample_weights(df)[valid]
+    if not weights.sum():
+        return 0.0
+    return float((df.loc[valid, column] * weights).sum() / weights.sum())
+
+def peak_series(df, column):
+    """A metric's per-row peak: the bucket maximum for aggregate rows, the value itself for raw rows"""
+    if f'{column}_max' in df.columns:
+        return df[f'{column}_max'].fillna(df[column])
+    return df[column]
+
+class MetricAggregate:
+    """Sample count, mean/min/max of each metric and dominant state counts for one person and time bucket"""
+    __slots__ = ('timestamp', 'person_id', 'count', 'sums', 'mins', 'maxs', 'states')
+    
+    def __init__(self, timestamp, person_id):
+        self.timestamp = timestamp
+        self.person_id = person_id
+        self.count = 0
+        self.sums = {}
+        self.mins = {}
+        self.maxs = {}
+        self.states = Counter()
+    
+    def add_sample(self, sample):
+        self.count += 1
+        for metric in METRIC_COLUMNS:
+            value = sample.get(metric)
+            if value is None:
+                continue
+            value = float(value)
+            self.sums[metric] = self.sums.get(metric, 0.0) + value
+            self.mins[metric] = min(self.mins.get(metric, value), value)
+            self.maxs[metric] = max(self.maxs.get(metric, value), value)
+        state = sample.get('dominant_state')
+        if state:
+            self.states[state] += 1
+    
+    def merge(self, other):
+        self.count += other.count
+        for metric, total in other.sums.items():
+            self.sums[metric] = self.sums.get(metric, 0.0) + total
+            self.mins[metric] = min(self.mins.get(metric, other.mins[metric]), other.mins[metric])
+            self.maxs[metric] = max(self.maxs.get(metric, other.maxs[metric]), other.maxs[metric])
+        self.states.update(other.states)
+    
+    def to_row(self, session_id, tier):
+        """Row in the raw sample layout (metric columns hold means) plus min/max and count columns"""
+        row = {
+            'timestamp': self.timestamp,
+            'session_id': session_id,
+            'person_id': self.person_id,
+            'tier': tier,
+            'samples': self.count
+        }
+        for metric, total in self.sums.items():
+            row[metric] = total / self.count
+            row[f'{metric}_min'] = self.mins[metric]
+            row[f'{metric}_max'] = self.maxs[metric]
+        row['dominant_state'] = self.states.most_common(1)[0][0] if self.states else None
+        row['state_counts'] = dict(self.states)
+        return row
+
+class TieredSessionStore:
+    """Session samples kept at full resolution for the recent past, then as per-second and
+    per-minute aggregates, so memory stays flat however long the session runs"""
+    def __init__(self, session_id, raw_seconds=RETENTION_RAW_SECONDS, second_seconds=RETENTION_SECOND_SECONDS,
+                 minute_seconds=RETENTION_MINUTE_SECONDS, spill_to_disk=RETENTION_SPILL_TO_DISK,
+                 spill_dir=RETENTION_SPILL_DIR):
+        self.session_id = session_id
+        self.raw_window = timedelta(seconds=raw_seconds)
+        self.second_window = timedelta(seconds=second_seconds)
+        self.minute_window = timedelta(seconds=minute_seconds)
+        
+        self.raw = deque()  # Sample dicts, time ordered
+        self.seconds = deque()  # Closed per-second MetricAggregates, time ordered
+        self.minutes = deque()  # Closed per-minute MetricAggregates, time ordered
+        self._open_seconds = {}  # (bucket, person_id) -> MetricAggregate still receiving samples
+        self._open_minutes = {}
+        self.expired_minutes = 0  # Minute rows dropped from memory (still counted in the totals)
+        
+        # Running totals so session statistics cover every sample without rescanning
+        self.total_records = 0
+        self._stress_sum = 0.0
+        self._stress_max = None
+        self._engagement_sum = 0.0
+        self._confidence_sum = 0.0
+        self._states = Counter()
+        self._people = set()
+        
+        self.spill_path = None
+        self.spilled_records = 0
+        self._spill_file = None
+        self._spill_writer = None
+        self._spill_pending = 0
+        if spill_to_disk:
+            self.spill_path = os.path.join(spill_dir, f"session_{session_id}_raw.csv")
+    
+    def append(self, sample):
+        """Add a sample (samples arrive in time order) and compact anything that aged out"""
+        self.raw.append(sample)
+        self._update_totals(sample)
+        
+        newest = sample['timestamp']
+        raw_cutoff = newest - self.raw_window
+        while self.raw and self.raw[0]['timestamp'] < raw_cutoff:
+            old = self.raw.popleft()
+            self._spill(old)
+            bucket = second_bucket(old['timestamp'])
+            self._close_before(self._open_seconds, bucket, self.seconds)
+            self._bucket(self._open_seconds, bucket, old.get('person_id')).add_sample(old)
+        
+        second_cutoff = newest - self.second_window
+        while self.seconds and self.seconds[0].timestamp < second_cutoff:
+            aggregate = self.seconds.popleft()
+            bucket = minute_bucket(aggregate.timestamp)
+            self._close_before(self._open_minutes, bucket, self.minutes)
+            self._bucket(self._open_minutes, bucket, aggregate.person_id).merge(aggregate)
+        
+        minute_cutoff = newest - self.minute_window
+        while self.minutes and self.minutes[0].timestamp < minute_cutoff:
+            self.minutes.popleft()
+            self.expired_minutes += 1
+    
+    def _bucket(self, open_buckets, bucket, person_id):
+        key = (bucket, person_id)
+        aggregate = open_buckets.get(key)
+        if aggregate is None:
+            aggregate = open_buckets[key] = MetricAggregate(bucket, person_id)
+        return aggregate
+    
+    def _close_before(self, open_buckets, bucket, closed):
+        """Move open aggregates older than bucket to the closed tier"""
+        if not open_buckets:
+            return
+        finished = sorted((key for key in open_buckets if key[0] < bucket), key=lambda key: key[0])
+        for key in finished:
+            closed.append(open_buckets.pop(key))
+    
+    def _update_totals(self, sample):
+        self.total_records += 1
+        stress = sample.get('stress')
+        if stress is not None:
+            self._stress_sum += stress
+            self._stress_max = stress if self._stress_max is None else max(self._stress_max, stress)
+        self._engagement_sum += sample.get('engagement', 0) or 0
+        self._confidence_sum += sample.get('confidence', 0) or 0
+        state = sample.get('dominant_state')
+        if state:
+            self._states[state] += 1
+        if sample.get('person_id') is not None:
+            self._people.add(sample['person_id'])
+    
+    def _spill(self, sample):
+        """Append an evicted raw sample to the session's spill file"""
+        if self.spill_path is None:
+            return
+        try:
+            if self._spill_writer is None:
+                os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+                self._spill_file = open(self.spill_path, 'w', newline='')
+                self._spill_writer = csv.DictWriter(self._spill_file, fieldnames=list(sample.keys()),
+                                                    extrasaction='ignore')
+                self._spill_writer.writeheader()
+            self._spill_writer.writerow(sample)
+            self.spilled_records += 1
+            self._spill_pending += 1
+            if self._spill_pending >= RETENTION_SPILL_FLUSH_ROWS:
+                self._spill_file.flush()
+                self._spill_pending = 0
+        except Exception as e:
+            print(f"Session spill error: {e}")
+            self.spill_path = None
+    
+    def recent_dataframe(self, seconds):
+        """Raw samples from the last `seconds` of the session"""
+        if not self.raw:
+            return pd.DataFrame()
+        
+        # Samples are appended in time order, so scan back from the newest one
+        cutoff = self.raw[-1]['timestamp'] - timedelta(seconds=seconds)
+        rows = []
+        for sample in reversed(self.raw):
+            if sample['timestamp'] < cutoff:
+                break
+            rows.append(sample)
+        rows.reverse()
+        return pd.DataFrame(rows)
+    
+    def aggregate_dataframe(self, tier='second'):
+        """Closed and open aggregates of one tier ('second' or 'minute'), including state counts"""
+        if tier == 'second':
+            closed, open_buckets = self.seconds, self._open_seconds
+        else:
+            closed, open_buckets = self.minutes, self._open_minutes
+        aggregates = list(closed) + sorted(open_buckets.values(), key=lambda aggregate: aggregate.timestamp)
+        return pd.DataFrame([aggregate.to_row(self.session_id, tier) for aggregate in aggregates])
+    
+    def to_dataframe(self, full_resolution=False):
+        """Whole session oldest first: minute, then second aggregates, then raw samples.
+        With full_resolution and a spill file, the spilled raw samples replace the aggregates."""
+        if full_resolution and self.spilled_records and self.spill_path:
+            frames = [self._read_spill(), pd.DataFrame(list(self.raw))]
+            return pd.concat([frame for frame in frames if not frame.empty], ignore_index=True)
+        
+        aggregate_rows = []
+        for tier in ('minute', 'second'):
+            df = self.aggregate_dataframe(tier)
+            if not df.empty:
+                aggregate_rows.append(df.drop(columns=['state_counts']))
+        if not aggregate_rows:
+            return pd.DataFrame(list(self.raw))
+        
+        raw_df = pd.DataFrame(list(self.raw))
+        if not raw_df.empty:
+            raw_df['tier'] = 'raw'
+            raw_df['samples'] = 1
+            aggregate_rows.append(raw_df)
+        return pd.concat(aggregate_rows, ignore_index=True)
+    
+    def export_csv(self, path):
+        """Write every sample to a CSV at full resolution when spilled: the spill file is copied
+        and the raw tail appended, so the session is never built as one frame"""
+        if not (self.spilled_records and self.spill_path):
+            self.to_dataframe().to_csv(path, index=False)
+            return path
+        
+        if self._spill_file is not None:
+            self._spill_file.flush()
+            self._spill_pending = 0
+        with open(self.spill_path, newline='') as spill, open(path, 'w', newline='') as out:
+            fieldnames = next(csv.reader(spill))
+            spill.seek(0)
+            shutil.copyfileobj(spill, out)
+            writer = csv.DictWriter(out, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writerows(self.raw)
+        return path
+    
+    def _read_spill(self):
+        try:
+            if self._spill_file is not None:
+                self._spill_file.flush()
+                self._spill_pending = 0
+            df = pd.read_csv(self.spill_path)
+            df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+            return df
+        except Exception as e:
+            print(f"Session spill read error: {e}")
+            return pd.DataFrame()
+    
+    def get_totals(self):
+        """Statistics over every sample logged, whichever tier it now lives in"""
+        count = self.total_records
+        return {
+            'total_records': count,
+            'avg_stress': self._stress_sum / count if count else 0,
+            'max_stress': self._stress_max if self._stress_max is not None else 0,
+            'avg_engagement': self._engagement_sum / count if count else 0,
+            'avg_confidence': self._confidence_sum / count if count else 0,
+            'dominant_states': dict(self._states.most_common()),
+            'people_tracked': len(self._people)
+        }
+    
+    def get_stats(self):
+        """Rows held per tier and spill progress"""
+        return {
+            'raw': len(self.raw),
+            'second': len(self.seconds) + len(self._open_seconds),
+            'minute': len(self.minutes) + len(self._open_minutes),
+            'expired_minutes': self.expired_minutes,
+            'spilled': self.spilled_records
+        }
+    
+    def close(self, discard_spill=False):
+        """Close the spill file, optionally deleting it once its samples have been saved elsewhere"""
+        if self._spill_file is not None:
+            try:
+                self._spill_file.close()
+            except Exception as e:
+                print(f"Session spill error: {e}")
+            self._spill_file = None
+            self._spill_writer = None
+        if discard_spill and self.spill_path and os.path.exists(self.spill_path):
+            try:
+                os.remove(self.spill_path)
+            except OSError as e:
+                print(f"Session spill error: {e}")
+            self.spill_path = None
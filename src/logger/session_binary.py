@@ -0,0 +1,230 @@
+import os
+import shutil
+import struct
+import numpy as np
+import pandas as pd
+from src.config import EMOTIONS, SESSION_LOGS_DIR, SESSION_EXPORT_CHUNK_ROWS
+
+# File layout (little endian):
+#   64-byte header: magic, version, header size, row count, session id
+#   then one contiguous array per column in SESSION_COLUMNS order,
+#   each starting on a 64-byte boundary
+# Version 2 appends a person_id column (NO_PERSON when the row is not per-person)
+MAGIC = b"EMOSESS\0"
+FORMAT_VERSION = 2
+HEADER_SIZE = 64
+HEADER_STRUCT = struct.Struct("<8sHHQ16s")
+ALIGNMENT = 64
+BINARY_EXTENSION = ".emsb"
+
+SESSION_COLUMNS_V1 = (
+    [('timestamp', np.dtype('<i8'))] +
+    [(emotion, np.dtype('<f4')) for emotion in EMOTIONS] +
+    [(metric, np.dtype('<f4')) for metric in ['audio_stress_score', 'stress', 'engagement', 'confusion', 'confidence']] +
+    [('dominant_state', np.dtype('u1'))]
+)
+SESSION_COLUMNS = SESSION_COLUMNS_V1 + [('person_id', np.dtype('<i4'))]
+COLUMNS_BY_VERSION = {1: SESSION_COLUMNS_V1, 2: SESSION_COLUMNS}
+NO_PERSON = -1
+
+DOMINANT_STATES = ['stressed', 'engaged', 'confused', 'positive', 'negative', 'calm', 'neutral']
+UNKNOWN_STATE = 255
+
+def _column_offsets(row_count, columns=SESSION_COLUMNS):
+    """Byte offset of each column array and the total file size for a row count"""
+    offsets = {}
+    position = HEADER_SIZE
+    for name, dtype in columns:
+        position = -(-position // ALIGNMENT) * ALIGNMENT
+        offsets[name] = position
+        position += row_count * dtype.itemsize
+    return offsets, position
+
+def _frame_session_id(df):
+    return str(df['session_id'].iloc[0]) if 'session_id' in df.columns and not df.empty else ""
+
+def _write_header(f, row_count, session_id):
+    header = HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, HEADER_SIZE, row_count,
+                                session_id.encode('ascii', 'replace')[:16])
+    f.write(header.ljust(HEADER_SIZE, b'\0'))
+
+def write_session_binary(df, path, session_id=None):
+    """Write a session DataFrame in the binary columnar format"""
+    if session_id is None:
+        session_id = _frame_session_id(df)
+    
+    row_count = len(df)
+    offsets, _ = _column_offsets(row_count)
+    
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        _write_header(f, row_count, session_id)
+        for name, dtype in SESSION_COLUMNS:
+            f.write(b'\0' * (offsets[name] - f.tell()))
+            _column_values(df, name, dtype).tofile(f)
+    os.replace(tmp_path, path)
+    return path
+
+def write_session_binary_chunks(chunks, path, session_id=None):
+    """Write session DataFrame chunks in the binary columnar format, holding one chunk at a time:
+    each column is spooled to its own file, then the spools are copied into place"""
+    tmp_path = path + ".tmp"
+    spool_paths = {name: f"{tmp_path}.{index}" for index, (name, _) in enumerate(SESSION_COLUMNS)}
+    row_count = 0
+    try:
+        spools = {name: open(spool_path, 'wb') for name, spool_path in spool_paths.items()}
+        try:
+            for df in chunks:
+                if session_id is None:
+                    session_id = _frame_session_id(df)
+                for name, dtype in SESSION_COLUMNS:
+                    _column_values(df, name, dtype).tofile(spools[name])
+                row_count += len(df)
+        finally:
+            for spool in spools.values():
+                spool.close()
+        
+        offsets, _ = _column_offsets(row_count)
+        with open(tmp_path, 'wb') as f:
+            _write_header(f, row_count, session_id or "")
+            for name, _ in SESSION_COLUMNS:
+                f.write(b'\0' * (offsets[name] - f.tell()))
+                with open(spool_paths[name], 'rb') as spool:
+                    shutil.copyfileobj(spool, f)
+        os.replace(tmp_path, path)
+    finally:
+        for spool_path in spool_paths.values():
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+    return path
+
+def _column_values(df, name, dtype):
+    """Convert one DataFrame column to its on-disk array"""
+    if name == 'timestamp':
+        return pd.to_datetime(df['timestamp'], format='ISO8601').to_numpy(dtype='datetime64[ns]').view(np.int64).astype(dtype)
+    if name == 'dominant_state':
+        codes = {state: i for i, state in enumerate(DOMINANT_STATES)}
+        if name not in df.columns:
+            return np.full(len(df), UNKNOWN_STATE, dtype=dtype)
+        return df[name].map(codes).fillna(UNKNOWN_STATE).to_numpy().astype(dtype)
+    if name == 'person_id':
+        if name not in df.columns:
+            return np.full(len(df), NO_PERSON, dtype=dtype)
+        return pd.to_numeric(df[name], errors='coerce').fillna(NO_PERSON).to_numpy().astype(dtype)
+    if name not in df.columns:
+        return np.full(len(df), np.nan, dtype=dtype)
+    return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=dtype)
+
+class SessionArrays:
+    """Zero-copy, read-only view of a binary session file"""
+    def __init__(self, path):
+        self.path = path
+        self._raw = np.memmap(path, dtype=np.uint8, mode='r')
+        
+        magic, version, header_size, row_count, session_id = HEADER_STRUCT.unpack_from(self._raw, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an EMOTISENSE session file: {path}")
+        if version not in COLUMNS_BY_VERSION or header_size != HEADER_SIZE:
+            raise ValueError(f"Unsupported session file version {version}: {path}")
+        
+        self.version = version
+        self.row_count = row_count
+        self.session_id = session_id.rstrip(b'\0').decode('ascii', 'replace')
+        self.column_layout = COLUMNS_BY_VERSION[version]
+        
+        offsets, end = _column_offsets(row_count, self.column_layout)
+        if len(self._raw) < end:
+            raise ValueError(f"Truncated session file: {path}")
+        
+        self.columns = {}
+        for name, dtype in self.column_layout:
+            start = offsets[name]
+            self.columns[name] = self._raw[start:start + row_count * dtype.itemsize].view(dtype)
+    
+    def __len__(self):
+        return self.row_count
+    
+    def __getitem__(self, name):
+        return self.columns[name]
+    
+    @property
+    def timestamps(self):
+        """Timestamps as datetime64[ns] (still a view of the file)"""
+        return self.columns['timestamp'].view('datetime64[ns]')
+    
+    def dominant_states(self):
+        """Decode dominant state codes to strings"""
+        labels = np.array(DOMINANT_STATES + ['unknown'], dtype=object)
+        codes = np.asarray(self.columns['dominant_state'])
+        return labels[np.where(codes == UNKNOWN_STATE, len(DOMINANT_STATES), codes)]
+    
+    def to_dataframe(self, columns=None, start=None, stop=None):
+        """Materialize a (sliced) DataFrame in the same layout as the session CSV"""
+        names = columns or [name for name, _ in self.column_layout]
+        window = slice(start, stop)
+        data = {}
+        for name in names:
+            if name == 'timestamp':
+                data[name] = self.timestamps[window]
+            elif name == 'dominant_state':
+                data[name] = self.dominant_states()[window]
+            elif name == 'person_id':
+                ids = self.columns[name][window]
+                data[name] = np.where(ids == NO_PERSON, np.nan, ids)
+            else:
+                data[name] = self.columns[name][window]
+        
+        df = pd.DataFrame(data)
+        if columns is None:
+            df.insert(1, 'session_id', self.session_id)
+        return df
+
+def open_session_binary(path):
+    """Open a binary session file via numpy.memmap"""
+    return SessionArrays(path)
+
+def load_session_dataframe(path):
+    """Load a saved session from its binary or CSV form, sorted by time"""
+    if path.endswith(BINARY_EXTENSION):
+        df = open_session_binary(path).to_dataframe()
+    else:
+        df = pd.read_csv(path)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+    return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+def binary_path_for(csv_path):
+    """Binary file path that sits next to a session CSV"""
+    return os.path.splitext(csv_path)[0] + BINARY_EXTENSION
+
+def csv_to_binary(csv_path, out_path=None, session_id=None, chunk_rows=SESSION_EXPORT_CHUNK_ROWS):
+    """Convert a session CSV written by save_session_log to the binary format, chunk by chunk"""
+    out_path = out_path or binary_path_for(csv_path)
+    return write_session_binary_chunks(pd.read_csv(csv_path, chunksize=chunk_rows), out_path, session_id)
+
+def convert_session_logs(directory=SESSION_LOGS_DIR, force=False):
+    """Convert every session CSV in a directory, skipping ones already up to date"""
+    converted = []
+    if not os.path.isdir(directory):
+        return converted
+    
+    for filename in sorted(os.listdir(directory)):
+        if not (filename.startswith("session_") and filename.endswith(".csv")):
+            continue
+        if filename.endswith("_perf.csv") or filename.endswith("_alerts.csv"):
+            continue
+        
+        csv_path = os.path.join(directory, filename)
+        out_path = binary_path_for(csv_path)
+        if not force and os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(csv_path):
+            continue
+        
+        try:
+            converted.append(csv_to_binary(csv_path, out_path))
+        except Exception as e:
+            print(f"Binary conversion error for {filename}: {e}")
+    
+    return converted
+
+if __name__ == "__main__":
+    paths = convert_session_logs()
+    print(f"Converted {len(paths)} session file(s) to {BINARY_EXTENSION}")
@@ -0,0 +1,186 @@
+import os
+import re
+import json
+import sqlite3
+import threading
+import pandas as pd
+from src.config import SESSION_CATALOG_PATH, SESSION_LOGS_DIR
+
+SESSION_FILE_PATTERN = re.compile(r"^session_(?P<session_id>[^_]+)_(?P<saved>\d{8}_\d{6})\.csv$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    file_path TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    start_time TEXT,
+    end_time TEXT,
+    duration_s REAL,
+    record_count INTEGER,
+    mean_stress REAL,
+    max_stress REAL,
+    p50_stress REAL,
+    p90_stress REAL,
+    p95_stress REAL,
+    mean_engagement REAL,
+    mean_confidence REAL,
+    state_counts TEXT,
+    file_mtime REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions (start_time);
+CREATE INDEX IF NOT EXISTS idx_sessions_session_id ON sessions (session_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_mean_stress ON sessions (mean_stress);
+"""
+
+# Columns summarize_session reads
+CATALOG_SUMMARY_COLUMNS = ['timestamp', 'stress', 'engagement', 'confidence', 'dominant_state']
+
+def summarize_session(df, session_id, file_path):
+    """Build a catalog row from a session DataFrame"""
+    timestamps = pd.to_datetime(df['timestamp'], format='ISO8601') if 'timestamp' in df.columns else pd.Series(dtype='datetime64[ns]')
+    start_time = timestamps.min() if not timestamps.empty else None
+    end_time = timestamps.max() if not timestamps.empty else None
+    stress = df['stress'] if 'stress' in df.columns else pd.Series(dtype=float)
+
+    def metric(value):
+        return float(value) if pd.notna(value) else None
+
+    state_counts = df['dominant_state'].value_counts().to_dict() if 'dominant_state' in df.columns else {}
+
+    return {
+        'file_path': os.path.abspath(file_path),
+        'session_id': str(session_id),
+        'start_time': start_time.isoformat() if start_time is not None else None,
+        'end_time': end_time.isoformat() if end_time is not None else None,
+        'duration_s': (end_time - start_time).total_seconds() if start_time is not None else 0.0,
+        'record_count': len(df),
+        'mean_stress': metric(stress.mean()),
+        'max_stress': metric(stress.max()),
+        'p50_stress': metric(stress.quantile(0.5)),
+        'p90_stress': metric(stress.quantile(0.9)),
+        'p95_stress': metric(stress.quantile(0.95)),
+        'mean_engagement': metric(df['engagement'].mean()) if 'engagement' in df.columns else None,
+        'mean_confidence': metric(df['confidence'].mean()) if 'confidence' in df.columns else None,
+        'state_counts': json.dumps({str(k): int(v) for k, v in state_counts.items()}),
+        'file_mtime': os.path.getmtime(file_path) if os.path.exists(file_path) else None
+    }
+
+class SessionCatalog:
+    def __init__(self, db_path=SESSION_CATALOG_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def record_session(self, df, session_id, file_path):
+        """Insert or update the summary for a saved session file"""
+        row = summarize_session(df, session_id, file_path)
+        columns = ", ".join(row.keys())
+        placeholders = ", ".join(f":{key}" for key in row)
+        with self._lock, self._conn:
+            self._conn.execute(f"INSERT OR REPLACE INTO sessions ({columns}) VALUES ({placeholders})", row)
+        return row
+
+    def query(self, session_id=None, start_after=None, start_before=None,
+              min_mean_stress=None, min_max_stress=None, state=None, limit=None):
+        """Query session summaries, newest first"""
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if start_after is not None:
+            clauses.append("start_time >= ?")
+            params.append(pd.Timestamp(start_after).isoformat())
+        if start_before is not None:
+            clauses.append("start_time < ?")
+            params.append(pd.Timestamp(start_before).isoformat())
+        if min_mean_stress is not None:
+            clauses.append("mean_stress >= ?")
+            params.append(min_mean_stress)
+        if min_max_stress is not None:
+            clauses.append("max_stress >= ?")
+            params.append(min_max_stress)
+        if state is not None:
+            clauses.append("EXISTS (SELECT 1 FROM json_each(state_counts) WHERE key = ?)")
+            params.append(state)
+
+        sql = "SELECT * FROM sessions"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY start_time DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        results = []
+        for row in rows:
+            entry = dict(row)
+            entry['state_counts'] = json.loads(entry['state_counts'] or '{}')
+            results.append(entry)
+        return results
+
+    def query_dataframe(self, **filters):
+        """Query session summaries as a DataFrame"""
+        return pd.DataFrame(self.query(**filters))
+
+    def aggregate(self, start_after=None, start_before=None):
+        """Totals across sessions in a time range"""
+        sql = ("SELECT COUNT(*) AS sessions, SUM(record_count) AS records, SUM(duration_s) AS duration_s, "
+               "SUM(mean_stress * record_count) / SUM(record_count) AS mean_stress, MAX(max_stress) AS max_stress "
+               "FROM sessions WHERE start_time >= ? AND start_time < ?")
+        params = [
+            pd.Timestamp(start_after).isoformat() if start_after is not None else "",
+            pd.Timestamp(start_before).isoformat() if start_before is not None else "9999"
+        ]
+        with self._lock:
+            return dict(self._conn.execute(sql, params).fetchone())
+
+    def backfill(self, directory=SESSION_LOGS_DIR, force=False):
+        """Import existing session CSVs; skips files already catalogued and unchanged"""
+        if not os.path.isdir(directory):
+            return 0
+
+        with self._lock:
+            known = dict(self._conn.execute("SELECT file_path, file_mtime FROM sessions").fetchall())
+
+        imported = 0
+        for filename in sorted(os.listdir(directory)):
+            match = SESSION_FILE_PATTERN.match(filename)
+            if not match:
+                continue
+
+            file_path = os.path.abspath(os.path.join(directory, filename))
+            if not force and known.get(file_path) == os.path.getmtime(file_path):
+                continue
+
+            try:
+                df = pd.read_csv(file_path, usecols=lambda column: column in CATALOG_SUMMARY_COLUMNS)
+                self.record_session(df, match.group('session_id'), file_path)
+                imported += 1
+            except Exception as e:
+                print(f"Catalog import error for {filename}: {e}")
+
+        return imported
+
+    def remove_missing(self):
+        """Drop catalog entries whose session file no longer exists"""
+        with self._lock:
+            paths = [row[0] for row in self._conn.execute("SELECT file_path FROM sessions")]
+        missing = [(path,) for path in paths if not os.path.exists(path)]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM sessions WHERE file_path = ?", missing)
+        return len(missing)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+if __name__ == "__main__":
+    catalog = SessionCatalog()
+    count = catalog.backfill()
+    print(f"Imported {count} session file(s) into {catalog.db_path}")
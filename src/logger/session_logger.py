@@ -1,73 +1,127 @@
+import os
 import pandas as pd
 from datetime import datetime
 import uuid
+from src.logger.retention import TieredSessionStore
+from src.logger.session_binary import binary_path_for, load_session_dataframe
 
 class SessionLogger:
-    def __init__(self):
+    def __init__(self, retention=None):
         self.session_id = str(uuid.uuid4())[:8]
-        self.session_data = []
+        self.retention = retention or {}  # TieredSessionStore overrides, e.g. {'raw_seconds': 60}
+        self.store = TieredSessionStore(self.session_id, spill_to_disk=False)
+        self.alert_events = []
         self.start_time = None
         self.is_active = False
+        self.saved_path = None  # Log the stopped session was streamed to, reloaded for the report
+    
+    @property
+    def total_records(self):
+        """Samples logged this session, across all retention tiers"""
+        return self.store.total_records
     
     def start_session(self):
         """Start a new logging session"""
         self.session_id = str(uuid.uuid4())[:8]
-        self.session_data = []
+        self.store.close(discard_spill=True)
+        self.store = TieredSessionStore(self.session_id, **self.retention)
+        self.alert_events = []
+        self.saved_path = None
         self.start_time = datetime.now()
         self.is_active = True
         print(f"Session {self.session_id} started at {self.start_time}")
     
-    def log_data(self, face_emotions, audio_stress_score, fused_metrics):
-        """Log data point to session"""
+    def log_data(self, face_emotions, audio_stress_score, fused_metrics, person_id=None, timestamp=None):
+        """Log data point to session, for one tracked person when person_id is given"""
         if not self.is_active:
             return
         
-        timestamp = datetime.now()
+        if timestamp is None:
+            timestamp = datetime.now()
         
         # Create data point
         data_point = {
             'timestamp': timestamp,
             'session_id': self.session_id,
+            'person_id': person_id,
             'audio_stress_score': audio_stress_score,
             **face_emotions,  # Unpack face emotions
             **fused_metrics   # Unpack fused metrics
         }
         
-        self.session_data.append(data_point)
+        self.store.append(data_point)
+    
+    def log_people(self, people, audio_stress_score, timestamp=None):
+        """Log one row per tracked person, all sharing a timestamp"""
+        if timestamp is None:
+            timestamp = datetime.now()
+        for person_id, person in people.items():
+            self.log_data(person['face_emotions'], audio_stress_score, person['fused_metrics'],
+                          person_id=person_id, timestamp=timestamp)
     
-    def get_session_dataframe(self):
-        """Get current session data as DataFrame"""
-        if not self.session_data:
-            return pd.DataFrame()
+    def log_alert_events(self, events):
+        """Log alert raised/cleared events alongside the session data"""
+        if not self.is_active:
+            return
         
-        return pd.DataFrame(self.session_data)
+        for event in events:
+            self.alert_events.append({'session_id': self.session_id, **event})
+    
+    def get_alert_dataframe(self):
+        """Get alert events as DataFrame"""
+        return pd.DataFrame(self.alert_events)
+    
+    def get_session_dataframe(self, full_resolution=False):
+        """Get current session data as DataFrame; older data comes from the aggregate tiers
+        unless full_resolution reads the spilled raw samples back. Once stopped and saved, the
+        saved log is reloaded (the .emsb when there is one) rather than kept in memory."""
+        if not self.is_active and self.saved_path is not None:
+            binary_path = binary_path_for(self.saved_path)
+            try:
+                return load_session_dataframe(binary_path if os.path.exists(binary_path) else self.saved_path)
+            except Exception as e:
+                print(f"Saved session load error: {e}")
+        return self.store.to_dataframe(full_resolution=full_resolution)
     
-    def stop_session(self):
-        """Stop current session"""
-        if self.is_active:
-            self.is_active = False
-            end_time = datetime.now()
-            duration = end_time - self.start_time if self.start_time else None
-            print(f"Session {self.session_id} stopped. Duration: {duration}")
-            return self.get_session_dataframe()
-        return pd.DataFrame()
+    def get_recent_dataframe(self, seconds):
+        """Get only the last `seconds` of session data as DataFrame"""
+        return self.store.recent_dataframe(seconds)
+    
+    def get_retention_stats(self):
+        """Rows held in each retention tier"""
+        return self.store.get_stats()
+    
+    def stop_session(self, filepath=None):
+        """Stop current session, streaming its full-resolution samples to a CSV at filepath
+        when given; returns the saved path, or None when nothing was saved"""
+        if not self.is_active:
+            return None
+        
+        self.is_active = False
+        end_time = datetime.now()
+        duration = end_time - self.start_time if self.start_time else None
+        print(f"Session {self.session_id} stopped. Duration: {duration}")
+        
+        if filepath is not None and self.store.total_records:
+            try:
+                self.saved_path = self.store.export_csv(filepath)
+            except Exception as e:
+                print(f"Session save error: {e}")
+        # The spill file is only kept when a requested save failed, so its samples are not lost
+        self.store.close(discard_spill=filepath is None or self.saved_path is not None)
+        return self.saved_path
     
     def get_session_stats(self):
         """Get session statistics"""
-        df = self.get_session_dataframe()
-        if df.empty:
+        if not self.store.total_records:
             return {}
         
+        # Running totals cover every sample, including ones already compacted
         stats = {
             'session_id': self.session_id,
             'start_time': self.start_time,
             'duration': datetime.now() - self.start_time if self.start_time else None,
-            'total_records': len(df),
-            'avg_stress': df['stress'].mean() if 'stress' in df.columns else 0,
-            'max_stress': df['stress'].max() if 'stress' in df.columns else 0,
-            'avg_engagement': df['engagement'].mean() if 'engagement' in df.columns else 0,
-            'avg_confidence': df['confidence'].mean() if 'confidence' in df.columns else 0,
-            'dominant_states': df['dominant_state'].value_counts().to_dict() if 'dominant_state' in df.columns else {}
+            **self.store.get_totals()
         }
         
         return stats
\ No newline at end of file
@@ -0,0 +1,103 @@
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+import numpy as np
+import pandas as pd
+from src.config import PERF_WINDOW_SIZE
+
+# Stages of a live dashboard tick, in pipeline order
+PIPELINE_STAGES = [
+    'frame_grab',
+    'face_detection',
+    'fer_inference',
+    'audio_capture',
+    'audio_features',
+    'fusion',
+    'logging',
+    'chart_building',
+    'preview_encode',
+    'worker_inference',
+    'worker_roundtrip'
+]
+
+class LatencyTracker:
+    def __init__(self, window_size=PERF_WINDOW_SIZE):
+        self.window_size = window_size
+        self.stage_samples = {stage: deque(maxlen=window_size) for stage in PIPELINE_STAGES}
+        self.stage_counts = {stage: 0 for stage in PIPELINE_STAGES}
+        self.tick_times = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def track(self, stage):
+        """Time the enclosed block and record it under the given stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+    
+    def record(self, stage, seconds):
+        """Record one latency sample (in seconds) for a stage"""
+        with self._lock:
+            if stage not in self.stage_samples:
+                self.stage_samples[stage] = deque(maxlen=self.window_size)
+                self.stage_counts[stage] = 0
+            self.stage_samples[stage].append(seconds)
+            self.stage_counts[stage] += 1
+    
+    def mark_tick(self):
+        """Mark the completion of one dashboard tick"""
+        with self._lock:
+            self.tick_times.append(time.monotonic())
+    
+    def get_fps(self):
+        """Effective ticks per second over the rolling window"""
+        with self._lock:
+            if len(self.tick_times) < 2:
+                return 0.0
+            elapsed = self.tick_times[-1] - self.tick_times[0]
+            return (len(self.tick_times) - 1) / elapsed if elapsed > 0 else 0.0
+    
+    def get_stage_stats(self, stage):
+        """Get p50/p95/p99 latency in milliseconds for a stage"""
+        with self._lock:
+            samples = np.array(self.stage_samples.get(stage, ()), dtype=np.float64)
+            total = self.stage_counts.get(stage, 0)
+        
+        if samples.size == 0:
+            return None
+        
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+        return {
+            'stage': stage,
+            'p50_ms': p50,
+            'p95_ms': p95,
+            'p99_ms': p99,
+            'mean_ms': samples.mean() * 1000,
+            'max_ms': samples.max() * 1000,
+            'samples': total
+        }
+    
+    def get_summary_dataframe(self):
+        """Get latency statistics for every recorded stage as a DataFrame"""
+        with self._lock:
+            stages = list(self.stage_samples.keys())
+        
+        rows = [stats for stats in (self.get_stage_stats(stage) for stage in stages) if stats]
+        return pd.DataFrame(rows)
+    
+    def reset(self):
+        """Clear all recorded samples"""
+        with self._lock:
+            for stage in self.stage_samples:
+                self.stage_samples[stage].clear()
+                self.stage_counts[stage] = 0
+            self.tick_times.clear()
+
+def track_stage(tracker, stage):
+    """Context manager timing a stage, or a no-op when no tracker is set"""
+    if tracker is None:
+        return nullcontext()
+    return tracker.track(stage)
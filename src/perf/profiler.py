@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from src.config import (SESSION_LOGS_DIR, PROFILE_SAMPLE_INTERVAL, MEMORY_SNAPSHOT_INTERVAL,
+                        PROFILE_MAX_SNAPSHOTS, PROFILE_TOP_ALLOCATIONS)
+from src.utils import ensure_directories
+
+class SessionProfiler:
+    def __init__(self, session_id, sample_interval=PROFILE_SAMPLE_INTERVAL,
+                 snapshot_interval=MEMORY_SNAPSHOT_INTERVAL):
+        self.session_id = session_id
+        self.sample_interval = sample_interval
+        self.snapshot_interval = snapshot_interval
+        self.stack_counts = Counter()
+        self.total_samples = 0
+        self.snapshots = []  # (seconds since start, tracemalloc snapshot)
+        self.start_time = None
+        self.is_active = False
+        self._started_tracemalloc = False
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start CPU sampling and periodic memory snapshots"""
+        if self.is_active:
+            return
+        
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        
+        self.start_time = time.monotonic()
+        self.is_active = True
+        self._stop_event.clear()
+        self._take_snapshot()
+        
+        self._thread = threading.Thread(target=self._run, name="session-profiler", daemon=True)
+        self._thread.start()
+        print(f"Profiling started for session {self.session_id}")
+    
+    def stop(self):
+        """Stop profiling and write profile and allocation files"""
+        if not self.is_active:
+            return None
+        
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+        self._take_snapshot()
+        self.is_active = False
+        
+        paths = self._write_outputs()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        
+        print(f"Profiling stopped for session {self.session_id}")
+        return paths
+    
+    def _run(self):
+        """Sampler loop: collect stacks of other threads and snapshot memory"""
+        own_id = threading.get_ident()
+        last_snapshot = time.monotonic()
+        
+        while not self._stop_event.wait(self.sample_interval):
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id != own_id:
+                        self.stack_counts[self._collapse_stack(frame)] += 1
+                self.total_samples += 1
+            del frames
+            
+            if time.monotonic() - last_snapshot >= self.snapshot_interval:
+                self._take_snapshot()
+                last_snapshot = time.monotonic()
+    
+    def _collapse_stack(self, frame):
+        """Collapse a frame chain to a root-first 'file:func:line;...' string"""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+    
+    def _take_snapshot(self):
+        """Record a filtered tracemalloc snapshot, keeping the first one as baseline"""
+        if not tracemalloc.is_tracing():
+            return
+        
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>")
+        ])
+        
+        with self._lock:
+            self.snapshots.append((time.monotonic() - self.start_time, snapshot))
+            if len(self.snapshots) > PROFILE_MAX_SNAPSHOTS:
+                del self.snapshots[1]
+    
+    def get_snapshot_times(self):
+        """Get the session offsets (seconds) of the stored snapshots"""
+        with self._lock:
+            return [offset for offset, _ in self.snapshots]
+    
+    def compare_snapshots(self, first=0, last=-1, limit=PROFILE_TOP_ALLOCATIONS):
+        """Diff two memory snapshots, largest growth first"""
+        with self._lock:
+            if len(self.snapshots) < 2:
+                return []
+            old_snapshot = self.snapshots[first][1]
+            new_snapshot = self.snapshots[last][1]
+        
+        rows = []
+        for stat in new_snapshot.compare_to(old_snapshot, 'lineno')[:limit]:
+            frame = stat.traceback[0]
+            rows.append({
+                'location': f"{frame.filename}:{frame.lineno}",
+                'size_diff_kb': stat.size_diff / 1024,
+                'size_kb': stat.size / 1024,
+                'count_diff': stat.count_diff
+            })
+        return rows
+    
+    def _write_outputs(self):
+        """Write collapsed CPU stacks and top allocations next to the session logs"""
+        ensure_directories()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        profile_path = os.path.join(SESSION_LOGS_DIR, f"session_{self.session_id}_{timestamp}_profile.txt")
+        memory_path = os.path.join(SESSION_LOGS_DIR, f"session_{self.session_id}_{timestamp}_memory.txt")
+        
+        # Collapsed-stack format, one "stack count" line each (flamegraph compatible)
+        with self._lock:
+            stacks = self.stack_counts.most_common()
+            snapshots = list(self.snapshots)
+        with open(profile_path, 'w') as f:
+            for stack, count in stacks:
+                f.write(f"{stack} {count}\n")
+        
+        with open(memory_path, 'w') as f:
+            if snapshots:
+                offset, latest = snapshots[-1]
+                f.write(f"Top allocations at +{offset:.1f}s\n")
+                for stat in latest.statistics('lineno')[:PROFILE_TOP_ALLOCATIONS]:
+                    f.write(f"{stat}\n")
+            
+            if len(snapshots) >= 2:
+                f.write(f"\nGrowth from +{snapshots[0][0]:.1f}s to +{snapshots[-1][0]:.1f}s\n")
+                for row in self.compare_snapshots():
+                    f.write(f"{row['location']}: {row['size_diff_kb']:+.1f} KiB "
+                            f"(now {row['size_kb']:.1f} KiB, {row['count_diff']:+d} blocks)\n")
+        
+        return profile_path, memory_path
@@ -0,0 +1,395 @@
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from src.config import (TIMELINE_SECONDS, SOAK_DURATION_SECONDS, SOAK_TICK_INTERVAL, SOAK_SAMPLE_INTERVAL,
+                        SOAK_REPORT_INTERVAL, SOAK_RETENTION_SECONDS, SOAK_WARMUP_FRACTION, SOAK_MIN_STEADY_SAMPLES,
+                        SOAK_MAX_RSS_SLOPE_MB_PER_HOUR, SOAK_MAX_LATENCY_SLOPE_MS_PER_HOUR,
+                        SOAK_MAX_QUEUE_SLOPE_PER_HOUR, SOAK_MAX_REPORT_SLOPE_MS_PER_HOUR)
+from src.perf.latency import LatencyTracker
+from src.fusion.fusion_engine import FusionEngine
+from src.fusion.stream_aligner import AlignedFusionBuffer
+from src.logger.session_logger import SessionLogger
+from src.logger.report_generator import ReportGenerator
+from src.alerts.alert_engine import AlertEngine
+from src.fallback.rule_based import FallbackEmotionGenerator
+from src.dashboard.plots import create_timeline_chart, create_stress_gauge
+from src.runtime_config import get_runtime_config
+
+def read_rss_mb():
+    """Resident set size of this process in MB, from /proc"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return None
+
+MIN_FIT_POINTS = 3
+
+def growth_slope(hours, values):
+    """Least-squares slope of values per hour, or None with too few points"""
+    points = [(h, v) for h, v in zip(hours, values) if v is not None and np.isfinite(v)]
+    if len(points) < MIN_FIT_POINTS:
+        return None
+    x, y = np.array(points, dtype=np.float64).T
+    if np.ptp(x) == 0:
+        return None
+    return float(np.polyfit(x, y, 1)[0])
+
+def parse_duration(text):
+    """Seconds from '90', '90s', '45m' or '8h'"""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    text = str(text).strip().lower()
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+class FallbackInputs:
+    """Synthetic face and audio inputs from the rule-based fallback generator"""
+    def __init__(self):
+        self.generator = FallbackEmotionGenerator()
+    
+    def face(self, tracker):
+        return self.generator.generate_face_emotions(), {}
+    
+    def audio(self, tracker):
+        return self.generator.generate_audio_stress(), True
+
+class ReplayInputs:
+    """Frames and audio from a raw input recording, looped, through the real detector and analyzer"""
+    def __init__(self, recording_path, realtime, tracker):
+        from src.recording.replay_source import open_replay_sources
+        from src.webcam.face_emotion import FaceEmotionDetector
+        from src.audio.audio_emotion import AudioEmotionAnalyzer
+        self.camera, self.microphone = open_replay_sources(recording_path, realtime=realtime, loop=True)
+        self.camera.start()
+        self.face_detector = FaceEmotionDetector(tracker)
+        self.audio_analyzer = AudioEmotionAnalyzer()
+    
+    def face(self, tracker):
+        with tracker.track('frame_grab'):
+            frame = self.camera.get_frame()
+        people = self.face_detector.detect_people(frame) if frame is not None else []
+        headline = people[0]['probs'] if people else self.face_detector.get_neutral_emotions()
+        return headline, {person['person_id']: person['probs'] for person in people}
+    
+    def audio(self, tracker):
+        with tracker.track('audio_capture'):
+            audio_data = self.microphone.capture_audio_chunk()
+        with tracker.track('audio_features'):
+            return self.audio_analyzer.analyze(audio_data)
+
+class SoakHarness:
+    """Drives fusion, logging, alerts, chart building and periodic reports for hours of
+    simulated (or wall-clock) time, sampling memory, latency and buffer depths as it goes"""
+    def __init__(self, duration_s=SOAK_DURATION_SECONDS, realtime=False, recording_path=None,
+                 tick_interval=SOAK_TICK_INTERVAL, sample_interval=SOAK_SAMPLE_INTERVAL,
+                 report_interval=SOAK_REPORT_INTERVAL, retention_seconds=SOAK_RETENTION_SECONDS):
+        self.duration_s = duration_s
+        self.realtime = realtime
+        self.tick_interval = tick_interval
+        self.sample_interval = sample_interval
+        self.report_interval = report_interval
+        self.retention_seconds = retention_seconds
+        
+        self.runtime_config = get_runtime_config()
+        self.tracker = LatencyTracker()
+        self.fusion_buffer = AlignedFusionBuffer(FusionEngine())
+        raw_seconds, second_seconds, minute_seconds = retention_seconds
+        self.session_logger = SessionLogger(retention={
+            'raw_seconds': raw_seconds, 'second_seconds': second_seconds,
+            'minute_seconds': minute_seconds, 'spill_to_disk': False
+        })
+        self.alert_engine = AlertEngine()
+        self.report_generator = ReportGenerator() if report_interval else None
+        self.inputs = (ReplayInputs(recording_path, realtime, self.tracker) if recording_path
+                       else FallbackInputs())
+        self.samples = []
+        self.report_times = []  # (elapsed seconds, report build ms); reports are too sparse for a rolling p50
+        self.reports = 0
+        self.ticks = 0
+    
+    def _tick(self, t, timestamp, next_audio):
+        """One dashboard tick at simulated time t; returns the next audio capture time"""
+        face_emotions, people = self.inputs.face(self.tracker)
+        self.fusion_buffer.push_face(t, face_emotions, people)
+        
+        # Audio runs at its own hop rate, as on the audio thread
+        while next_audio <= t:
+            stress, speech_detected = self.inputs.audio(self.tracker)
+            self.fusion_buffer.push_audio(next_audio, stress, speech_detected)
+            next_audio += self.runtime_config.audio_hop
+        
+        with self.tracker.track('fusion'):
+            fused = self.fusion_buffer.poll(now=t)
+        if fused is not None:
+            with self.tracker.track('logging'):
+                if fused['people']:
+                    self.session_logger.log_people(fused['people'], fused['audio_stress_score'], timestamp)
+                else:
+                    self.session_logger.log_data(fused['face_emotions'], fused['audio_stress_score'],
+                                                 fused['fused_metrics'], timestamp=timestamp)
+            events = self.alert_engine.update(fused['fused_metrics'], fused['face_emotions'], timestamp)
+            self.session_logger.log_alert_events(events)
+        return next_audio
+    
+    def _build_charts(self, timestamp):
+        with self.tracker.track('chart_building'):
+            df = self.session_logger.get_recent_dataframe(TIMELINE_SECONDS)
+            create_timeline_chart(df, TIMELINE_SECONDS, end_time=timestamp,
+                                  max_points=self.runtime_config.chart_points)
+            last_output = self.fusion_buffer.last_output
+            create_stress_gauge(last_output['fused_metrics']['stress'] if last_output else 0.0)
+    
+    def _build_report(self, t, report_dir):
+        started = time.perf_counter()
+        df = self.session_logger.get_session_dataframe()
+        stats = self.session_logger.get_session_stats()
+        if stats:
+            path = os.path.join(report_dir, f"soak_report_{self.reports}.pdf")
+            self.report_generator.generate_pdf_report(stats, df, output_path=path)
+            os.remove(path)
+            self.reports += 1
+            self.report_times.append((t, (time.perf_counter() - started) * 1000))
+    
+    def _queue_depths(self):
+        retention = self.session_logger.get_retention_stats()
+        depths = {
+            'fusion_face': len(self.fusion_buffer.face_samples),
+            'fusion_audio': len(self.fusion_buffer.audio_samples),
+            'retention_raw': retention['raw'],
+            'retention_second': retention['second'],
+            'retention_minute': retention['minute']
+        }
+        detector = getattr(self.inputs, 'face_detector', None)
+        if detector is not None and detector.result_cache is not None:
+            depths['fer_cache'] = detector.result_cache.get_stats()['size']
+        return depths
+    
+    def _sample(self, t, wall_s):
+        row = {'elapsed_s': t, 'wall_s': wall_s, 'ticks': self.ticks, 'rss_mb': read_rss_mb()}
+        for stats in self.tracker.get_summary_dataframe().to_dict(orient='records'):
+            row[f"latency_{stats['stage']}_ms"] = stats['p50_ms']
+        for name, depth in self._queue_depths().items():
+            row[f"queue_{name}"] = depth
+        self.samples.append(row)
+        return row
+    
+    def run(self, progress=None):
+        """Run for the configured duration and return the samples as a DataFrame"""
+        start_time = datetime.now()
+        self.session_logger.start_session()
+        report_dir = tempfile.mkdtemp(prefix="emotisense_soak_")
+        t = 0.0
+        next_audio = next_chart = next_sample = 0.0
+        next_report = self.report_interval or float('inf')
+        next_progress = self.duration_s / 10
+        wall_start = time.perf_counter()
+        try:
+            while t < self.duration_s:
+                timestamp = start_time + timedelta(seconds=t)
+                with self.tracker.track('tick'):
+                    next_audio = self._tick(t, timestamp, next_audio)
+                    if t >= next_chart:
+                        self._build_charts(timestamp)
+                        next_chart = t + self.runtime_config.refresh_interval
+                self.tracker.mark_tick()
+                self.ticks += 1
+                
+                if t >= next_report:
+                    self._build_report(t, report_dir)
+                    next_report += self.report_interval
+                if t >= next_sample:
+                    row = self._sample(t, time.perf_counter() - wall_start)
+                    next_sample += self.sample_interval
+                    if progress is not None and t >= next_progress:
+                        progress(row)
+                        next_progress += self.duration_s / 10
+                
+                t += self.tick_interval
+                if self.realtime:
+                    delay = wall_start + t - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+            self._sample(t, time.perf_counter() - wall_start)
+        finally:
+            self.session_logger.stop_session()
+            shutil.rmtree(report_dir, ignore_errors=True)
+        return pd.DataFrame(self.samples)
+    
+    def warmup_seconds(self, warmup_fraction=SOAK_WARMUP_FRACTION):
+        """Leading time left out of the fits: the warmup share, or until the retention tiers fill"""
+        fill = sum(self.retention_seconds)
+        if fill <= self.duration_s * 0.75:
+            return max(self.duration_s * warmup_fraction, fill)
+        return self.duration_s * warmup_fraction
+    
+    def tiers_fill(self):
+        """Whether the retention tiers fill before the fits start, so they do not show up as growth"""
+        return sum(self.retention_seconds) <= self.duration_s * 0.75
+    
+    def steady_counts(self, warmup_s):
+        """Samples and reports a run will produce after warmup"""
+        steady_s = self.duration_s - warmup_s
+        reports = int(steady_s // self.report_interval) if self.report_interval else None
+        return int(steady_s // self.sample_interval), reports
+
+def evaluate_growth(samples, warmup_s, report_times=None, rss_limit=SOAK_MAX_RSS_SLOPE_MB_PER_HOUR,
+                    latency_limit=SOAK_MAX_LATENCY_SLOPE_MS_PER_HOUR, queue_limit=SOAK_MAX_QUEUE_SLOPE_PER_HOUR,
+                    report_limit=SOAK_MAX_REPORT_SLOPE_MS_PER_HOUR, enforce_latency=True):
+    """Fit a growth slope per hour to every sampled series (and to report build times) after
+    warmup and check the limits.
+    
+    Stage latencies are wall-clock timings, so they are fitted against wall time; on a simulated
+    run that is a few minutes, where jitter alone makes a steep slope, so enforce_latency=False
+    reports them without judging. An enforced series with too few points has no slope and
+    does not pass, since nothing was checked.
+    """
+    steady = samples[samples['elapsed_s'] >= warmup_s]
+    steady_hours = ((steady['elapsed_s'] - warmup_s) / 3600).tolist()
+    wall_hours = ((steady['wall_s'] - steady['wall_s'].min()) / 3600).tolist() if len(steady) else []
+    series = []
+    for column in samples.columns:
+        if column == 'rss_mb':
+            series.append((column, steady_hours, steady[column].tolist(), rss_limit, 'MB/h', True))
+        elif column.startswith('latency_'):
+            series.append((column, wall_hours, steady[column].tolist(), latency_limit, 'ms/h', enforce_latency))
+        elif column.startswith('queue_'):
+            series.append((column, steady_hours, steady[column].tolist(), queue_limit, 'items/h', True))
+    
+    # Report build time grows with the session data, which follows simulated time
+    if report_times is not None:
+        reports = [(t, ms) for t, ms in report_times if t >= warmup_s]
+        series.append(('report_ms', [(t - warmup_s) / 3600 for t, _ in reports], [ms for _, ms in reports],
+                       report_limit, 'ms/h', True))
+    
+    results = []
+    for name, hours, values, limit, unit, enforced in series:
+        slope = growth_slope(hours, values)
+        results.append({
+            'series': name,
+            'slope': slope,
+            'unit': unit,
+            'limit': limit,
+            'points': sum(1 for value in values if value is not None and np.isfinite(value)),
+            'enforced': enforced,
+            'passed': not enforced or (slope is not None and slope <= limit)
+        })
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Soak-test the emotion pipeline and fail on growth in "
+                                                 "memory, latency or buffer depth")
+    parser.add_argument("--duration", default=str(SOAK_DURATION_SECONDS),
+                        help="Run length, e.g. 7200, 45m or 8h (simulated unless --realtime)")
+    parser.add_argument("--realtime", action="store_true", help="Pace ticks to the wall clock")
+    parser.add_argument("--recording", help="Loop a .emrec recording through the real detector instead of "
+                                            "fallback inputs")
+    parser.add_argument("--tick-interval", type=float, default=SOAK_TICK_INTERVAL, help="Seconds between ticks")
+    parser.add_argument("--sample-interval", default=str(SOAK_SAMPLE_INTERVAL), help="Time between samples")
+    parser.add_argument("--report-interval", default=str(SOAK_REPORT_INTERVAL),
+                        help="Time between PDF reports (0 disables them)")
+    parser.add_argument("--retention", type=float, nargs=3, default=SOAK_RETENTION_SECONDS,
+                        metavar=("RAW", "SECOND", "MINUTE"), help="Retention tier lengths in seconds")
+    parser.add_argument("--max-rss-slope", type=float, default=SOAK_MAX_RSS_SLOPE_MB_PER_HOUR, help="MB/hour")
+    parser.add_argument("--max-latency-slope", type=float, default=SOAK_MAX_LATENCY_SLOPE_MS_PER_HOUR,
+                        help="ms/hour per stage")
+    parser.add_argument("--max-queue-slope", type=float, default=SOAK_MAX_QUEUE_SLOPE_PER_HOUR,
+                        help="Items/hour per buffer")
+    parser.add_argument("--max-report-slope", type=float, default=SOAK_MAX_REPORT_SLOPE_MS_PER_HOUR,
+                        help="ms/hour of PDF report build time")
+    parser.add_argument("--min-samples", type=int, default=SOAK_MIN_STEADY_SAMPLES,
+                        help="Reject runs yielding fewer samples after warmup")
+    parser.add_argument("--seed", type=int, default=None, help="Seed the fallback input generator")
+    parser.add_argument("--samples-csv", help="Write the sampled series to this CSV")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args(argv)
+    
+    if args.seed is not None:
+        random.seed(args.seed)
+        np.random.seed(args.seed)
+    
+    harness = SoakHarness(duration_s=parse_duration(args.duration), realtime=args.realtime,
+                          recording_path=args.recording, tick_interval=args.tick_interval,
+                          sample_interval=parse_duration(args.sample_interval),
+                          report_interval=parse_duration(args.report_interval),
+                          retention_seconds=tuple(args.retention))
+    
+    # Too few points after warmup make the fits meaningless, so refuse to start rather than pass
+    warmup_s = harness.warmup_seconds()
+    steady_samples, steady_reports = harness.steady_counts(warmup_s)
+    if steady_samples < args.min_samples:
+        parser.error(f"only {steady_samples} samples after {warmup_s / 60:.1f} min warmup (need {args.min_samples}); "
+                     f"lengthen --duration or shorten --sample-interval")
+    if steady_reports is not None and steady_reports < MIN_FIT_POINTS:
+        parser.error(f"only {steady_reports} reports after {warmup_s / 60:.1f} min warmup (need {MIN_FIT_POINTS}); "
+                     f"lengthen --duration, shorten --report-interval or pass --report-interval 0")
+    if not harness.tiers_fill():
+        print(f"Warning: the retention tiers ({sum(harness.retention_seconds) / 60:.0f} min) do not fill before "
+              f"the fits start, so RSS growth includes their fill; lengthen the run or shorten --retention")
+    
+    def print_progress(row):
+        print(f"  {row['elapsed_s'] / 3600:6.2f}h  rss {row['rss_mb']:7.1f} MB  "
+              f"tick p50 {row.get('latency_tick_ms', 0):6.2f} ms  wall {row['wall_s']:7.1f}s")
+    
+    mode = "realtime" if args.realtime else "simulated"
+    source = args.recording or "fallback inputs"
+    print(f"Soak test: {harness.duration_s / 3600:.2f}h {mode} from {source}")
+    samples = harness.run(progress=print_progress)
+    
+    report_times = harness.report_times if harness.report_interval else None
+    results = evaluate_growth(samples, warmup_s, report_times, args.max_rss_slope,
+                              args.max_latency_slope, args.max_queue_slope, args.max_report_slope,
+                              enforce_latency=args.realtime)
+    failed = [result for result in results if not result['passed'] and result['slope'] is not None]
+    unchecked = [result for result in results if result['enforced'] and result['slope'] is None]
+    
+    print(f"{harness.ticks} ticks, {harness.reports} reports, {len(samples)} samples; "
+          f"slopes fitted after {warmup_s / 60:.0f} min warmup")
+    for result in results:
+        slope = f"{result['slope']:10.3f}" if result['slope'] is not None else "       n/a"
+        if result['slope'] is None:
+            status = f"too few points ({result['points']})"
+        elif not result['enforced']:
+            status = "not enforced"
+        else:
+            status = "ok" if result['passed'] else "FAIL"
+        print(f"  {result['series']:<28} {slope} {result['unit']:<8} (limit {result['limit']:g})  {status}")
+    if not args.realtime:
+        print("Stage latency limits apply to --realtime runs; simulated runs are too short in wall time")
+    if failed:
+        print(f"Soak test FAILED: {len(failed)} series over the growth limit")
+    elif unchecked:
+        print(f"Soak test INCONCLUSIVE: {len(unchecked)} enforced series had fewer than {MIN_FIT_POINTS} points "
+              f"after warmup (lengthen the run or shorten the sample/report interval)")
+    else:
+        print("Soak test passed")
+    
+    if args.samples_csv:
+        samples.to_csv(args.samples_csv, index=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'duration_s': harness.duration_s,
+                'realtime': args.realtime,
+                'recording': args.recording,
+                'ticks': harness.ticks,
+                'reports': harness.reports,
+                'warmup_s': warmup_s,
+                'growth': results,
+                'passed': not failed and not unchecked
+            }, f, indent=2)
+    # 1: growth over a limit, 2: not enough data to judge (the argparse usage-error code too)
+    if failed:
+        return 1
+    return 2 if unchecked else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import sys
+import json
+import time
+import argparse
+from src.webcam.face_emotion import FaceEmotionDetector
+from src.audio.audio_emotion import AudioEmotionAnalyzer
+from src.fusion.fusion_engine import FusionEngine
+from src.logger.session_logger import SessionLogger
+from src.perf.latency import LatencyTracker
+from src.recording.replay_source import open_replay_sources
+
+def run_pipeline_benchmark(recording_path, realtime=False, max_ticks=None):
+    """Drive the real pipeline from a recording and report throughput and latency"""
+    camera, microphone = open_replay_sources(recording_path, realtime=realtime)
+    tracker = LatencyTracker(window_size=100000)
+    face_detector = FaceEmotionDetector(tracker)
+    audio_analyzer = AudioEmotionAnalyzer()
+    fusion_engine = FusionEngine()
+    session_logger = SessionLogger()
+    session_logger.start_session()
+    
+    camera.start()
+    ticks = 0
+    start = time.perf_counter()
+    
+    while max_ticks is None or ticks < max_ticks:
+        with tracker.track('frame_grab'):
+            frame = camera.get_frame()
+        if frame is None:
+            break
+        
+        emotion_result = face_detector.detect_emotions(frame)
+        face_emotions = emotion_result['probs']
+        
+        with tracker.track('audio_capture'):
+            audio_data = microphone.capture_audio_chunk()
+        with tracker.track('audio_features'):
+            audio_stress_score, speech_detected = audio_analyzer.analyze(audio_data)
+        
+        with tracker.track('fusion'):
+            fused_metrics = fusion_engine.fuse_emotions(face_emotions, audio_stress_score, speech_detected)
+        with tracker.track('logging'):
+            session_logger.log_data(face_emotions, audio_stress_score, fused_metrics)
+        
+        tracker.mark_tick()
+        ticks += 1
+    
+    elapsed = time.perf_counter() - start
+    session_logger.stop_session()
+    camera.reader.close()
+    
+    return {
+        'recording': recording_path,
+        'realtime': realtime,
+        'ticks': ticks,
+        'elapsed_s': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+        'stages': tracker.get_summary_dataframe().to_dict(orient='records')
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the emotion pipeline on a raw input recording")
+    parser.add_argument("recording", help="Path to a .emrec recording")
+    parser.add_argument("--realtime", action="store_true", help="Replay at recorded pace instead of as fast as possible")
+    parser.add_argument("--max-ticks", type=int, default=None, help="Stop after this many frames")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+    
+    results = run_pipeline_benchmark(args.recording, realtime=args.realtime, max_ticks=args.max_ticks)
+    
+    print(f"{results['ticks']} ticks in {results['elapsed_s']:.2f}s ({results['ticks_per_second']:.2f} ticks/s)")
+    for stage in results['stages']:
+        print(f"  {stage['stage']:<16} p50 {stage['p50_ms']:8.2f} ms  p95 {stage['p95_ms']:8.2f} ms  p99 {stage['p99_ms']:8.2f} ms")
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+import os
+import time
+import queue
+import struct
+import threading
+import cv2
+import numpy as np
+from datetime import datetime
+from src.config import (SESSION_LOGS_DIR, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS,
+                        RECORDING_JPEG_QUALITY, RECORDING_QUEUE_SIZE)
+from src.utils import ensure_directories
+
+# Container layout (little endian):
+#   header: magic, version, audio sample rate, audio channels
+#   records: kind, capture time (seconds since recording start), payload length, payload
+# Frame payloads are JPEG bytes; audio payloads are raw float32 samples.
+MAGIC = b"EMOREC\0\0"
+FORMAT_VERSION = 1
+HEADER_STRUCT = struct.Struct("<8sHIH")
+RECORD_STRUCT = struct.Struct("<BdI")
+RECORDING_EXTENSION = ".emrec"
+
+KIND_FRAME = 1
+KIND_AUDIO = 2
+
+class InputRecorder:
+    def __init__(self, path, jpeg_quality=RECORDING_JPEG_QUALITY, queue_size=RECORDING_QUEUE_SIZE):
+        self.path = path
+        self.jpeg_quality = jpeg_quality
+        self.frames_recorded = 0
+        self.audio_chunks_recorded = 0
+        self.dropped = 0
+        self.is_active = False
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._file = None
+        self._start = None
+    
+    def start(self):
+        """Open the container and start the writer thread"""
+        self._file = open(self.path, 'wb')
+        self._file.write(HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS))
+        self._start = time.monotonic()
+        self.is_active = True
+        self._thread = threading.Thread(target=self._run, name="input-recorder", daemon=True)
+        self._thread.start()
+        print(f"Recording raw inputs to {self.path}")
+    
+    def _relative_time(self, timestamp):
+        return (timestamp if timestamp is not None else time.monotonic()) - self._start
+    
+    def record_frame(self, frame, timestamp=None):
+        """Queue a camera frame (BGR) captured at a monotonic timestamp"""
+        if self.is_active and frame is not None:
+            self._enqueue(KIND_FRAME, self._relative_time(timestamp), frame.copy())
+    
+    def record_audio(self, audio_data, timestamp=None):
+        """Queue an audio chunk captured at a monotonic timestamp"""
+        if self.is_active and audio_data is not None:
+            self._enqueue(KIND_AUDIO, self._relative_time(timestamp), np.asarray(audio_data, dtype=np.float32).copy())
+    
+    def _enqueue(self, kind, relative_time, data):
+        try:
+            self._queue.put_nowait((kind, relative_time, data))
+        except queue.Full:
+            self.dropped += 1
+    
+    def _run(self):
+        """Writer loop: compress frames and append records"""
+        encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            
+            kind, relative_time, data = item
+            try:
+                if kind == KIND_FRAME:
+                    ok, encoded = cv2.imencode('.jpg', data, encode_params)
+                    if not ok:
+                        self.dropped += 1
+                        continue
+                    payload = encoded.tobytes()
+                    self.frames_recorded += 1
+                else:
+                    payload = data.tobytes()
+                    self.audio_chunks_recorded += 1
+                
+                self._file.write(RECORD_STRUCT.pack(kind, relative_time, len(payload)))
+                self._file.write(payload)
+            except Exception as e:
+                print(f"Recording write error: {e}")
+                self.dropped += 1
+    
+    def stop(self):
+        """Flush pending records and close the container"""
+        if not self.is_active:
+            return None
+        
+        self.is_active = False
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        print(f"Recording saved: {self.frames_recorded} frames, {self.audio_chunks_recorded} audio chunks, {self.dropped} dropped")
+        return self.path
+
+def recording_path_for(session_id):
+    """Container path next to the session logs"""
+    ensure_directories()
+    filename = f"session_{session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{RECORDING_EXTENSION}"
+    return os.path.join(SESSION_LOGS_DIR, filename)
+
+class RecordingReader:
+    def __init__(self, path):
+        self.path = path
+        self.frames = []  # (capture time, offset, length)
+        self.audio_chunks = []
+        self._file = open(path, 'rb')
+        
+        magic, version, self.sample_rate, self.channels = HEADER_STRUCT.unpack(self._file.read(HEADER_STRUCT.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"Not a supported EMOTISENSE recording: {path}")
+        self._index()
+    
+    def _index(self):
+        """Scan record headers once to build per-stream indices"""
+        while True:
+            header = self._file.read(RECORD_STRUCT.size)
+            if len(header) < RECORD_STRUCT.size:
+                break
+            kind, relative_time, length = RECORD_STRUCT.unpack(header)
+            offset = self._file.tell()
+            if kind == KIND_FRAME:
+                self.frames.append((relative_time, offset, length))
+            elif kind == KIND_AUDIO:
+                self.audio_chunks.append((relative_time, offset, length))
+            self._file.seek(length, os.SEEK_CUR)
+    
+    def _read(self, offset, length):
+        self._file.seek(offset)
+        return self._file.read(length)
+    
+    def read_frame(self, index):
+        """Decode the frame at an index"""
+        _, offset, length = self.frames[index]
+        return cv2.imdecode(np.frombuffer(self._read(offset, length), dtype=np.uint8), cv2.IMREAD_COLOR)
+    
+    def read_audio(self, index):
+        """Read the audio chunk at an index"""
+        _, offset, length = self.audio_chunks[index]
+        return np.frombuffer(self._read(offset, length), dtype=np.float32).copy()
+    
+    def close(self):
+        self._file.close()
@@ -0,0 +1,187 @@
+import time
+import threading
+import numpy as np
+from src.config import AUDIO_CHUNK_DURATION
+from src.recording.recorder import RecordingReader
+
+class ReplayClock:
+    """Shared playback clock so camera and audio replays stay in step"""
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+        self._start = None
+        self._lock = threading.Lock()
+    
+    def _anchor(self, relative_time):
+        """Monotonic time of recording time zero; the first caller starts the clock"""
+        with self._lock:
+            if self._start is None:
+                self._start = time.monotonic() - relative_time
+            return self._start
+    
+    def wait_until(self, relative_time):
+        """Block until a recorded capture time is due (no-op when not realtime)"""
+        if not self.realtime:
+            return
+        delay = self._anchor(relative_time) + relative_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    
+    def elapsed(self, first_time=0.0):
+        """Recording time due now; starts the clock at first_time if nothing has yet"""
+        start = self._anchor(first_time)
+        return time.monotonic() - start
+    
+    def to_monotonic(self, relative_time):
+        """A recorded capture time on this process's monotonic clock, as live sources stamp them"""
+        return self._anchor(relative_time) + relative_time
+
+def _loop_length(reader):
+    """Recording time one pass takes (last capture plus one average interval), so looped
+    passes follow on from each other"""
+    ends = []
+    for records in (reader.frames, reader.audio_chunks):
+        if records:
+            first, last = records[0][0], records[-1][0]
+            ends.append(last + (last - first) / (len(records) - 1) if len(records) > 1 else last)
+    return max(ends) if ends else 0.0
+
+class ReplayCameraCapture:
+    """CameraCapture-compatible source that plays back recorded frames"""
+    def __init__(self, reader, clock=None, loop=False):
+        self.reader = reader
+        self.clock = clock or ReplayClock()
+        self.loop = loop
+        self.position = 0
+        self.is_active = False
+        self._loop_offset = 0.0  # Recording time of the passes already played
+        self._seq = 0
+        self._consumed_seq = 0
+        self._current = None  # (frame, capture time, seq) of the newest frame read
+        self.stats = {'captured': 0, 'delivered': 0, 'dropped': 0, 'read_errors': 0}
+    
+    @property
+    def is_exhausted(self):
+        return not self.loop and self.position >= len(self.reader.frames)
+    
+    def start(self):
+        self.is_active = len(self.reader.frames) > 0
+        return self.is_active
+    
+    def _has_next(self):
+        """Whether another frame is left, wrapping to the start when looping"""
+        if self.position >= len(self.reader.frames):
+            if not self.loop or not self.reader.frames:
+                return False
+            self._loop_offset += _loop_length(self.reader)
+            self.position = 0
+        return True
+    
+    def _next_time(self):
+        return self.reader.frames[self.position][0] + self._loop_offset
+    
+    def _read_next(self):
+        """Decode the next frame and make it the newest one"""
+        relative_time = self._next_time()
+        frame = self.reader.read_frame(self.position)
+        self.position += 1
+        if frame is None:
+            self.stats['read_errors'] += 1
+            return
+        if self._seq > self._consumed_seq:
+            # The previous frame was replaced before anyone read it
+            self.stats['dropped'] += 1
+        self._seq += 1
+        self.stats['captured'] += 1
+        self._current = (frame, self.clock.to_monotonic(relative_time), self._seq)
+    
+    def _take(self):
+        self._consumed_seq = self._seq
+        self.stats['delivered'] += 1
+        frame, capture_time, seq = self._current
+        return frame.copy(), capture_time, seq
+    
+    def latest(self):
+        """Return (frame, monotonic timestamp, seq) of the newest frame due on the recording clock
+        without blocking; without a realtime clock every call plays the next frame"""
+        if not self.is_active:
+            return None
+        if self.clock.realtime:
+            now = self.clock.elapsed(self.reader.frames[0][0])
+            while self._has_next() and self._next_time() <= now:
+                self._read_next()
+            if self.is_exhausted and self._seq == self._consumed_seq:
+                return None  # Recording over and its last frame already delivered
+        elif self._has_next():
+            self._read_next()
+        else:
+            return None
+        return self._take() if self._current is not None else None
+    
+    def next_after(self, seq, timeout=1.0):
+        """Wait until a frame newer than seq is due and return it; None on timeout or at the end"""
+        if not self.is_active:
+            return None
+        if self._current is not None and self._current[2] > seq:
+            return self._take()
+        if not self._has_next():
+            return None
+        if self.clock.realtime:
+            delay = self.clock.to_monotonic(self._next_time()) - time.monotonic()
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                return None
+            if delay > 0:
+                time.sleep(delay)
+        self._read_next()
+        return self._take() if self._current is not None and self._current[2] > seq else None
+    
+    def get_frame(self):
+        """Return the next recorded frame in order, or None once the recording ends"""
+        result = self.next_after(self._seq, timeout=None)
+        return result[0] if result is not None else None
+    
+    def get_stats(self):
+        """Capture, delivery and dropped-frame counters"""
+        return dict(self.stats, seq=self._seq)
+    
+    def stop(self):
+        self.is_active = False
+
+class ReplayMicrophoneCapture:
+    """MicrophoneCapture-compatible source that plays back recorded audio"""
+    def __init__(self, reader, clock=None, loop=False):
+        self.reader = reader
+        self.clock = clock or ReplayClock()
+        self.loop = loop
+        self.position = 0
+        self._loop_offset = 0.0
+        self.sample_rate = reader.sample_rate
+        self.chunk_duration = AUDIO_CHUNK_DURATION
+        self.channels = reader.channels
+        self.is_available = len(reader.audio_chunks) > 0
+    
+    @property
+    def is_exhausted(self):
+        return not self.loop and self.position >= len(self.reader.audio_chunks)
+    
+    def capture_audio_chunk(self, duration=None):
+        """Return the next recorded chunk (recorded chunks keep their own length), or silence
+        once the recording ends"""
+        if self.position >= len(self.reader.audio_chunks):
+            if not self.loop or not self.reader.audio_chunks:
+                duration = self.chunk_duration if duration is None else duration
+                return np.zeros(int(duration * self.sample_rate), dtype=np.float32)
+            self._loop_offset += _loop_length(self.reader)
+            self.position = 0
+        
+        relative_time = self.reader.audio_chunks[self.position][0] + self._loop_offset
+        self.clock.wait_until(relative_time)
+        audio_data = self.reader.read_audio(self.position)
+        self.position += 1
+        return audio_data
+
+def open_replay_sources(path, realtime=True, loop=False):
+    """Open a recording and return camera and microphone replay sources sharing one clock"""
+    reader = RecordingReader(path)
+    clock = ReplayClock(realtime)
+    return ReplayCameraCapture(reader, clock, loop), ReplayMicrophoneCapture(reader, clock, loop)
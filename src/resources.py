@@ -0,0 +1,251 @@
+import time
+import threading
+
+class _Entry:
+    """Bookkeeping for one registered resource"""
+    def __init__(self, name, factory, closer, keep_warm):
+        self.name = name
+        self.factory = factory
+        self.closer = closer
+        self.keep_warm = keep_warm  # Stay loaded with no holders (models), or close at zero (devices)
+        self.instance = None
+        self.loaded = False
+        self.error = None
+        self.build_seconds = None
+        self.generation = 0  # Bumped on every load or swap
+        self.refcount = 0
+        self.standby = None  # (instance, error, build_seconds) waiting to be swapped in
+        self.standby_error = None
+        self.standby_thread = None
+        self.state_lock = threading.RLock()  # Guards the fields above; RLock because leases release from __del__
+        self.call_lock = threading.RLock()  # Serializes calls into resources that are not thread-safe
+
+class Lease:
+    """Counted reference to a shared resource; value always resolves to the live instance,
+    so holders pick up a hot-reloaded instance on their next call"""
+    def __init__(self, registry, entry):
+        self._registry = registry
+        self._entry = entry
+        self.released = False
+    
+    @property
+    def name(self):
+        return self._entry.name
+    
+    @property
+    def value(self):
+        return self._entry.instance
+    
+    @property
+    def lock(self):
+        return self._entry.call_lock
+    
+    @property
+    def generation(self):
+        return self._entry.generation
+    
+    def release(self):
+        if not self.released:
+            self.released = True
+            self._registry._release(self._entry)
+    
+    def __del__(self):
+        # Streamlit has no session-end hook; a dropped session state releases its leases here
+        try:
+            self.release()
+        except Exception:
+            pass
+
+class ResourceRegistry:
+    """Process-wide heavyweight resources (models, devices) shared by every dashboard session"""
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+    
+    def register(self, name, factory, closer=None, keep_warm=True):
+        """Register a factory; nothing is built until the first acquire"""
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = _Entry(name, factory, closer, keep_warm)
+    
+    def _entry(self, name):
+        with self._lock:
+            if name not in self._entries:
+                raise KeyError(f"unknown resource '{name}'")
+            return self._entries[name]
+    
+    def _build(self, entry):
+        started = time.perf_counter()
+        try:
+            instance, error = entry.factory(), None
+        except Exception as e:
+            print(f"Resource {entry.name} failed to load: {e}")
+            instance, error = None, str(e)
+        return instance, error, time.perf_counter() - started
+    
+    def _close(self, entry, instance):
+        if entry.closer is None or instance is None:
+            return
+        # Wait for any call in progress on the old instance before closing it
+        with entry.call_lock:
+            try:
+                entry.closer(instance)
+            except Exception as e:
+                print(f"Resource {entry.name} close error: {e}")
+    
+    def acquire(self, name):
+        """Get a lease, building the resource on first use; a failed build yields value None"""
+        entry = self._entry(name)
+        with entry.state_lock:
+            if not entry.loaded:
+                # Failures are remembered too, so each viewer does not probe again; reload() retries
+                entry.instance, entry.error, entry.build_seconds = self._build(entry)
+                entry.loaded = True
+                entry.generation += 1
+            entry.refcount += 1
+        return Lease(self, entry)
+    
+    def _release(self, entry):
+        with entry.state_lock:
+            entry.refcount -= 1
+            if entry.refcount > 0 or entry.keep_warm:
+                return
+            instance = entry.instance
+            entry.instance = None
+            entry.loaded = False
+        self._close(entry, instance)
+    
+    def peek(self, name):
+        """Current instance without taking a reference (None if not loaded)"""
+        return self._entry(name).instance
+    
+    def prepare_standby(self, name, wait=False):
+        """Build a replacement alongside the live instance; returns False if one is already building"""
+        entry = self._entry(name)
+        
+        def build():
+            standby = self._build(entry)
+            with entry.state_lock:
+                previous, entry.standby = entry.standby, None
+                if standby[0] is None:
+                    entry.standby_error = standby[1]
+                else:
+                    entry.standby, entry.standby_error = standby, None
+            if previous is not None:
+                self._close(entry, previous[0])
+        
+        with entry.state_lock:
+            if entry.standby_thread is not None and entry.standby_thread.is_alive():
+                return False
+            if not wait:
+                entry.standby_thread = threading.Thread(target=build, name=f"standby-{name}", daemon=True)
+                entry.standby_thread.start()
+                return True
+        build()
+        return True
+    
+    def swap(self, name):
+        """Promote a ready standby to live; holders see it on their next call. False if none is ready"""
+        entry = self._entry(name)
+        with entry.state_lock:
+            if entry.standby is None:
+                return False
+            old = entry.instance
+            entry.instance, entry.error, entry.build_seconds = entry.standby
+            entry.standby = None
+            entry.loaded = True
+            entry.generation += 1
+        self._close(entry, old)
+        return True
+    
+    def reload(self, name):
+        """Rebuild now and swap; a failed rebuild keeps the current instance"""
+        self.prepare_standby(name, wait=True)
+        return self.swap(name)
+    
+    def get_stats(self):
+        """One row per resource: load state, holders, generation, build time and standby state"""
+        with self._lock:
+            entries = list(self._entries.values())
+        
+        rows = []
+        for entry in entries:
+            with entry.state_lock:
+                building = entry.standby_thread is not None and entry.standby_thread.is_alive()
+                rows.append({
+                    'resource': entry.name,
+                    'loaded': entry.loaded,
+                    'available': entry.instance is not None,
+                    'refs': entry.refcount,
+                    'generation': entry.generation,
+                    'build_ms': entry.build_seconds * 1000 if entry.build_seconds is not None else None,
+                    'standby': 'building' if building else ('ready' if entry.standby is not None else None),
+                    'error': entry.standby_error or entry.error
+                })
+        return rows
+
+def _load_fer_model():
+    from fer import FER
+    model = FER(mtcnn=False)
+    print("FER detector initialized")
+    return model
+
+def _load_face_cascade():
+    import cv2
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    if cascade.empty():
+        raise ValueError("haarcascade_frontalface_default.xml could not be loaded")
+    print("OpenCV cascade initialized")
+    return cascade
+
+def _create_camera():
+    from src.webcam.camera import CameraCapture
+    return CameraCapture()
+
+def _create_microphone():
+    from src.audio.mic_capture import MicrophoneCapture
+    return MicrophoneCapture()
+
+def _create_audio_capture():
+    from src.audio.audio_stream import AudioCaptureHub
+    # The hub holds its own reference to the shared microphone for as long as it exists
+    microphone = get_registry().acquire('microphone')
+    hub = AudioCaptureHub(microphone.value)
+    hub.microphone_lease = microphone
+    return hub
+
+def _close_audio_capture(hub):
+    hub.stop()
+    hub.microphone_lease.release()
+
+def _create_audio_analyzer():
+    from src.audio.audio_emotion import AudioEmotionAnalyzer
+    return AudioEmotionAnalyzer()
+
+def _create_report_generator():
+    from src.logger.report_generator import ReportGenerator
+    return ReportGenerator()
+
+def _register_defaults(registry):
+    registry.register('fer_model', _load_fer_model)
+    registry.register('face_cascade', _load_face_cascade)
+    # The camera is held only by running sessions and released when the last one stops
+    registry.register('camera', _create_camera, closer=lambda camera: camera.stop(), keep_warm=False)
+    registry.register('microphone', _create_microphone)
+    # One capture thread feeds every session's audio stream; sessions never read the device directly
+    registry.register('audio_capture', _create_audio_capture, closer=_close_audio_capture)
+    registry.register('audio_analyzer', _create_audio_analyzer)
+    registry.register('report_generator', _create_report_generator,
+                      closer=lambda generator: generator.chart_executor.shutdown(wait=False))
+
+# Process-wide registry; each inference worker process gets its own
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ResourceRegistry()
+            _register_defaults(_registry)
+    return _registry
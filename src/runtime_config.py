@@ -0,0 +1,172 @@
+import os
+import json
+import threading
+from src.config import (PERFORMANCE_PROFILES, DEFAULT_PROFILE, RUNTIME_CONFIG_PATH,
+                        RUNTIME_CONFIG_ENV_PREFIX)
+
+# Setting name -> (type, minimum, maximum); bounds are None for booleans
+FIELDS = {
+    'detection_scale': (float, 0.1, 1.0),
+    'inference_interval': (float, 0.0, 10.0),
+    'change_gate': (bool, None, None),
+    'audio_window': (float, 0.25, 10.0),
+    'audio_hop': (float, 0.1, 10.0),
+    'chart_points': (int, 10, 10000),
+    'preview_width': (int, 80, 1920),
+    'preview_quality': (int, 10, 100),
+    'preview_max_fps': (float, 0.5, 60.0),
+    'refresh_interval': (float, 0.1, 10.0)
+}
+
+def coerce_setting(name, value):
+    """Convert a raw value (JSON or environment string) to the setting's type, checking bounds"""
+    if name not in FIELDS:
+        raise ValueError(f"unknown setting '{name}'")
+    kind, low, high = FIELDS[name]
+    
+    if kind is bool:
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in ('1', 'true', 'yes', 'on'):
+                return True
+            if lowered in ('0', 'false', 'no', 'off'):
+                return False
+            raise ValueError(f"{name} expects a boolean, got {value!r}")
+        return bool(value)
+    
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} expects a number, got {value!r}")
+    if kind is int:
+        if not number.is_integer():
+            raise ValueError(f"{name} expects an integer, got {value!r}")
+        number = int(number)
+    if number < low or number > high:
+        raise ValueError(f"{name} must be between {low} and {high}, got {number}")
+    return number
+
+class RuntimeConfig:
+    """Performance settings: a named profile, then file overrides, then environment overrides"""
+    def __init__(self, path=RUNTIME_CONFIG_PATH, environ=None):
+        self.path = path
+        self.environ = os.environ if environ is None else environ
+        self.profile = DEFAULT_PROFILE
+        self.profile_source = 'default'  # Where the profile came from: dashboard, environment, file or default
+        self.version = 0  # Bumped whenever an effective value changes
+        self.errors = []
+        self._values = dict(PERFORMANCE_PROFILES[DEFAULT_PROFILE])
+        self._selected_profile = None  # Chosen from the dashboard; wins until the file or environment profile changes
+        self._source_profiles = None  # (environment, file) profiles seen by the last reload
+        self._file_settings = {}
+        self._file_mtime = None
+        self._lock = threading.Lock()
+        self.reload()
+    
+    def __getattr__(self, name):
+        values = self.__dict__.get('_values')
+        if values is not None and name in values:
+            return values[name]
+        raise AttributeError(name)
+    
+    def _read_file(self, errors):
+        """Load overrides from the JSON file, keeping the last good ones on a bad edit"""
+        try:
+            self._file_mtime = os.path.getmtime(self.path)
+        except OSError:
+            self._file_mtime = None
+            self._file_settings = {}
+            return self._file_settings
+        
+        try:
+            with open(self.path) as f:
+                settings = json.load(f)
+            if not isinstance(settings, dict):
+                raise ValueError("expected a JSON object")
+            self._file_settings = settings
+        except Exception as e:
+            errors.append(f"{self.path}: {e}")
+        return self._file_settings
+    
+    def reload(self):
+        """Rebuild the effective settings; returns True if any value changed"""
+        with self._lock:
+            errors = []
+            file_settings = dict(self._read_file(errors))
+            env_settings = {}
+            for name in FIELDS:
+                key = RUNTIME_CONFIG_ENV_PREFIX + name.upper()
+                if key in self.environ:
+                    env_settings[name] = self.environ[key]
+            
+            # Editing the file's or environment's profile takes back control from the dashboard
+            source_profiles = (self.environ.get(RUNTIME_CONFIG_ENV_PREFIX + 'PROFILE'), file_settings.get('profile'))
+            if self._source_profiles is not None and source_profiles != self._source_profiles:
+                self._selected_profile = None
+            self._source_profiles = source_profiles
+            
+            candidates = [('dashboard', self._selected_profile), ('environment', source_profiles[0]),
+                          ('file', source_profiles[1]), ('default', DEFAULT_PROFILE)]
+            profile_source, profile = next((source, name) for source, name in candidates if name)
+            if profile not in PERFORMANCE_PROFILES:
+                errors.append(f"unknown profile '{profile}', using '{DEFAULT_PROFILE}'")
+                profile_source, profile = 'default', DEFAULT_PROFILE
+            file_settings.pop('profile', None)
+            
+            values = dict(PERFORMANCE_PROFILES[profile])
+            for source in (file_settings, env_settings):
+                for name, raw in source.items():
+                    try:
+                        values[name] = coerce_setting(name, raw)
+                    except ValueError as e:
+                        errors.append(str(e))
+            
+            if values['audio_hop'] > values['audio_window']:
+                errors.append("audio_hop cannot exceed audio_window; using the window length")
+                values['audio_hop'] = values['audio_window']
+            
+            for error in errors:
+                print(f"Runtime config error: {error}")
+            
+            changed = values != self._values or profile != self.profile
+            self._values = values
+            self.profile = profile
+            self.profile_source = profile_source
+            self.errors = errors
+            if changed:
+                self.version += 1
+            return changed
+    
+    def reload_if_changed(self):
+        """Hot-reload when the override file was created, edited or removed"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            mtime = None
+        if mtime == self._file_mtime:
+            return False
+        return self.reload()
+    
+    def set_profile(self, profile):
+        """Switch profile for the whole process from the dashboard, until the file or environment
+        profile next changes; file and environment setting overrides still apply"""
+        if profile not in PERFORMANCE_PROFILES:
+            raise ValueError(f"unknown profile '{profile}'")
+        self._selected_profile = profile
+        return self.reload()
+    
+    def as_dict(self):
+        """Effective settings with the active profile name and where it came from"""
+        with self._lock:
+            return {'profile': self.profile, 'profile_source': self.profile_source, **self._values}
+
+# Process-wide config shared by the detector, audio stream and dashboard
+_runtime_config = None
+_runtime_config_lock = threading.Lock()
+
+def get_runtime_config():
+    global _runtime_config
+    with _runtime_config_lock:
+        if _runtime_config is None:
+            _runtime_config = RuntimeConfig()
+    return _runtime_config
@@ -0,0 +1,219 @@
+import os
+import json
+import socket
+import struct
+import threading
+import socketserver
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import numpy as np
+from src.config import (STREAM_ENABLED, STREAM_HOST, STREAM_PORT, STREAM_UNIX_SOCKET,
+                        STREAM_UNIX_FORMAT, STREAM_SUBSCRIBER_BUFFER)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+HEARTBEAT_SECONDS = 15.0
+
+def _encode_default(value):
+    """Encode timestamps and numpy scalars found in fused metrics"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+def encode_event(event, fmt):
+    """Encode an event as compact JSON or msgpack bytes"""
+    if fmt == 'msgpack':
+        return msgpack.packb(event, default=_encode_default, use_bin_type=True)
+    return json.dumps(event, separators=(',', ':'), default=_encode_default).encode()
+
+class Subscriber:
+    """Bounded per-client buffer; the publisher never blocks on a slow client"""
+    def __init__(self, fmt='json', buffer_size=STREAM_SUBSCRIBER_BUFFER):
+        self.format = fmt
+        self.queue = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.closed = False
+        self._condition = threading.Condition()
+    
+    def push(self, data):
+        with self._condition:
+            if len(self.queue) == self.queue.maxlen:
+                self.dropped += 1
+            self.queue.append(data)
+            self._condition.notify()
+    
+    def pop_all(self, timeout):
+        """Wait up to timeout for events and take everything queued"""
+        with self._condition:
+            if not self.queue and not self.closed:
+                self._condition.wait(timeout)
+            items = list(self.queue)
+            self.queue.clear()
+            return items
+    
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+
+class MetricsPublisher:
+    def __init__(self):
+        self.subscribers = set()
+        self.published = 0
+        self._lock = threading.Lock()
+        self._servers = []
+    
+    def subscribe(self, fmt='json'):
+        if fmt == 'msgpack' and msgpack is None:
+            raise ValueError("msgpack is not installed")
+        subscriber = Subscriber(fmt)
+        with self._lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        subscriber.close()
+        with self._lock:
+            self.subscribers.discard(subscriber)
+    
+    def publish(self, event_type, payload):
+        """Push an event to every subscriber, encoding once per format"""
+        with self._lock:
+            subscribers = list(self.subscribers)
+            self.published += 1
+        if not subscribers:
+            return
+        
+        event = {'type': event_type, **payload}
+        encoded = {}
+        for subscriber in subscribers:
+            if subscriber.format not in encoded:
+                encoded[subscriber.format] = encode_event(event, subscriber.format)
+            subscriber.push((event_type, encoded[subscriber.format]))
+    
+    def get_stats(self):
+        with self._lock:
+            subscribers = list(self.subscribers)
+            published = self.published
+        return {
+            'published': published,
+            'subscribers': len(subscribers),
+            'queued': sum(len(s.queue) for s in subscribers),
+            'dropped': sum(s.dropped for s in subscribers)
+        }
+    
+    def start_http(self, host=STREAM_HOST, port=STREAM_PORT):
+        """Serve Server-Sent Events at /events"""
+        handler = type('BoundSSEHandler', (SSEHandler,), {'publisher': self})
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+        self._serve(server, "stream-http")
+        print(f"Streaming events at http://{host}:{port}/events")
+        return server
+    
+    def start_unix(self, path=STREAM_UNIX_SOCKET, fmt=STREAM_UNIX_FORMAT):
+        """Serve events on a Unix stream socket"""
+        if os.path.exists(path):
+            os.remove(path)
+        handler = type('BoundUnixHandler', (UnixStreamHandler,), {'publisher': self, 'format': fmt})
+        server = socketserver.ThreadingUnixStreamServer(path, handler)
+        server.daemon_threads = True
+        self._serve(server, "stream-unix")
+        print(f"Streaming events on unix socket {path}")
+        return server
+    
+    def _serve(self, server, name):
+        thread = threading.Thread(target=server.serve_forever, name=name, daemon=True)
+        thread.start()
+        self._servers.append(server)
+    
+    def stop(self):
+        with self._lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            self.unsubscribe(subscriber)
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+class SSEHandler(BaseHTTPRequestHandler):
+    publisher = None
+    
+    def do_GET(self):
+        if urlparse(self.path).path != '/events':
+            self.send_error(404)
+            return
+        
+        # Small event writes must not wait on Nagle's algorithm
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'keep-alive')
+        self.end_headers()
+        
+        subscriber = self.publisher.subscribe('json')
+        try:
+            while not subscriber.closed:
+                items = subscriber.pop_all(HEARTBEAT_SECONDS)
+                if not items:
+                    self.wfile.write(b": keepalive\n\n")
+                for event_type, data in items:
+                    self.wfile.write(b"event: " + event_type.encode() + b"\ndata: " + data + b"\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.publisher.unsubscribe(subscriber)
+    
+    def log_message(self, format, *args):
+        pass
+
+class UnixStreamHandler(socketserver.StreamRequestHandler):
+    publisher = None
+    format = 'json'
+    
+    def handle(self):
+        subscriber = self.publisher.subscribe(self.format)
+        try:
+            while not subscriber.closed:
+                for _, data in subscriber.pop_all(HEARTBEAT_SECONDS):
+                    if self.format == 'msgpack':
+                        self.wfile.write(struct.pack(">I", len(data)) + data)
+                    else:
+                        self.wfile.write(data + b"\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.publisher.unsubscribe(subscriber)
+
+# Process-wide publisher; the servers can only bind once per process
+_publisher = None
+_publisher_lock = threading.Lock()
+
+def get_publisher():
+    """Get the shared publisher, starting its servers on first use (None when disabled)"""
+    global _publisher
+    if not STREAM_ENABLED:
+        return None
+    
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = MetricsPublisher()
+            try:
+                _publisher.start_http()
+                if STREAM_UNIX_SOCKET:
+                    _publisher.start_unix()
+            except Exception as e:
+                print(f"Event streaming unavailable: {e}")
+    return _publisher
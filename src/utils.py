@@ -1,7 +1,9 @@
 import os
 import pandas as pd
 from datetime import datetime
-from src.config import SESSION_LOGS_DIR, REPORTS_DIR
+from src.config import SESSION_LOGS_DIR, REPORTS_DIR, SAVE_BINARY_SESSIONS
+from src.logger.session_catalog import SessionCatalog, CATALOG_SUMMARY_COLUMNS
+from src.logger.session_binary import csv_to_binary, binary_path_for
 
 def ensure_directories():
     """Create necessary directories if they don't exist"""
@@ -24,10 +26,45 @@ def calculate_negative_score(emotion_dict):
     negative_emotions = ['angry', 'disgust', 'fear', 'sad']
     return sum(emotion_dict.get(emotion, 0) for emotion in negative_emotions)
 
-def save_session_data(df, session_id):
-    """Save session data to CSV"""
+def save_session_log(session_logger):
+    """Stop a session, stream its samples to CSV and record it in the session catalog;
+    returns the CSV path, or None when the session had no data"""
     ensure_directories()
+    session_id = session_logger.session_id
     filename = f"session_{session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    filepath = session_logger.stop_session(os.path.join(SESSION_LOGS_DIR, filename))
+    if filepath is None:
+        return None
+    
+    if SAVE_BINARY_SESSIONS:
+        try:
+            csv_to_binary(filepath, binary_path_for(filepath), session_id)
+        except Exception as e:
+            print(f"Binary session save error: {e}")
+    
+    try:
+        # Only the columns the summary needs are read back, and only for the summary
+        df = pd.read_csv(filepath, usecols=lambda column: column in CATALOG_SUMMARY_COLUMNS)
+        catalog = SessionCatalog()
+        catalog.record_session(df, session_id, filepath)
+        catalog.close()
+    except Exception as e:
+        print(f"Session catalog update error: {e}")
+    
+    return filepath
+
+def save_alert_events(alerts_df, session_id):
+    """Save alert events next to the session log"""
+    ensure_directories()
+    filename = f"session_{session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_alerts.csv"
+    filepath = os.path.join(SESSION_LOGS_DIR, filename)
+    alerts_df.to_csv(filepath, index=False)
+    return filepath
+
+def save_performance_metrics(metrics_df, session_id):
+    """Save per-stage latency metrics next to the session log"""
+    ensure_directories()
+    filename = f"session_{session_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_perf.csv"
     filepath = os.path.join(SESSION_LOGS_DIR, filename)
-    df.to_csv(filepath, index=False)
+    metrics_df.to_csv(filepath, index=False)
     return filepath
\ No newline at end of file
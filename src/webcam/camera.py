@@ -1,14 +1,32 @@
+import time
+import threading
 import cv2
 import numpy as np
 from src.config import VIDEO_WIDTH, VIDEO_HEIGHT
 
 class CameraCapture:
+    """Camera with a grabber thread that keeps only the newest frame"""
     def __init__(self):
         self.cap = None
         self.is_active = False
+        self._thread = None
+        self._running = False
+        self._cond = threading.Condition()
         
+        # Reusable buffers: the grabber reads into _raw, flips into _back and swaps it with _front
+        self._raw = None
+        self._back = None
+        self._front = None
+        self._timestamp = None
+        self._seq = 0
+        self._consumed_seq = 0
+        self.stats = {'captured': 0, 'delivered': 0, 'dropped': 0, 'read_errors': 0}
+    
     def start(self):
         """Start camera capture"""
+        if self.is_active:
+            return True
+        
         try:
             self.cap = cv2.VideoCapture(0)
             if self.cap.isOpened():
@@ -17,7 +35,18 @@ class CameraCapture:
                 # Test if we can actually read a frame
                 ret, frame = self.cap.read()
                 if ret:
+                    self._seq = 0
+                    self._consumed_seq = 0
+                    self.stats = {'captured': 0, 'delivered': 0, 'dropped': 0, 'read_errors': 0}
+                    self._raw = frame
+                    self._back = np.empty_like(frame)
+                    self._front = np.empty_like(frame)
+                    self._publish(frame)
+                    
                     self.is_active = True
+                    self._running = True
+                    self._thread = threading.Thread(target=self._grab_loop, daemon=True)
+                    self._thread.start()
                     print("Camera started successfully")
                     return True
                 else:
@@ -31,21 +60,84 @@ class CameraCapture:
         self.is_active = False
         return False
     
+    def _grab_loop(self):
+        """Read frames continuously so the device buffer never goes stale"""
+        while self._running:
+            try:
+                ret, frame = self.cap.read(self._raw)
+            except Exception as e:
+                print(f"Camera read error: {e}")
+                ret, frame = False, None
+            
+            if not ret:
+                with self._cond:
+                    self.stats['read_errors'] += 1
+                time.sleep(0.01)
+                continue
+            
+            self._raw = frame
+            self._publish(frame)
+    
+    def _publish(self, frame):
+        """Mirror the frame into the back buffer and make it the newest frame"""
+        if self._back is None or self._back.shape != frame.shape:
+            self._back = np.empty_like(frame)
+        cv2.flip(frame, 1, dst=self._back)  # Mirror image
+        timestamp = time.monotonic()
+        
+        with self._cond:
+            if self._seq > self._consumed_seq:
+                # The previous frame was replaced before anyone read it
+                self.stats['dropped'] += 1
+            self._front, self._back = self._back, self._front
+            self._timestamp = timestamp
+            self._seq += 1
+            self.stats['captured'] += 1
+            self._cond.notify_all()
+    
+    def _take(self):
+        """Copy the newest frame; callers hold the condition lock"""
+        self._consumed_seq = self._seq
+        self.stats['delivered'] += 1
+        # Consumers draw on frames, so they never get the shared buffer
+        return self._front.copy(), self._timestamp, self._seq
+    
+    def latest(self):
+        """Return (frame, monotonic timestamp, seq) of the newest frame without blocking"""
+        with self._cond:
+            if not self.is_active or self._seq == 0:
+                return None
+            return self._take()
+    
+    def next_after(self, seq, timeout=1.0):
+        """Block until a frame newer than seq arrives; None on timeout or stop"""
+        with self._cond:
+            self._cond.wait_for(lambda: not self.is_active or self._seq > seq, timeout)
+            if not self.is_active or self._seq <= seq:
+                return None
+            return self._take()
+    
     def get_frame(self):
         """Get current frame from camera"""
-        if not self.is_active or not self.cap:
-            return None
-            
-        ret, frame = self.cap.read()
-        if ret:
-            return cv2.flip(frame, 1)  # Mirror image
-        return None
+        result = self.latest()
+        return result[0] if result is not None else None
+    
+    def get_stats(self):
+        """Capture, delivery and dropped-frame counters"""
+        with self._cond:
+            return dict(self.stats, seq=self._seq)
     
     def stop(self):
         """Stop camera capture"""
+        self._running = False
+        with self._cond:
+            self.is_active = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
         if self.cap:
             self.cap.release()
-        self.is_active = False
     
     def __del__(self):
-        self.stop()
\ No newline at end of file
+        self.stop()
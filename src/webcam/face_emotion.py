@@ -2,65 +2,73 @@ import cv2
 import numpy as np
 from collections import deque
 import os
+import time
 import warnings
+from src.config import (CHANGE_GATE_THRESHOLD, CHANGE_GATE_MAX_STALE_SECONDS,
+                        CHANGE_GATE_THUMBNAIL_SIZE, FER_CACHE_ENABLED, MAX_TRACKED_FACES, FER_TILE_GAP)
+from src.perf.latency import track_stage
+from src.runtime_config import get_runtime_config
+from src.resources import get_registry
+from src.webcam.face_tracker import FaceTracker
+from src.webcam.result_cache import get_shared_cache
 
 # Suppress all warnings
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 warnings.filterwarnings('ignore')
 
-# Global singleton detector
-_fer_detector = None
-_opencv_cascade = None
-
-def _get_fer_detector():
-    global _fer_detector
-    if _fer_detector is None:
-        try:
-            from fer import FER
-            _fer_detector = FER(mtcnn=False)
-            print("FER detector initialized")
-        except Exception as e:
-            print(f"FER initialization failed: {e}")
-            _fer_detector = False
-    return _fer_detector if _fer_detector is not False else None
-
-def _get_opencv_cascade():
-    global _opencv_cascade
-    if _opencv_cascade is None:
-        try:
-            _opencv_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            )
-            print("OpenCV cascade initialized")
-        except Exception as e:
-            print(f"OpenCV cascade failed: {e}")
-            _opencv_cascade = False
-    return _opencv_cascade if _opencv_cascade is not False else None
-
 class FaceEmotionDetector:
-    def __init__(self):
+    def __init__(self, latency_tracker=None, result_cache=None, runtime_config=None):
+        self.latency_tracker = latency_tracker
+        self.runtime_config = runtime_config if runtime_config is not None else get_runtime_config()
+        self.result_cache = result_cache if result_cache is not None else (
+            get_shared_cache() if FER_CACHE_ENABLED else None
+        )
         self.emotion_history = deque(maxlen=1)  # No smoothing - instant response
         self.clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
         self.is_available = True
-        print("Face emotion detector ready")
         
-    def _detect_face_opencv(self, frame):
-        """Detect face using OpenCV"""
-        cascade = _get_opencv_cascade()
+        # The FER model and face cascade are loaded once per process and shared by every detector
+        registry = get_registry()
+        self._fer = registry.acquire('fer_model')
+        self._cascade = registry.acquire('face_cascade')
+        
+        # Change-detection gate: reuse the last result while the face ROI is unchanged
+        self.gate_stats = {'frames': 0, 'skipped': 0}
+        self._last_state = None  # {'result', 'thumbnail', 'time'} for the single-face path
+        
+        # Multi-face tracking: stable person IDs and a gate state per person
+        self.tracker = FaceTracker()
+        self._person_states = {}
+        print("Face emotion detector ready")
+    
+    def _detect_faces_opencv(self, frame):
+        """Detect all faces using OpenCV, largest first"""
+        cascade = self._cascade.value
         if cascade is None:
-            return None
-            
+            return []
+        
         try:
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = cascade.detectMultiScale(gray, 1.1, 4, minSize=(80, 80))
             
-            if len(faces) > 0:
-                # Get largest face
-                largest = max(faces, key=lambda x: x[2] * x[3])
-                return list(largest)
+            # Detect on a downscaled frame when the profile trades accuracy for speed
+            scale = self.runtime_config.detection_scale
+            if scale < 1.0:
+                gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            min_size = max(1, int(80 * scale))
+            with self._cascade.lock:
+                faces = cascade.detectMultiScale(gray, 1.1, 4, minSize=(min_size, min_size))
+            
+            # Return boxes in full-frame coordinates
+            faces = sorted(faces, key=lambda x: x[2] * x[3], reverse=True)[:MAX_TRACKED_FACES]
+            return [[int(round(v / scale)) for v in face] for face in faces]
         except Exception as e:
             print(f"Face detection error: {e}")
-        return None
+        return []
+    
+    def _detect_face_opencv(self, frame):
+        """Detect the largest face using OpenCV"""
+        faces = self._detect_faces_opencv(frame)
+        return faces[0] if faces else None
     
     def _preprocess_face(self, face_crop):
         """Preprocess face for better emotion recognition"""
@@ -81,11 +89,70 @@ class FaceEmotionDetector:
             print(f"Preprocessing error: {e}")
             return cv2.resize(face_crop, (224, 224))
     
+    def _classify_faces(self, fer_detector, processed_faces):
+        """Get FER emotion probabilities for several faces, cache misses in one batched call"""
+        probs = [None] * len(processed_faces)
+        cache_keys = [None] * len(processed_faces)
+        pending = []
+        for i, face in enumerate(processed_faces):
+            if self.result_cache is not None:
+                cache_keys[i] = self.result_cache.fingerprint(face)
+                cached = self.result_cache.get(cache_keys[i])
+                if cached is not None:
+                    probs[i] = cached or None  # Empty dict caches "no face found"
+                    continue
+            pending.append(i)
+        
+        if not pending:
+            return probs
+        
+        # FER re-detects the face inside each crop, as it did when crops were classified one
+        # at a time: that tightens the box and rejects OpenCV false positives, which keep no result
+        size = processed_faces[pending[0]].shape[0]
+        stride = size + FER_TILE_GAP
+        tiles = []  # (index, FER box in tile coordinates)
+        results = []
+        with track_stage(self.latency_tracker, 'fer_inference'):
+            with self._fer.lock:
+                for i in pending:
+                    boxes = fer_detector.find_faces(processed_faces[i], bgr=True)
+                    if len(boxes):
+                        tiles.append((i, [int(v) for v in boxes[0]]))
+                
+                if tiles:
+                    # Tile the confirmed faces side by side and classify every box in one model call;
+                    # the gap keeps FER's enlarged crop around each box out of the neighbouring tile
+                    mosaic = np.zeros((size, stride * len(tiles) - FER_TILE_GAP, 3),
+                                      dtype=processed_faces[pending[0]].dtype)
+                    rectangles = []
+                    for n, (i, (x, y, w, h)) in enumerate(tiles):
+                        mosaic[:, n * stride:n * stride + size] = processed_faces[i]
+                        rectangles.append((n * stride + x, y, w, h))
+                    results = fer_detector.detect_emotions(mosaic, face_rectangles=rectangles)
+        found = {i for i, _ in tiles}
+        
+        batch_probs = {}
+        if len(results) == len(tiles):
+            batch_probs = {i: dict(result['emotions']) for (i, _), result in zip(tiles, results)}
+        # Otherwise FER skipped a box, and it labels results by the index of each successful
+        # prediction rather than by box, so no result in the batch can be attributed
+        
+        for i in pending:
+            probs[i] = batch_probs.get(i)
+            # "No face found" is cached only when FER's own check said so
+            if cache_keys[i] is not None and (probs[i] is not None or i not in found):
+                self.result_cache.put(cache_keys[i], probs[i] or {})
+        return probs
+    
+    def _classify_face(self, fer_detector, processed_face):
+        """Get FER emotion probabilities for a face, via the result cache"""
+        return self._classify_faces(fer_detector, [processed_face])[0]
+    
     def _get_neutral_output(self, bbox=None):
         """Return neutral emotion output"""
         if bbox is None:
             bbox = [0, 0, 0, 0]
-            
+        
         probs = {
             "angry": 0.05,
             "disgust": 0.05,
@@ -104,14 +171,124 @@ class FaceEmotionDetector:
             "probs": probs
         }
     
+    def get_neutral_emotions(self):
+        """Emotion probabilities reported when no face is in view"""
+        return self._get_neutral_output()['probs']
+    
+    def _build_result(self, probs, bbox):
+        """Turn FER probabilities for a face into a detection result"""
+        if probs is None:
+            return self._get_neutral_output(bbox)
+        
+        # Add to history for smoothing
+        self.emotion_history.append(probs)
+        
+        # Use current frame directly - no smoothing
+        avg_probs = probs
+        
+        # Get dominant emotion and confidence
+        max_emotion = max(avg_probs, key=avg_probs.get)
+        confidence = avg_probs[max_emotion]
+        
+        # Very low confidence threshold for maximum detection
+        if confidence < 0.15:
+            return {
+                "emotion": "neutral",
+                "confidence": confidence,
+                "negative_score": 0.15,
+                "bbox": bbox,
+                "probs": avg_probs
+            }
+        
+        # Calculate negative score
+        negative_score = (0.5 * avg_probs.get('sad', 0) + 
+                        0.3 * avg_probs.get('angry', 0) + 
+                        0.2 * avg_probs.get('fear', 0))
+        negative_score = max(0.0, min(1.0, negative_score))
+        
+        return {
+            "emotion": max_emotion,
+            "confidence": confidence,
+            "negative_score": negative_score,
+            "bbox": bbox,
+            "probs": avg_probs
+        }
+    
+    def _roi_thumbnail(self, frame, bbox):
+        """Small grayscale thumbnail of the face ROI (whole frame when no face)"""
+        if bbox is not None and bbox != [0, 0, 0, 0]:
+            x, y, w, h = bbox
+            roi = frame[y:y+h, x:x+w]
+        else:
+            roi = frame
+        
+        if roi.size == 0:
+            return None
+        
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+        size = (CHANGE_GATE_THUMBNAIL_SIZE, CHANGE_GATE_THUMBNAIL_SIZE)
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    
+    def _can_reuse_result(self, state, thumbnail, now):
+        """Whether a previous result (single face or one tracked person) still applies"""
+        if state is None:
+            return False
+        
+        elapsed = now - state['time']
+        # The profile's inference interval caps the FER rate regardless of scene changes
+        if elapsed < self.runtime_config.inference_interval:
+            return True
+        
+        if not self.runtime_config.change_gate or state['thumbnail'] is None or thumbnail is None:
+            return False
+        if elapsed > CHANGE_GATE_MAX_STALE_SECONDS:
+            return False
+        if thumbnail.shape != state['thumbnail'].shape:
+            return False
+        
+        change = float(cv2.absdiff(thumbnail, state['thumbnail']).mean())
+        return change < CHANGE_GATE_THRESHOLD
+    
+    def get_gate_stats(self):
+        """Frames seen, inferences skipped and the skip ratio"""
+        frames = self.gate_stats['frames']
+        skipped = self.gate_stats['skipped']
+        return {
+            'frames': frames,
+            'skipped': skipped,
+            'skip_ratio': skipped / frames if frames else 0.0
+        }
+    
     def detect_emotions(self, frame):
         """Main emotion detection function"""
         if frame is None:
             return self._get_neutral_output()
         
+        now = time.monotonic()
+        gate_on = self.runtime_config.change_gate
+        self.gate_stats['frames'] += 1
+        if self._last_state is not None:
+            thumbnail = self._roi_thumbnail(frame, self._last_state['result']['bbox']) if gate_on else None
+            if self._can_reuse_result(self._last_state, thumbnail, now):
+                self.gate_stats['skipped'] += 1
+                return dict(self._last_state['result'])
+        
+        result = self._detect_emotions_uncached(frame)
+        
+        self._last_state = {
+            'result': result,
+            'thumbnail': self._roi_thumbnail(frame, result['bbox']) if gate_on else None,
+            'time': time.monotonic()
+        }
+        
+        return result
+    
+    def _detect_emotions_uncached(self, frame):
+        """Run face detection and FER inference on a frame"""
         try:
             # Detect face using OpenCV
-            bbox = self._detect_face_opencv(frame)
+            with track_stage(self.latency_tracker, 'face_detection'):
+                bbox = self._detect_face_opencv(frame)
             
             if bbox is None or bbox[2] < 80 or bbox[3] < 80:
                 return self._get_neutral_output()
@@ -126,55 +303,72 @@ class FaceEmotionDetector:
             processed_face = self._preprocess_face(face_crop)
             
             # Get FER predictions
-            fer_detector = _get_fer_detector()
+            fer_detector = self._fer.value
             if fer_detector is None:
                 return self._get_neutral_output(bbox)
             
-            results = fer_detector.detect_emotions(processed_face)
-            
-            if not results:
-                return self._get_neutral_output(bbox)
-            
-            # Get emotion probabilities
-            probs = results[0]['emotions']
-            
-            # Add to history for smoothing
-            self.emotion_history.append(probs)
-            
-            # Use current frame directly - no smoothing
-            avg_probs = probs
+            return self._build_result(self._classify_face(fer_detector, processed_face), bbox)
+        
+        except Exception as e:
+            print(f"Emotion detection error: {e}")
+            return self._get_neutral_output()
+    
+    def detect_people(self, frame):
+        """Detect, track and classify every face; returns results with a stable 'person_id', largest first"""
+        if frame is None:
+            return []
+        
+        try:
+            now = time.monotonic()
+            with track_stage(self.latency_tracker, 'face_detection'):
+                bboxes = [bbox for bbox in self._detect_faces_opencv(frame) if bbox[2] >= 80 and bbox[3] >= 80]
+            tracks = self.tracker.update(bboxes, now)
             
-            # Get dominant emotion and confidence
-            max_emotion = max(avg_probs, key=avg_probs.get)
-            confidence = avg_probs[max_emotion]
+            # Forget gate state for people who left the frame
+            for person_id in list(self._person_states):
+                if person_id not in self.tracker.tracks:
+                    del self._person_states[person_id]
             
-            # Very low confidence threshold for maximum detection
-            if confidence < 0.15:
-                return {
-                    "emotion": "neutral",
-                    "confidence": confidence,
-                    "negative_score": 0.15,
-                    "bbox": bbox,
-                    "probs": avg_probs
-                }
+            gate_on = self.runtime_config.change_gate
+            results = {}
+            confirmed = {}  # person id -> FER found a face in the box (OpenCV false positives do not)
+            pending = []
+            for person_id, bbox in tracks:
+                self.gate_stats['frames'] += 1
+                thumbnail = self._roi_thumbnail(frame, bbox) if gate_on else None
+                state = self._person_states.get(person_id)
+                if self._can_reuse_result(state, thumbnail, now):
+                    self.gate_stats['skipped'] += 1
+                    results[person_id] = dict(state['result'], bbox=bbox)
+                    confirmed[person_id] = state['confirmed']
+                else:
+                    pending.append((person_id, bbox, thumbnail))
             
-            # Calculate negative score
-            negative_score = (0.5 * avg_probs.get('sad', 0) + 
-                            0.3 * avg_probs.get('angry', 0) + 
-                            0.2 * avg_probs.get('fear', 0))
-            negative_score = max(0.0, min(1.0, negative_score))
+            fer_detector = self._fer.value if pending else None
+            processed = []
+            for person_id, bbox, thumbnail in pending:
+                x, y, w, h = bbox
+                face_crop = frame[y:y+h, x:x+w]
+                processed.append(self._preprocess_face(face_crop) if face_crop.size else None)
             
-            return {
-                "emotion": max_emotion,
-                "confidence": confidence,
-                "negative_score": negative_score,
-                "bbox": bbox,
-                "probs": avg_probs
-            }
+            # All changed faces go to the model together
+            batch = [face for face in processed if face is not None]
+            batch_probs = iter(self._classify_faces(fer_detector, batch)) if fer_detector is not None and batch else iter([])
+            for (person_id, bbox, thumbnail), face in zip(pending, processed):
+                probs = next(batch_probs, None) if face is not None else None
+                result = self._build_result(probs, bbox)
+                # Without the model every box is kept with a neutral reading
+                is_face = probs is not None or fer_detector is None
+                self._person_states[person_id] = {'result': result, 'thumbnail': thumbnail, 'time': now,
+                                                  'confirmed': is_face}
+                results[person_id] = result
+                confirmed[person_id] = is_face
             
+            return [dict(results[person_id], person_id=person_id) for person_id, _ in tracks if confirmed[person_id]]
+        
         except Exception as e:
-            print(f"Emotion detection error: {e}")
-            return self._get_neutral_output()
+            print(f"Multi-face detection error: {e}")
+            return []
     
     def draw_emotion_box(self, frame, result):
         """Draw bounding box and emotion label on frame"""
@@ -190,11 +384,13 @@ class FaceEmotionDetector:
             # Draw bounding box
             cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
             
-            # Draw label
+            # Draw label, prefixed with the person ID when tracking several faces
             label = f"{emotion}: {confidence:.2f}"
+            if result.get('person_id') is not None:
+                label = f"#{result['person_id']} {label}"
             cv2.putText(frame, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
             
             return frame
         except Exception as e:
             print(f"Draw error: {e}")
-            return frame
\ No newline at end of file
+            return frame
@@ -0,0 +1,61 @@
+import time
+import itertools
+from src.config import FACE_TRACK_IOU_THRESHOLD, FACE_TRACK_MAX_MISSING_SECONDS
+
+def box_iou(a, b):
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    overlap_w = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    overlap_h = max(0, min(ay + ah, by + bh) - max(ay, by))
+    intersection = overlap_w * overlap_h
+    union = aw * ah + bw * bh - intersection
+    return intersection / union if union > 0 else 0.0
+
+class FaceTracker:
+    """Gives faces stable person IDs across frames by greedy IoU matching"""
+    def __init__(self, iou_threshold=FACE_TRACK_IOU_THRESHOLD, max_missing_seconds=FACE_TRACK_MAX_MISSING_SECONDS):
+        self.iou_threshold = iou_threshold
+        self.max_missing_seconds = max_missing_seconds
+        self.tracks = {}  # person id -> {'bbox', 'last_seen'}
+        self._next_ids = itertools.count(1)
+    
+    def reset(self):
+        self.tracks = {}
+        self._next_ids = itertools.count(1)
+    
+    def update(self, bboxes, now=None):
+        """Match this frame's boxes to known people; returns [(person_id, bbox)] in input order"""
+        now = time.monotonic() if now is None else now
+        
+        # Best overlaps first, each track and box used at most once
+        candidates = []
+        for person_id, track in self.tracks.items():
+            for index, bbox in enumerate(bboxes):
+                iou = box_iou(track['bbox'], bbox)
+                if iou >= self.iou_threshold:
+                    candidates.append((iou, person_id, index))
+        candidates.sort(reverse=True)
+        
+        assigned = {}
+        matched_people = set()
+        for iou, person_id, index in candidates:
+            if person_id in matched_people or index in assigned:
+                continue
+            assigned[index] = person_id
+            matched_people.add(person_id)
+        
+        matches = []
+        for index, bbox in enumerate(bboxes):
+            person_id = assigned.get(index)
+            if person_id is None:
+                person_id = next(self._next_ids)
+            self.tracks[person_id] = {'bbox': list(bbox), 'last_seen': now}
+            matches.append((person_id, list(bbox)))
+        
+        # Retire people who have been out of view too long
+        for person_id in [pid for pid, track in self.tracks.items()
+                          if now - track['last_seen'] > self.max_missing_seconds]:
+            del self.tracks[person_id]
+        
+        return matches
@@ -0,0 +1,259 @@
+import time
+import queue
+import itertools
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+import cv2
+from src.config import (EMOTIONS, VIDEO_WIDTH, VIDEO_HEIGHT, INFERENCE_WORKERS, INFERENCE_RING_SLOTS,
+                        INFERENCE_RESULT_QUEUE_SIZE, INFERENCE_STARTUP_TIMEOUT, INFERENCE_RESULT_TIMEOUT,
+                        INFERENCE_MAX_CONSECUTIVE_ERRORS)
+
+# Compact result record sent back per person:
+#   (person_id, (x, y, w, h), emotion, confidence, negative_score, probabilities in EMOTIONS order)
+
+def _pack_people(people):
+    return [
+        (person['person_id'], tuple(int(v) for v in person['bbox']), person['emotion'],
+         float(person['confidence']), float(person['negative_score']),
+         tuple(float(person['probs'].get(emotion, 0.0)) for emotion in EMOTIONS))
+        for person in people
+    ]
+
+def _unpack_people(records, scale=None):
+    """Result records as person dicts; scale (sx, sy) maps boxes from slot back to frame coordinates"""
+    return [
+        {
+            'person_id': person_id,
+            'bbox': list(bbox) if scale is None else _scale_box(bbox, scale),
+            'emotion': emotion,
+            'confidence': confidence,
+            'negative_score': negative_score,
+            'probs': dict(zip(EMOTIONS, probs))
+        }
+        for person_id, bbox, emotion, confidence, negative_score, probs in records
+    ]
+
+def _scale_box(bbox, scale):
+    x, y, w, h = bbox
+    sx, sy = scale
+    return [int(round(x * sx)), int(round(y * sy)), int(round(w * sx)), int(round(h * sy))]
+
+def _worker_main(shm_name, slot_bytes, request_queue, result_queue):
+    """Worker process: read frames from shared memory slots, send back result records"""
+    # Heavy imports happen here so only the workers load the models
+    from src.webcam.face_emotion import FaceEmotionDetector
+    
+    # The parent owns (and unlinks) the block; spawned workers share its resource tracker
+    shm = shared_memory.SharedMemory(name=shm_name)
+    
+    detectors = {}  # stream id -> detector, so each stream keeps its own face tracks
+    try:
+        while True:
+            request = request_queue.get()
+            if request is None:
+                break
+            
+            request_id, stream_id, slot, shape, timestamp = request
+            started = time.perf_counter()
+            frame = None
+            try:
+                detector = detectors.get(stream_id)
+                if detector is None:
+                    detector = detectors[stream_id] = FaceEmotionDetector()
+                detector.runtime_config.reload_if_changed()
+                
+                frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+                records = _pack_people(detector.detect_people(frame))
+                error = None
+            except Exception as e:
+                records, error = [], str(e)
+            frame = None  # Drop the view before the slot is handed back
+            
+            result_queue.put((request_id, stream_id, slot, timestamp, records,
+                              time.perf_counter() - started, error))
+    finally:
+        detectors.clear()
+        shm.close()
+
+class InferencePool:
+    """Face inference in worker processes, fed through shared-memory frame slots"""
+    def __init__(self, workers=INFERENCE_WORKERS, slots=INFERENCE_RING_SLOTS,
+                 frame_shape=(VIDEO_HEIGHT, VIDEO_WIDTH, 3)):
+        self.worker_count = max(1, workers)
+        self.slot_count = max(self.worker_count, slots)
+        self.frame_shape = tuple(frame_shape)
+        self.slot_bytes = int(np.prod(frame_shape))
+        self.is_active = False
+        self._context = mp.get_context('spawn')  # Never fork a process that has Streamlit/TF threads
+        self._shm = None
+        self._processes = []
+        self._request_queues = []
+        self._result_queue = None
+        self._free_slots = []
+        self._submitted = {}  # request id -> (submit time, box scale or None), for latency and box mapping
+        self._request_ids = itertools.count(1)
+        self._latest = {}  # stream id -> most recent result
+        self._started_at = None
+        self._last_result_at = None
+        self._consecutive_errors = 0
+        self.stats = {'submitted': 0, 'completed': 0, 'dropped': 0, 'resized': 0, 'rejected': 0, 'errors': 0}
+    
+    def start(self):
+        if self.is_active:
+            return True
+        try:
+            self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.slot_count)
+            self._result_queue = self._context.Queue(maxsize=INFERENCE_RESULT_QUEUE_SIZE)
+            for index in range(self.worker_count):
+                request_queue = self._context.Queue()
+                process = self._context.Process(
+                    target=_worker_main,
+                    args=(self._shm.name, self.slot_bytes, request_queue, self._result_queue),
+                    name=f"inference-worker-{index}",
+                    daemon=True
+                )
+                process.start()
+                self._request_queues.append(request_queue)
+                self._processes.append(process)
+            self._free_slots = list(range(self.slot_count))
+            self._started_at = time.monotonic()
+            self.is_active = True
+            print(f"Inference pool started with {self.worker_count} worker(s)")
+            return True
+        except Exception as e:
+            print(f"Inference pool error: {e}")
+            self.stop()
+            return False
+    
+    def submit(self, frame, stream_id=0, timestamp=None):
+        """Copy a frame into a free slot and queue it; returns the request id, or None if dropped"""
+        if not self.is_active or frame is None:
+            return None
+        if frame.dtype != np.uint8 or frame.ndim != 3 or frame.shape[2] != self.frame_shape[2]:
+            # Not a BGR frame the workers can read
+            self.stats['rejected'] += 1
+            return None
+        if not self._free_slots:
+            # All slots in flight (workers are behind): skip rather than block
+            self.stats['dropped'] += 1
+            return None
+        
+        # Cameras may ignore the requested resolution; frames are scaled to the slot shape and the
+        # returned boxes scaled back
+        scale = None
+        if frame.shape != self.frame_shape:
+            height, width = self.frame_shape[:2]
+            scale = (frame.shape[1] / width, frame.shape[0] / height)
+            frame = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+            self.stats['resized'] += 1
+        
+        slot = self._free_slots.pop()
+        view = np.ndarray(self.frame_shape, dtype=np.uint8, buffer=self._shm.buf, offset=slot * self.slot_bytes)
+        np.copyto(view, frame)
+        del view
+        
+        request_id = next(self._request_ids)
+        self._submitted[request_id] = (time.perf_counter(), scale)
+        # A stream always goes to the same worker so its face tracks stay consistent
+        worker = stream_id % self.worker_count
+        self._request_queues[worker].put((request_id, stream_id, slot, self.frame_shape,
+                                          time.monotonic() if timestamp is None else timestamp))
+        self.stats['submitted'] += 1
+        return request_id
+    
+    def poll(self, timeout=0.0):
+        """Collect finished results (waiting up to timeout for the first one) and free their slots"""
+        results = []
+        if not self.is_active:
+            return results
+        
+        block = timeout > 0
+        while True:
+            try:
+                record = self._result_queue.get(block, timeout) if block else self._result_queue.get_nowait()
+            except queue.Empty:
+                break
+            block = False
+            
+            request_id, stream_id, slot, timestamp, records, inference_s, error = record
+            self._free_slots.append(slot)
+            submitted, scale = self._submitted.pop(request_id, (None, None))
+            self._last_result_at = time.monotonic()
+            if error is not None:
+                self.stats['errors'] += 1
+                self._consecutive_errors += 1
+                print(f"Inference worker error: {error}")
+            else:
+                self._consecutive_errors = 0
+            self.stats['completed'] += 1
+            
+            result = {
+                'request_id': request_id,
+                'stream_id': stream_id,
+                'timestamp': timestamp,
+                'people': _unpack_people(records, scale),
+                'inference_s': inference_s,
+                'roundtrip_s': time.perf_counter() - submitted if submitted is not None else None
+            }
+            self._latest[stream_id] = result
+            results.append(result)
+        return results
+    
+    def latest(self, stream_id=0):
+        """Most recent result for a stream, or None"""
+        return self._latest.get(stream_id)
+    
+    def check_health(self):
+        """None while the workers keep up, otherwise why results can no longer be trusted"""
+        if not self.is_active:
+            return "not running"
+        dead = sum(not process.is_alive() for process in self._processes)
+        if dead:
+            # A dead worker never frees its slots, so every later frame would be dropped
+            return f"{dead} worker(s) exited"
+        if self._consecutive_errors >= INFERENCE_MAX_CONSECUTIVE_ERRORS:
+            return f"{self._consecutive_errors} failed requests in a row"
+        if len(self._free_slots) < self.slot_count:
+            # The first result also waits for the workers to load the models
+            if self._last_result_at is None:
+                waited, limit = time.monotonic() - self._started_at, INFERENCE_STARTUP_TIMEOUT
+            else:
+                waited, limit = time.monotonic() - self._last_result_at, INFERENCE_RESULT_TIMEOUT
+            if waited > limit:
+                return f"no result for {waited:.0f}s"
+        return None
+    
+    def get_stats(self):
+        """Request counters, frames in flight and live worker count"""
+        return dict(self.stats,
+                    in_flight=self.slot_count - len(self._free_slots) if self.is_active else 0,
+                    workers_alive=sum(process.is_alive() for process in self._processes))
+    
+    def stop(self):
+        for request_queue in self._request_queues:
+            try:
+                request_queue.put(None)
+            except Exception:
+                pass
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._request_queues = []
+        self._result_queue = None
+        self._free_slots = []
+        self._submitted = {}
+        self._latest = {}
+        self._last_result_at = None
+        self._consecutive_errors = 0
+        
+        if self._shm is not None:
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+            self._shm = None
+        self.is_active = False
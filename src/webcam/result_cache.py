@@ -0,0 +1,77 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+import cv2
+import numpy as np
+from src.config import (FER_CACHE_SIZE, FER_CACHE_TTL, FER_CACHE_FINGERPRINT_SIZE,
+                        FER_CACHE_QUANT_LEVELS)
+
+class EmotionResultCache:
+    """Thread-safe LRU cache of FER results keyed by face crop fingerprint"""
+    def __init__(self, capacity=FER_CACHE_SIZE, ttl=FER_CACHE_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (inserted at, value)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+    
+    def fingerprint(self, face):
+        """Quantized fingerprint of a preprocessed face crop"""
+        gray = cv2.cvtColor(face, cv2.COLOR_BGR2GRAY) if face.ndim == 3 else face
+        size = (FER_CACHE_FINGERPRINT_SIZE, FER_CACHE_FINGERPRINT_SIZE)
+        small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+        quantized = (small.astype(np.uint16) * FER_CACHE_QUANT_LEVELS // 256).astype(np.uint8)
+        return hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+    
+    def get(self, key):
+        """Return the cached value or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            
+            inserted_at, value = entry
+            if self.ttl is not None and time.monotonic() - inserted_at > self.ttl:
+                del self._entries[key]
+                self.stats['expirations'] += 1
+                self.stats['misses'] += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+    
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries over capacity"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self):
+        """Hit/miss/eviction counters, current size and hit ratio"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+# Process-wide cache shared by all detector instances
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_shared_cache():
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = EmotionResultCache()
+    return _shared_cache